@@ -13,6 +13,8 @@ Phase 6 scope:
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +47,7 @@ INSTALLED_APPS = [
     'apps.core.timetable.apps.TimetableConfig',
     'apps.core.attendance.apps.AttendanceConfig',
     'apps.core.exams.apps.ExamsConfig',
+    'apps.core.artifacts.apps.ArtifactsConfig',
 ]
 
 
@@ -89,6 +92,33 @@ DATABASES = {
 }
 
 
+# Timetable grids, analytics, list counts and the version keys that retire
+# them are shared by every worker process, so the cache must be shared too:
+# a per-process LocMemCache only sees the invalidations made by its own
+# worker. The database backend needs no extra service (run
+# ``createcachetable`` once); ``locmem`` is only safe with a single process.
+CACHE_BACKENDS = {
+    'database': ('django.core.cache.backends.db.DatabaseCache', 'ahv_erp_cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'ahv-erp'),
+}
+CACHE_BACKEND = os.getenv('DJANGO_CACHE_BACKEND', 'database').lower()
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"DJANGO_CACHE_BACKEND must be one of {', '.join(CACHE_BACKENDS)}; got '{CACHE_BACKEND}'."
+    )
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', CACHE_BACKENDS[CACHE_BACKEND][1]),
+    }
+}
+if CACHE_BACKEND in {'database', 'locmem'}:
+    # Culling a version key only costs a cache miss, but keep it rare.
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': int(os.getenv('DJANGO_CACHE_MAX_ENTRIES', '50000'))}
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -114,6 +144,7 @@ USE_TZ = True
 STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+BLOB_URL = '/students/files/'
 AUTH_USER_MODEL = 'users.User'
 
 
@@ -136,3 +167,7 @@ TEST_RUNNER = 'apps.core.test_runner.InstalledAppsOnlyDiscoverRunner'
 
 STAFF_ATTENDANCE_EDIT_WINDOW_HOURS = int(os.getenv('STAFF_ATTENDANCE_EDIT_WINDOW_HOURS', '6'))
 STUDENT_ATTENDANCE_EDIT_WINDOW_DAYS = int(os.getenv('STUDENT_ATTENDANCE_EDIT_WINDOW_DAYS', '2'))
+DOCUMENT_RENDER_WORKERS = int(os.getenv('DOCUMENT_RENDER_WORKERS', str(min(4, os.cpu_count() or 1))))
+ARTIFACT_CACHE_MAX_BYTES = int(os.getenv('ARTIFACT_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', '50'))
+LIST_COUNT_CACHE_SECONDS = int(os.getenv('LIST_COUNT_CACHE_SECONDS', '60'))
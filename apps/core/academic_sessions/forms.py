@@ -19,3 +19,17 @@ class AcademicSessionForm(forms.ModelForm):
         if start_date and end_date and start_date >= end_date:
             self.add_error('end_date', 'End date must be after start date.')
         return cleaned_data
+
+
+class SessionRolloverForm(forms.Form):
+    source = forms.ModelChoiceField(queryset=AcademicSession.objects.none(), label='Copy from session')
+    include_timetable = forms.BooleanField(
+        required=False,
+        label='Also copy teacher assignments and timetable',
+    )
+
+    def __init__(self, *args, **kwargs):
+        school = kwargs.pop('school')
+        target = kwargs.pop('target')
+        super().__init__(*args, **kwargs)
+        self.fields['source'].queryset = AcademicSession.objects.filter(school=school).exclude(pk=target.pk).order_by('-start_date')
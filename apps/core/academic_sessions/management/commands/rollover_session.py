@@ -0,0 +1,50 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.academic_sessions.models import AcademicSession
+from apps.core.academic_sessions.rollover import rollover_session
+from apps.core.schools.models import School
+
+
+class Command(BaseCommand):
+    help = "Copy classes, sections, subjects, periods, config, grades and fee setup from one session into another."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', required=True, help='School code.')
+        parser.add_argument('--source', required=True, help='Source session name, e.g. 2025-26.')
+        parser.add_argument('--target', required=True, help='Target session name, e.g. 2026-27.')
+        parser.add_argument('--timetable', action='store_true', help='Also copy teacher assignments and timetable.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be created.')
+        parser.add_argument('--verbose-diff', action='store_true', help='List every row that would be created.')
+
+    def handle(self, *args, **options):
+        school = School.objects.filter(code=options['school']).first()
+        if not school:
+            raise CommandError(f"School '{options['school']}' not found.")
+        sessions = {
+            session.name: session
+            for session in AcademicSession.objects.filter(school=school, name__in=[options['source'], options['target']])
+        }
+        for key in ('source', 'target'):
+            if options[key] not in sessions:
+                raise CommandError(f"Session '{options[key]}' not found for school '{school.code}'.")
+
+        try:
+            result = rollover_session(
+                school=school,
+                source=sessions[options['source']],
+                target=sessions[options['target']],
+                include_timetable=options['timetable'],
+                dry_run=options['dry_run'],
+            )
+        except ValidationError as exc:
+            raise CommandError('; '.join(exc.messages))
+
+        for row in result.rows():
+            self.stdout.write(f"{row['label']}: {len(row['created'])} to create, {row['skipped']} already present")
+            if options['verbose_diff']:
+                for label in row['created']:
+                    self.stdout.write(f"  + {label}")
+
+        verb = 'Would create' if result.dry_run else 'Created'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {result.total_created} row(s) in {result.target.name}."))
@@ -0,0 +1,376 @@
+"""Copy the academic structure of one session into another."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from apps.core.academics.models import AcademicConfig, ClassSubject, Period, SchoolClass, Section
+from apps.core.exams.models import GradeScale
+from apps.core.hr.models import TeacherSubjectAssignment
+from apps.core.timetable.models import TimetableEntry
+from apps.core.timetable.services import bump_timetable_cache_version
+
+
+ROLLOVER_COMPONENTS = (
+    ('classes', 'Classes'),
+    ('sections', 'Sections'),
+    ('class_subjects', 'Class Subjects'),
+    ('periods', 'Periods'),
+    ('academic_config', 'Academic Config'),
+    ('grade_scales', 'Grade Scales'),
+    ('installments', 'Fee Installments'),
+    ('fee_structures', 'Class Fee Structures'),
+    ('teacher_subjects', 'Teacher Subject Assignments'),
+    ('timetable', 'Timetable Entries'),
+)
+
+
+@dataclass
+class RolloverResult:
+    source: object
+    target: object
+    dry_run: bool = True
+    created: dict = field(default_factory=lambda: {key: [] for key, _ in ROLLOVER_COMPONENTS})
+    skipped: dict = field(default_factory=lambda: {key: 0 for key, _ in ROLLOVER_COMPONENTS})
+
+    @property
+    def total_created(self):
+        return sum(len(labels) for labels in self.created.values())
+
+    def rows(self):
+        return [
+            {
+                'key': key,
+                'label': label,
+                'created': self.created[key],
+                'skipped': self.skipped[key],
+            }
+            for key, label in ROLLOVER_COMPONENTS
+        ]
+
+
+def _fees_models():
+    if not apps.is_installed('apps.core.fees'):
+        return None, None
+    return apps.get_model('core_fees', 'ClassFeeStructure'), apps.get_model('core_fees', 'Installment')
+
+
+def _shift_date(value, *, source, target):
+    shifted = value + (target.start_date - source.start_date)
+    return min(max(shifted, target.start_date), target.end_date)
+
+
+def _pending(result, key, rows, existing, natural_key, label):
+    pending = []
+    for row in rows:
+        row_key = natural_key(row)
+        if row_key in existing:
+            result.skipped[key] += 1
+            continue
+        existing.add(row_key)
+        pending.append(row)
+        result.created[key].append(label(row))
+    return pending
+
+
+def rollover_session(*, school, source, target, include_timetable=False, dry_run=True) -> RolloverResult:
+    """Copy ``source`` structure into ``target``; with ``dry_run`` only report what would be created."""
+    if source.school_id != school.id or target.school_id != school.id:
+        raise ValidationError('Both sessions must belong to the selected school.')
+    if source.id == target.id:
+        raise ValidationError('Source and target sessions must be different.')
+
+    result = RolloverResult(source=source, target=target, dry_run=dry_run)
+    fee_structure_model, installment_model = _fees_models()
+
+    classes = list(SchoolClass.objects.filter(school=school, session=source, is_active=True))
+    class_names = {row.id: row.name for row in classes}
+    sections = list(
+        Section.objects.filter(school_class__in=classes, is_active=True).order_by('school_class__display_order', 'name')
+    )
+    section_keys = {row.id: (class_names[row.school_class_id], row.name) for row in sections}
+    class_subjects = list(
+        ClassSubject.objects.filter(school_class__in=classes).select_related('subject')
+    )
+    periods = list(Period.objects.filter(school=school, session=source, is_active=True))
+    period_numbers = {row.id: row.period_number for row in periods}
+    config = AcademicConfig.objects.filter(school=school, session=source).first()
+    grade_scales = list(GradeScale.objects.filter(school=school, session=source, is_active=True))
+
+    pending_classes = _pending(
+        result, 'classes', classes,
+        set(SchoolClass.objects.filter(school=school, session=target).values_list('name', flat=True)),
+        lambda row: row.name,
+        lambda row: row.name,
+    )
+    pending_sections = _pending(
+        result, 'sections', sections,
+        set(Section.objects.filter(school_class__session=target).values_list('school_class__name', 'name')),
+        lambda row: section_keys[row.id],
+        lambda row: '-'.join(section_keys[row.id]),
+    )
+    pending_class_subjects = _pending(
+        result, 'class_subjects', class_subjects,
+        set(ClassSubject.objects.filter(school_class__session=target).values_list('school_class__name', 'subject_id')),
+        lambda row: (class_names[row.school_class_id], row.subject_id),
+        lambda row: f"{class_names[row.school_class_id]} -> {row.subject.code}",
+    )
+    pending_periods = _pending(
+        result, 'periods', periods,
+        set(Period.objects.filter(session=target).values_list('period_number', flat=True)),
+        lambda row: row.period_number,
+        lambda row: f"P{row.period_number} ({row.start_time:%H:%M}-{row.end_time:%H:%M})",
+    )
+    pending_config = _pending(
+        result, 'academic_config', [config] if config else [],
+        set(AcademicConfig.objects.filter(school=school, session=target).values_list('session_id', flat=True)),
+        lambda row: target.id,
+        lambda row: f"{row.get_attendance_type_display()} attendance, {len(row.working_days)} working days",
+    )
+    pending_grades = _pending(
+        result, 'grade_scales', grade_scales,
+        set(GradeScale.objects.filter(school=school, session=target).values_list('grade_name', flat=True)),
+        lambda row: row.grade_name,
+        lambda row: f"{row.grade_name} ({row.min_percentage}-{row.max_percentage}%)",
+    )
+
+    pending_installments = []
+    pending_fee_structures = []
+    if fee_structure_model is not None:
+        pending_installments = _pending(
+            result, 'installments',
+            list(installment_model.objects.filter(school=school, session=source, is_active=True)),
+            set(installment_model.objects.filter(school=school, session=target).values_list('name', flat=True)),
+            lambda row: row.name,
+            lambda row: f"{row.name} (due {_shift_date(row.due_date, source=source, target=target)})",
+        )
+        pending_fee_structures = _pending(
+            result, 'fee_structures',
+            list(
+                fee_structure_model.objects.filter(
+                    school=school,
+                    session=source,
+                    school_class__in=classes,
+                    is_active=True,
+                ).select_related('fee_type')
+            ),
+            set(
+                fee_structure_model.objects.filter(school=school, session=target)
+                .values_list('school_class__name', 'fee_type_id')
+            ),
+            lambda row: (class_names[row.school_class_id], row.fee_type_id),
+            lambda row: f"{class_names[row.school_class_id]} - {row.fee_type.name}: {row.amount}",
+        )
+
+    pending_assignments = []
+    pending_entries = []
+    if include_timetable:
+        pending_assignments = _pending(
+            result, 'teacher_subjects',
+            list(
+                TeacherSubjectAssignment.objects.filter(
+                    school=school,
+                    session=source,
+                    school_class__in=classes,
+                    teacher__is_active=True,
+                    is_active=True,
+                ).select_related('teacher', 'subject')
+            ),
+            set(
+                TeacherSubjectAssignment.objects.filter(school=school, session=target)
+                .values_list('teacher_id', 'school_class__name', 'subject_id')
+            ),
+            lambda row: (row.teacher_id, class_names[row.school_class_id], row.subject_id),
+            lambda row: f"{row.teacher.employee_id}: {class_names[row.school_class_id]} {row.subject.code}",
+        )
+        target_entries = list(
+            TimetableEntry.objects.filter(school=school, session=target, is_active=True).values_list(
+                'school_class__name', 'section__name', 'day_of_week', 'period__period_number', 'teacher_id',
+            )
+        )
+        # A copied entry is skipped if its section slot or its teacher slot is already taken.
+        taken = {(class_name, section_name, day, number) for class_name, section_name, day, number, _ in target_entries}
+        taken |= {('teacher', teacher_id, day, number) for _, _, day, number, teacher_id in target_entries}
+        for entry in TimetableEntry.objects.filter(
+            school=school,
+            session=source,
+            section__in=sections,
+            period__in=periods,
+            teacher__is_active=True,
+            is_active=True,
+        ).select_related('subject', 'teacher'):
+            number = period_numbers[entry.period_id]
+            slot = (*section_keys[entry.section_id], entry.day_of_week, number)
+            teacher_slot = ('teacher', entry.teacher_id, entry.day_of_week, number)
+            if slot in taken or teacher_slot in taken:
+                result.skipped['timetable'] += 1
+                continue
+            taken.update((slot, teacher_slot))
+            pending_entries.append(entry)
+            result.created['timetable'].append(
+                f"{'-'.join(section_keys[entry.section_id])} {entry.get_day_of_week_display()} P{number}: "
+                f"{entry.subject.code} / {entry.teacher.employee_id}"
+            )
+
+    if dry_run:
+        return result
+
+    with transaction.atomic():
+        SchoolClass.objects.bulk_create(
+            [
+                SchoolClass(
+                    school=school,
+                    session=target,
+                    name=row.name,
+                    code=row.code,
+                    display_order=row.display_order,
+                )
+                for row in pending_classes
+            ],
+            batch_size=500,
+        )
+        class_ids = dict(SchoolClass.objects.filter(school=school, session=target).values_list('name', 'id'))
+        target_class_ids = {source_id: class_ids[name] for source_id, name in class_names.items()}
+
+        Section.objects.bulk_create(
+            [
+                Section(
+                    school_class_id=target_class_ids[row.school_class_id],
+                    name=row.name,
+                    capacity=row.capacity,
+                    class_teacher_id=row.class_teacher_id,
+                )
+                for row in pending_sections
+            ],
+            batch_size=500,
+        )
+        ClassSubject.objects.bulk_create(
+            [
+                ClassSubject(
+                    school_class_id=target_class_ids[row.school_class_id],
+                    subject_id=row.subject_id,
+                    is_compulsory=row.is_compulsory,
+                    max_marks=row.max_marks,
+                    pass_marks=row.pass_marks,
+                    periods_per_week=row.periods_per_week,
+                )
+                for row in pending_class_subjects
+            ],
+            batch_size=500,
+        )
+        Period.objects.bulk_create(
+            [
+                Period(
+                    school=school,
+                    session=target,
+                    period_number=row.period_number,
+                    start_time=row.start_time,
+                    end_time=row.end_time,
+                )
+                for row in pending_periods
+            ],
+            batch_size=500,
+        )
+        AcademicConfig.objects.bulk_create([
+            AcademicConfig(
+                school=school,
+                session=target,
+                total_periods_per_day=row.total_periods_per_day,
+                working_days=list(row.working_days),
+                grading_enabled=row.grading_enabled,
+                attendance_type=row.attendance_type,
+                marks_decimal_allowed=row.marks_decimal_allowed,
+            )
+            for row in pending_config
+        ])
+        GradeScale.objects.bulk_create(
+            [
+                GradeScale(
+                    school=school,
+                    session=target,
+                    grade_name=row.grade_name,
+                    min_percentage=row.min_percentage,
+                    max_percentage=row.max_percentage,
+                    description=row.description,
+                    display_order=row.display_order,
+                )
+                for row in pending_grades
+            ],
+            batch_size=500,
+        )
+
+        if fee_structure_model is not None:
+            installment_model.objects.bulk_create(
+                [
+                    installment_model(
+                        school=school,
+                        session=target,
+                        name=row.name,
+                        due_date=_shift_date(row.due_date, source=source, target=target),
+                        fine_per_day=row.fine_per_day,
+                        split_percentage=row.split_percentage,
+                        fixed_amount=row.fixed_amount,
+                    )
+                    for row in pending_installments
+                ],
+                batch_size=500,
+            )
+            fee_structure_model.objects.bulk_create(
+                [
+                    fee_structure_model(
+                        school=school,
+                        session=target,
+                        school_class_id=target_class_ids[row.school_class_id],
+                        fee_type_id=row.fee_type_id,
+                        amount=row.amount,
+                    )
+                    for row in pending_fee_structures
+                ],
+                batch_size=500,
+            )
+
+        if include_timetable:
+            TeacherSubjectAssignment.objects.bulk_create(
+                [
+                    TeacherSubjectAssignment(
+                        school=school,
+                        session=target,
+                        teacher_id=row.teacher_id,
+                        school_class_id=target_class_ids[row.school_class_id],
+                        subject_id=row.subject_id,
+                    )
+                    for row in pending_assignments
+                ],
+                batch_size=500,
+            )
+            section_ids = {
+                (class_name, name): section_id
+                for section_id, class_name, name in Section.objects.filter(school_class__session=target).values_list(
+                    'id', 'school_class__name', 'name',
+                )
+            }
+            period_ids = dict(Period.objects.filter(session=target).values_list('period_number', 'id'))
+            TimetableEntry.objects.bulk_create(
+                [
+                    TimetableEntry(
+                        school=school,
+                        session=target,
+                        school_class_id=target_class_ids[entry.school_class_id],
+                        section_id=section_ids[section_keys[entry.section_id]],
+                        day_of_week=entry.day_of_week,
+                        period_id=period_ids[period_numbers[entry.period_id]],
+                        subject_id=entry.subject_id,
+                        teacher_id=entry.teacher_id,
+                    )
+                    for entry in pending_entries
+                ],
+                batch_size=500,
+            )
+
+    if pending_entries:
+        bump_timetable_cache_version(school=school, session=target)
+    result.dry_run = False
+    return result
@@ -1,10 +1,19 @@
+from datetime import date, time
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.db import IntegrityError
 from django.test import TestCase
 from django.urls import reverse
 
 from apps.core.academic_sessions.models import AcademicSession
+from apps.core.academic_sessions.rollover import rollover_session
+from apps.core.academics.models import AcademicConfig, ClassSubject, Period, SchoolClass, Section, Subject
+from apps.core.exams.models import GradeScale
+from apps.core.hr.models import Designation, Staff, TeacherSubjectAssignment
 from apps.core.schools.models import School
+from apps.core.timetable.models import TimetableEntry
 
 
 class AcademicSessionLifecycleTests(TestCase):
@@ -101,3 +110,139 @@ class AcademicSessionConstraintTests(TestCase):
                 end_date='2027-03-31',
                 is_active=True,
             )
+
+
+class SessionRolloverTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name='Rollover School', code='rollover_school')
+        self.source = AcademicSession.objects.create(
+            school=self.school,
+            name='2025-26',
+            start_date=date(2025, 4, 1),
+            end_date=date(2026, 3, 31),
+        )
+        self.target = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date=date(2026, 4, 1),
+            end_date=date(2027, 3, 31),
+        )
+
+        school_class = SchoolClass.objects.create(school=self.school, session=self.source, name='5th', display_order=5)
+        section = Section.objects.create(school_class=school_class, name='A', capacity=40)
+        subject = Subject.objects.create(school=self.school, name='English', code='ENG')
+        ClassSubject.objects.create(school_class=school_class, subject=subject, periods_per_week=6)
+        period = Period.objects.create(
+            school=self.school,
+            session=self.source,
+            period_number=1,
+            start_time=time(9, 0),
+            end_time=time(9, 45),
+        )
+        AcademicConfig.objects.create(school=self.school, session=self.source, working_days=['monday', 'tuesday'])
+        GradeScale.objects.create(
+            school=self.school,
+            session=self.source,
+            grade_name='A',
+            min_percentage=90,
+            max_percentage=100,
+        )
+
+        user = get_user_model().objects.create_user(
+            username='rollover_teacher',
+            password='pass12345',
+            role='teacher',
+            school=self.school,
+        )
+        self.teacher = Staff.objects.create(
+            school=self.school,
+            user=user,
+            employee_id='R001',
+            joining_date=date(2025, 4, 1),
+            designation=Designation.objects.create(school=self.school, name='Teacher'),
+            status='active',
+            is_active=True,
+        )
+        TeacherSubjectAssignment.objects.create(
+            school=self.school,
+            session=self.source,
+            teacher=self.teacher,
+            school_class=school_class,
+            subject=subject,
+        )
+        TimetableEntry.objects.create(
+            school=self.school,
+            session=self.source,
+            school_class=school_class,
+            section=section,
+            day_of_week='monday',
+            period=period,
+            subject=subject,
+            teacher=self.teacher,
+        )
+
+    def test_dry_run_reports_diff_and_commit_copies_with_remapped_ids(self):
+        preview = rollover_session(school=self.school, source=self.source, target=self.target, include_timetable=True)
+        self.assertTrue(preview.dry_run)
+        self.assertEqual(preview.total_created, 8)
+        self.assertEqual(preview.created['sections'], ['5th-A'])
+        self.assertFalse(SchoolClass.objects.filter(session=self.target).exists())
+
+        result = rollover_session(
+            school=self.school,
+            source=self.source,
+            target=self.target,
+            include_timetable=True,
+            dry_run=False,
+        )
+        self.assertEqual(result.total_created, 8)
+
+        target_class = SchoolClass.objects.get(session=self.target, name='5th')
+        self.assertEqual(Section.objects.get(school_class=target_class).capacity, 40)
+        self.assertEqual(ClassSubject.objects.get(school_class=target_class).periods_per_week, 6)
+        self.assertEqual(AcademicConfig.objects.get(session=self.target).working_days, ['monday', 'tuesday'])
+        self.assertTrue(GradeScale.objects.filter(session=self.target, grade_name='A').exists())
+        entry = TimetableEntry.objects.get(session=self.target)
+        self.assertEqual(entry.school_class_id, target_class.id)
+        self.assertEqual(entry.period.session_id, self.target.id)
+        self.assertEqual(entry.section.school_class_id, target_class.id)
+
+        again = rollover_session(school=self.school, source=self.source, target=self.target, include_timetable=True)
+        self.assertEqual(again.total_created, 0)
+        self.assertEqual(again.skipped['timetable'], 1)
+
+    def test_management_command_dry_run_and_commit(self):
+        out = StringIO()
+        call_command(
+            'rollover_session',
+            school='rollover_school',
+            source='2025-26',
+            target='2026-27',
+            dry_run=True,
+            stdout=out,
+        )
+        self.assertIn('Would create 6 row(s) in 2026-27.', out.getvalue())
+        self.assertFalse(Period.objects.filter(session=self.target).exists())
+
+        call_command('rollover_session', school='rollover_school', source='2025-26', target='2026-27', stdout=StringIO())
+        self.assertTrue(Period.objects.filter(session=self.target, period_number=1).exists())
+        self.assertFalse(TimetableEntry.objects.filter(session=self.target).exists())
+
+    def test_rollover_view_previews_before_copying(self):
+        get_user_model().objects.create_user(
+            username='rollover_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+        self.client.login(username='rollover_admin', password='pass12345')
+        url = reverse('session_rollover', args=[self.target.id])
+
+        response = self.client.post(url, {'source': self.source.id, 'action': 'preview'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '5th-A')
+        self.assertFalse(SchoolClass.objects.filter(session=self.target).exists())
+
+        response = self.client.post(url, {'source': self.source.id, 'action': 'commit'})
+        self.assertRedirects(response, reverse('session_list'))
+        self.assertTrue(SchoolClass.objects.filter(session=self.target, name='5th').exists())
@@ -5,6 +5,7 @@ from .views import (
     session_create,
     session_delete,
     session_list,
+    session_rollover,
     session_update,
 )
 
@@ -14,4 +15,5 @@ urlpatterns = [
     path('<int:pk>/edit/', session_update, name='session_update'),
     path('<int:pk>/delete/', session_delete, name='session_delete'),
     path('<int:pk>/activate/', session_activate, name='session_activate'),
+    path('<int:pk>/rollover/', session_rollover, name='session_rollover'),
 ]
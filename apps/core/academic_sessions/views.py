@@ -1,12 +1,15 @@
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST
 
 from apps.core.users.audit import log_audit_event
 from apps.core.users.decorators import role_required
 
-from .forms import AcademicSessionForm
+from .forms import AcademicSessionForm, SessionRolloverForm
 from .models import AcademicSession
+from .rollover import rollover_session
 from .services import activate_session
 
 
@@ -108,3 +111,47 @@ def session_activate(request, pk):
         details=f"Activated session {session.name}",
     )
     return redirect('session_list')
+
+
+@login_required
+@role_required('schooladmin')
+def session_rollover(request, pk):
+    school = request.user.school
+    target = get_object_or_404(
+        AcademicSession,
+        pk=pk,
+        school=school
+    )
+
+    form = SessionRolloverForm(request.POST or None, school=school, target=target)
+    result = None
+    if request.method == 'POST' and form.is_valid():
+        source = form.cleaned_data['source']
+        commit = request.POST.get('action') == 'commit'
+        try:
+            result = rollover_session(
+                school=school,
+                source=source,
+                target=target,
+                include_timetable=form.cleaned_data['include_timetable'],
+                dry_run=not commit,
+            )
+        except ValidationError as exc:
+            form.add_error(None, exc)
+        else:
+            if commit:
+                log_audit_event(
+                    request=request,
+                    action='session.rolled_over',
+                    school=school,
+                    target=target,
+                    details=f"Source={source.id}, Created={result.total_created}",
+                )
+                messages.success(request, f"Copied {result.total_created} record(s) from {source.name}.")
+                return redirect('session_list')
+
+    return render(request, 'academic_sessions/session_rollover.html', {
+        'form': form,
+        'target': target,
+        'result': result,
+    })
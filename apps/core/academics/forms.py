@@ -86,6 +86,7 @@ class ClassSubjectForm(forms.ModelForm):
         self.school = kwargs.pop('school', None)
         self.session = kwargs.pop('session', None)
         super().__init__(*args, **kwargs)
+        self.fields['periods_per_week'].required = False
 
         if self.school:
             classes = SchoolClass.objects.filter(
@@ -104,7 +105,7 @@ class ClassSubjectForm(forms.ModelForm):
 
     class Meta:
         model = ClassSubject
-        fields = ['school_class', 'subject', 'is_compulsory', 'max_marks', 'pass_marks']
+        fields = ['school_class', 'subject', 'is_compulsory', 'max_marks', 'pass_marks', 'periods_per_week']
 
     def clean_school_class(self):
         school_class = self.cleaned_data.get('school_class')
@@ -112,6 +113,9 @@ class ClassSubjectForm(forms.ModelForm):
             raise ValidationError('Selected class does not belong to your school.')
         return school_class
 
+    def clean_periods_per_week(self):
+        return self.cleaned_data.get('periods_per_week') or 0
+
     def clean_subject(self):
         subject = self.cleaned_data.get('subject')
         if self.school and subject and subject.school_id != self.school.id:
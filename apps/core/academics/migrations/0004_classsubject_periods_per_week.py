@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0003_academicconfig_classsubject_period_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classsubject',
+            name='periods_per_week',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+    ]
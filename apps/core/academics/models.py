@@ -181,6 +181,7 @@ class ClassSubject(models.Model):
     is_compulsory = models.BooleanField(default=True)
     max_marks = models.DecimalField(max_digits=7, decimal_places=2, default=Decimal('100'))
     pass_marks = models.DecimalField(max_digits=7, decimal_places=2, default=Decimal('33'))
+    periods_per_week = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -1,10 +1,12 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_POST
 
 from apps.core.academic_sessions.models import AcademicSession
+from apps.core.students.services import sync_class_student_subjects
 from apps.core.users.audit import log_audit_event
 from apps.core.users.decorators import role_required
 
@@ -19,6 +21,11 @@ from .forms import (
 from .models import AcademicConfig, ClassSubject, Period, SchoolClass, Section, Subject
 
 
+def _sync_mapping_students(request, school_classes, message):
+    touched = sum(sync_class_student_subjects(school_class) for school_class in school_classes)
+    messages.success(request, f"{message} Updated subjects for {touched} student(s).")
+
+
 def _school_sessions(school):
     return AcademicSession.objects.filter(school=school).order_by('-start_date')
 
@@ -275,7 +282,13 @@ def subject_update(request, pk):
 @require_POST
 def subject_deactivate(request, pk):
     subject = get_object_or_404(Subject, pk=pk, school=request.user.school)
-    subject.delete()
+    with transaction.atomic():
+        subject.delete()
+        _sync_mapping_students(
+            request,
+            SchoolClass.objects.filter(class_subjects__subject=subject).distinct(),
+            'Subject deactivated.',
+        )
     log_audit_event(
         request=request,
         action='academics.subject_deactivated',
@@ -319,7 +332,9 @@ def class_subject_create(request):
     if request.method == 'POST':
         form = ClassSubjectForm(request.POST, school=school, session=selected_session)
         if form.is_valid():
-            mapping = form.save()
+            with transaction.atomic():
+                mapping = form.save()
+                _sync_mapping_students(request, [mapping.school_class], 'Subject mapping added.')
             log_audit_event(
                 request=request,
                 action='academics.class_subject_created',
@@ -342,6 +357,8 @@ def class_subject_create(request):
 def class_subject_update(request, pk):
     school = request.user.school
     mapping = get_object_or_404(ClassSubject, pk=pk, school_class__school=school)
+    # Validation copies the posted class onto ``mapping``; keep the stored one.
+    previous_class = mapping.school_class
 
     if request.method == 'POST':
         form = ClassSubjectForm(
@@ -351,7 +368,9 @@ def class_subject_update(request, pk):
             session=mapping.school_class.session,
         )
         if form.is_valid():
-            mapping = form.save()
+            with transaction.atomic():
+                mapping = form.save()
+                _sync_mapping_students(request, {previous_class, mapping.school_class}, 'Subject mapping updated.')
             log_audit_event(
                 request=request,
                 action='academics.class_subject_updated',
@@ -378,7 +397,9 @@ def class_subject_delete(request, pk):
         target=mapping,
         details=f"Class={mapping.school_class_id}, Subject={mapping.subject_id}",
     )
-    mapping.delete()
+    with transaction.atomic():
+        mapping.delete()
+        _sync_mapping_students(request, [mapping.school_class], 'Subject mapping removed.')
     return redirect('class_subject_list')
 
 
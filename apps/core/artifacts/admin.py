@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import GeneratedArtifact
+
+
+@admin.register(GeneratedArtifact)
+class GeneratedArtifactAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'scope', 'school', 'size', 'last_accessed_at')
+    list_filter = ('school', 'kind')
+    search_fields = ('scope', 'content_hash')
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ArtifactsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core.artifacts'
+    label = 'core_artifacts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,18 @@
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .services import ArtifactDocument, get_or_render_artifact
+
+
+def artifact_pdf_response(request, *, school, document: ArtifactDocument, filename: str):
+    etag = quote_etag(document.content_hash)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        content = get_or_render_artifact(school=school, document=document)
+        response = HttpResponse(content, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
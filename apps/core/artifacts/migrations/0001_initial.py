@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('schools', '0003_schooldomain_alter_school_options_school_code_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeneratedArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('report_card', 'Report Card'), ('fee_receipt', 'Fee Receipt'), ('id_card', 'ID Card'), ('class_timetable', 'Class Timetable')], max_length=30)),
+                ('scope', models.CharField(max_length=64)),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(max_length=255, upload_to='artifacts/')),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_accessed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='generated_artifacts', to='schools.school')),
+            ],
+            options={
+                'ordering': ['-last_accessed_at'],
+                'indexes': [models.Index(fields=['scope'], name='core_artifa_scope_f88c9a_idx'), models.Index(fields=['last_accessed_at'], name='core_artifa_last_ac_788fa0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils import timezone
+
+from apps.core.schools.models import School
+
+
+class GeneratedArtifact(models.Model):
+    KIND_REPORT_CARD = 'report_card'
+    KIND_FEE_RECEIPT = 'fee_receipt'
+    KIND_ID_CARD = 'id_card'
+    KIND_CLASS_TIMETABLE = 'class_timetable'
+    KIND_CHOICES = (
+        (KIND_REPORT_CARD, 'Report Card'),
+        (KIND_FEE_RECEIPT, 'Fee Receipt'),
+        (KIND_ID_CARD, 'ID Card'),
+        (KIND_CLASS_TIMETABLE, 'Class Timetable'),
+    )
+
+    school = models.ForeignKey(
+        School,
+        on_delete=models.CASCADE,
+        related_name='generated_artifacts',
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    scope = models.CharField(max_length=64)
+    content_hash = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='artifacts/', max_length=255)
+    size = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_accessed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-last_accessed_at']
+        indexes = [
+            models.Index(fields=['scope']),
+            models.Index(fields=['last_accessed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.scope} ({self.content_hash[:12]})"
@@ -0,0 +1,144 @@
+"""Content-addressed cache for generated documents kept on the media storage."""
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import GeneratedArtifact
+
+
+ACCESS_TOUCH_INTERVAL = timedelta(minutes=1)
+
+
+@dataclass
+class ArtifactDocument:
+    kind: str
+    template_version: int
+    scope: str
+    source: Any
+    render: Callable[[], bytes]
+
+    @property
+    def content_hash(self) -> str:
+        return artifact_hash(self.kind, self.template_version, self.source)
+
+
+def student_scope(student_id) -> str:
+    return f"student:{student_id}"
+
+
+def section_scope(section_id) -> str:
+    return f"section:{section_id}"
+
+
+def artifact_hash(kind, template_version, source) -> str:
+    encoded = json.dumps(
+        [kind, template_version, source],
+        sort_keys=True,
+        default=str,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _discard(artifacts):
+    artifact_ids = []
+    for artifact in artifacts:
+        artifact_ids.append(artifact.id)
+        try:
+            artifact.file.delete(save=False)
+        except OSError:
+            pass
+    if artifact_ids:
+        GeneratedArtifact.objects.filter(id__in=artifact_ids).delete()
+    return len(artifact_ids)
+
+
+def load_artifact(content_hash: str):
+    artifact = GeneratedArtifact.objects.filter(content_hash=content_hash).first()
+    if not artifact:
+        return None
+
+    try:
+        with artifact.file.open('rb') as artifact_file:
+            content = artifact_file.read()
+    except OSError:
+        _discard([artifact])
+        return None
+
+    now = timezone.now()
+    if now - artifact.last_accessed_at >= ACCESS_TOUCH_INTERVAL:
+        GeneratedArtifact.objects.filter(pk=artifact.pk).update(last_accessed_at=now)
+    return content
+
+
+def store_artifact(*, school, document: ArtifactDocument, content: bytes):
+    content_hash = document.content_hash
+    artifact = GeneratedArtifact(
+        school=school,
+        kind=document.kind,
+        scope=document.scope,
+        content_hash=content_hash,
+        size=len(content),
+    )
+    artifact.file.save(
+        f"{document.kind}/{content_hash[:2]}/{content_hash}.pdf",
+        ContentFile(content),
+        save=False,
+    )
+    try:
+        with transaction.atomic():
+            artifact.save()
+    except IntegrityError:
+        # A concurrent request stored the same document first.
+        artifact.file.delete(save=False)
+        return None
+
+    enforce_artifact_cache_limit()
+    return artifact
+
+
+def get_or_render_artifact(*, school, document: ArtifactDocument) -> bytes:
+    content = load_artifact(document.content_hash)
+    if content is None:
+        content = document.render()
+        store_artifact(school=school, document=document, content=content)
+    return content
+
+
+def invalidate_artifacts(*, scope=None, scopes=None, kind=None, school_id=None):
+    artifacts = GeneratedArtifact.objects.all()
+    if scope is not None:
+        artifacts = artifacts.filter(scope=scope)
+    if scopes is not None:
+        artifacts = artifacts.filter(scope__in=list(scopes))
+    if kind is not None:
+        artifacts = artifacts.filter(kind=kind)
+    if school_id is not None:
+        artifacts = artifacts.filter(school_id=school_id)
+    return _discard(artifacts.only('id', 'file'))
+
+
+def enforce_artifact_cache_limit(max_bytes=None):
+    """Evict least recently used artifacts until the cache fits ``max_bytes``."""
+    if max_bytes is None:
+        max_bytes = settings.ARTIFACT_CACHE_MAX_BYTES
+
+    total = GeneratedArtifact.objects.aggregate(total=Sum('size'))['total'] or 0
+    if total <= max_bytes:
+        return 0
+
+    evicted = []
+    for artifact in GeneratedArtifact.objects.order_by('last_accessed_at', 'id').only('id', 'file', 'size').iterator():
+        if total <= max_bytes:
+            break
+        evicted.append(artifact)
+        total -= artifact.size
+    return _discard(evicted)
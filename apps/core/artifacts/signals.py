@@ -0,0 +1,49 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.academics.models import Period
+from apps.core.exams.models import ExamResultSummary, StudentMark
+from apps.core.hr.models import Substitution
+from apps.core.students.models import Student
+from apps.core.timetable.models import TimetableEntry
+
+from .models import GeneratedArtifact
+from .services import invalidate_artifacts, section_scope, student_scope
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_artifacts(sender, instance, **kwargs):
+    invalidate_artifacts(scope=student_scope(instance.pk))
+
+
+@receiver(post_save, sender=StudentMark)
+@receiver(post_delete, sender=StudentMark)
+@receiver(post_save, sender=ExamResultSummary)
+@receiver(post_delete, sender=ExamResultSummary)
+def invalidate_exam_artifacts(sender, instance, **kwargs):
+    invalidate_artifacts(scope=student_scope(instance.student_id), kind=GeneratedArtifact.KIND_REPORT_CARD)
+
+
+@receiver(post_save, sender=TimetableEntry)
+@receiver(post_delete, sender=TimetableEntry)
+@receiver(post_save, sender=Substitution)
+@receiver(post_delete, sender=Substitution)
+def invalidate_section_timetable_artifacts(sender, instance, **kwargs):
+    invalidate_artifacts(scope=section_scope(instance.section_id), kind=GeneratedArtifact.KIND_CLASS_TIMETABLE)
+
+
+@receiver(post_save, sender=Period)
+@receiver(post_delete, sender=Period)
+def invalidate_school_timetable_artifacts(sender, instance, **kwargs):
+    invalidate_artifacts(kind=GeneratedArtifact.KIND_CLASS_TIMETABLE, school_id=instance.school_id)
+
+
+if apps.is_installed('apps.core.fees'):
+    from apps.core.fees.models import FeePayment, FeeReceipt
+
+    @receiver(post_save, sender=FeePayment)
+    @receiver(post_save, sender=FeeReceipt)
+    def invalidate_fee_artifacts(sender, instance, **kwargs):
+        invalidate_artifacts(scope=student_scope(instance.student_id), kind=GeneratedArtifact.KIND_FEE_RECEIPT)
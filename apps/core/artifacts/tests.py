@@ -0,0 +1,113 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core.academic_sessions.models import AcademicSession
+from apps.core.academics.models import SchoolClass, Section
+from apps.core.schools.models import School
+from apps.core.students.models import Student
+
+from .models import GeneratedArtifact
+from .services import ArtifactDocument, enforce_artifact_cache_limit, store_artifact
+
+
+TEST_MEDIA_ROOT = tempfile.mkdtemp(prefix='artifacts_core_tests_')
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ArtifactCacheTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.school = School.objects.create(name='Artifact School', code='artifact_school')
+        self.session = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+            is_active=True,
+        )
+        self.school_class = SchoolClass.objects.create(
+            school=self.school,
+            session=self.session,
+            name='6th',
+            code='VI',
+        )
+        self.section = Section.objects.create(school_class=self.school_class, name='A')
+        self.student = Student.objects.create(
+            school=self.school,
+            session=self.session,
+            admission_number='ART-1',
+            first_name='Kavya',
+            admission_type=Student.ADMISSION_FRESH,
+            current_class=self.school_class,
+            current_section=self.section,
+            roll_number='1',
+        )
+        get_user_model().objects.create_user(
+            username='artifact_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+        self.client.login(username='artifact_admin', password='pass12345')
+
+    def _document(self, source, scope='student:0'):
+        return ArtifactDocument(
+            kind=GeneratedArtifact.KIND_ID_CARD,
+            template_version=1,
+            scope=scope,
+            source=source,
+            render=lambda: b'%PDF-' + str(source).encode(),
+        )
+
+    def test_id_card_download_is_rendered_once_and_revalidated_by_etag(self):
+        url = reverse('student_id_card_download', args=[self.student.id])
+        with mock.patch(
+            'apps.core.students.services.generate_id_card_pdf',
+            return_value=b'%PDF-card',
+        ) as render:
+            first = self.client.get(url)
+            second = self.client.get(url)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.content, b'%PDF-card')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(GeneratedArtifact.objects.count(), 1)
+
+    def test_student_change_invalidates_cached_id_card(self):
+        url = reverse('student_id_card_download', args=[self.student.id])
+        first = self.client.get(url)
+        self.assertEqual(GeneratedArtifact.objects.count(), 1)
+
+        self.student.first_name = 'Kavitha'
+        self.student.save()
+        self.assertFalse(GeneratedArtifact.objects.exists())
+
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+
+    def test_size_cap_evicts_least_recently_used_artifacts(self):
+        with override_settings(ARTIFACT_CACHE_MAX_BYTES=10 ** 6):
+            oldest = store_artifact(school=self.school, document=self._document('a'), content=b'x' * 40)
+            recent = store_artifact(school=self.school, document=self._document('b'), content=b'y' * 40)
+        GeneratedArtifact.objects.filter(pk=oldest.pk).update(last_accessed_at=timezone.now() - timedelta(days=1))
+
+        evicted = enforce_artifact_cache_limit(max_bytes=50)
+
+        self.assertEqual(evicted, 1)
+        self.assertEqual(list(GeneratedArtifact.objects.values_list('id', flat=True)), [recent.id])
+        self.assertFalse(oldest.file.storage.exists(oldest.file.name))
@@ -5,3 +5,6 @@ class AttendanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core.attendance'
     label = 'core_attendance'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -505,3 +505,44 @@ class DailyAbsenteeReportForm(forms.Form):
         if section and school_class and section.school_class_id != school_class.id:
             raise ValidationError('Selected section does not belong to selected class.')
         return cleaned_data
+
+
+class UnmarkedPeriodReportForm(forms.Form):
+    session = forms.ModelChoiceField(queryset=AcademicSession.objects.none())
+    date_from = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    teacher = forms.ModelChoiceField(queryset=Staff.objects.none(), required=False)
+
+    def __init__(self, *args, **kwargs):
+        self.school = kwargs.pop('school', None)
+        self.default_session = kwargs.pop('default_session', None)
+        super().__init__(*args, **kwargs)
+
+        self.fields['session'].queryset = AcademicSession.objects.none()
+        self.fields['teacher'].queryset = Staff.objects.none()
+
+        if not self.school:
+            return
+
+        self.fields['session'].queryset = _school_sessions(self.school)
+        self.fields['teacher'].queryset = Staff.objects.filter(
+            school=self.school,
+            is_active=True,
+            user__role='teacher',
+        ).select_related('user').order_by('employee_id')
+
+        if not self.is_bound:
+            today = date.today()
+            self.initial.setdefault('date_from', today.replace(day=1))
+            self.initial.setdefault('date_to', today)
+            if self.default_session:
+                self.initial.setdefault('session', self.default_session.id)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get('date_from')
+        date_to = cleaned_data.get('date_to')
+
+        if date_from and date_to and date_from > date_to:
+            raise ValidationError('From date must be before or equal to to date.')
+        return cleaned_data
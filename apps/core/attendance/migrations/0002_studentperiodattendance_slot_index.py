@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_attendance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentperiodattendance',
+            index=models.Index(fields=['school', 'session', 'date', 'section', 'period'], name='core_attend_school__99967c_idx'),
+        ),
+    ]
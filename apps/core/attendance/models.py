@@ -187,6 +187,7 @@ class StudentPeriodAttendance(models.Model):
         ]
         indexes = [
             models.Index(fields=['school', 'session', 'date', 'period']),
+            models.Index(fields=['school', 'session', 'date', 'section', 'period']),
             models.Index(fields=['school', 'session', 'school_class', 'section']),
         ]
 
@@ -14,14 +14,17 @@ from django.db.models import Count, Q
 from django.utils import timezone
 
 from apps.core.academics.models import AcademicConfig, SchoolClass, Section
-from apps.core.hr.models import ClassTeacher, Staff, StaffAttendance
+from apps.core.hr.models import ClassTeacher, Staff, StaffAttendance, Substitution
 from apps.core.students.models import Student, StudentSessionRecord
 from apps.core.timetable.models import TimetableEntry
-from apps.core.timetable.services import resolve_effective_teacher, teacher_can_handle_slot
+from apps.core.timetable.services import resolve_effective_teacher, substitutions_for_day, teacher_can_handle_slot
 
 from .models import StudentAttendance, StudentAttendanceSummary, StudentPeriodAttendance
 
 
+UNMARKED_REPORT_MAX_DAYS = 93
+
+
 def _staff_edit_hours() -> int:
     return int(getattr(settings, 'STAFF_ATTENDANCE_EDIT_WINDOW_HOURS', 6))
 
@@ -276,6 +279,7 @@ def mark_student_period_attendance_bulk(
     status_by_student_id,
     marked_by,
     allow_override=False,
+    substitutions=None,
 ):
     resolved_session = _resolve_session(school, session)
     _ensure_session_editable(resolved_session, allow_override=allow_override)
@@ -307,14 +311,22 @@ def mark_student_period_attendance_bulk(
     if not entry:
         raise ValidationError('No active timetable entry found for selected class-section-day-period.')
 
+    if substitutions is None:
+        substitutions = substitutions_for_day(school=school, session=resolved_session, target_date=target_date)
+
     if marked_by.role != 'schooladmin':
         actor_staff = _staff_profile_for_user(marked_by, school)
         if not actor_staff:
             raise ValidationError('No active staff profile is linked to this user.')
-        if not teacher_can_handle_slot(entry=entry, teacher=actor_staff, target_date=target_date):
+        if not teacher_can_handle_slot(
+            entry=entry,
+            teacher=actor_staff,
+            target_date=target_date,
+            substitutions=substitutions,
+        ):
             raise ValidationError('Teacher is not allowed to mark this period attendance slot.')
 
-    effective_teacher, substitution = resolve_effective_teacher(entry, target_date)
+    effective_teacher, substitution = resolve_effective_teacher(entry, target_date, substitutions)
 
     allowed_student_ids = set(
         _student_queryset_for_class_section(
@@ -485,6 +497,10 @@ def _month_bounds(year, month):
 
 def _working_day_keys_for_session(session):
     config = AcademicConfig.objects.filter(school=session.school, session=session).first()
+    return _working_day_keys(config)
+
+
+def _working_day_keys(config):
     if config and isinstance(config.working_days, list) and config.working_days:
         return set(config.working_days)
     return {'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday'}
@@ -492,6 +508,10 @@ def _working_day_keys_for_session(session):
 
 def _count_working_days(session, year, month):
     start, end = _month_bounds(year, month)
+    return _count_working_days_between(session, start, end)
+
+
+def _count_working_days_between(session, start, end):
     if end < session.start_date or start > session.end_date:
         return 0
 
@@ -508,6 +528,41 @@ def _count_working_days(session, year, month):
     return total
 
 
+def session_attendance_percentages(*, session, student_ids, upto=None):
+    """Return session-to-date attendance % per student id from one aggregate query.
+
+    Students with no attendance marked in the session map to ``None``.
+    """
+    student_ids = list(student_ids)
+    if not student_ids:
+        return {}
+
+    upto = min(upto or timezone.localdate(), session.end_date)
+    total_working_days = _count_working_days_between(session, session.start_date, upto)
+
+    rows = StudentAttendance.objects.filter(
+        school_id=session.school_id,
+        session=session,
+        student_id__in=student_ids,
+        date__range=(session.start_date, upto),
+    ).values('student_id').annotate(
+        present_days=Count(
+            'id',
+            filter=Q(status__in=[StudentAttendance.STATUS_PRESENT, StudentAttendance.STATUS_LATE]),
+        ),
+    ).order_by()
+
+    percentages = dict.fromkeys(student_ids)
+    for row in rows:
+        percentage = Decimal('0.00')
+        if total_working_days > 0:
+            percentage = (
+                Decimal(row['present_days']) / Decimal(total_working_days) * Decimal('100')
+            ).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        percentages[row['student_id']] = min(percentage, Decimal('100.00'))
+    return percentages
+
+
 @transaction.atomic
 def calculate_student_monthly_summary(*, student, session, year, month):
     if student.school_id != session.school_id:
@@ -681,6 +736,141 @@ def daily_absentee_list(*, school, session, target_date, school_class=None, sect
     return qs.order_by('school_class__display_order', 'section__name', 'student__admission_number')
 
 
+def unmarked_period_report(*, school, session, date_from, date_to, teacher=None):
+    """Scheduled period slots with no student period attendance, grouped by responsible teacher.
+
+    Slots are every active timetable entry on each working day of the range
+    (up to today) for sections with enrolled students. They are anti-joined
+    against the distinct marked ``(section, date, period)`` triples, and each
+    missing slot is charged to its substitute when one covered it. Only
+    sessions configured for period-wise attendance have periods to mark.
+    """
+    if date_from > date_to:
+        raise ValidationError('From date must be before or equal to to date.')
+    if (date_to - date_from).days >= UNMARKED_REPORT_MAX_DAYS:
+        raise ValidationError(f"Select at most {UNMARKED_REPORT_MAX_DAYS} days.")
+    config = AcademicConfig.objects.filter(school=school, session=session).first()
+    if not config or config.attendance_type != AcademicConfig.ATTENDANCE_PERIOD:
+        raise ValidationError('Period-wise attendance is not enabled in academic config.')
+
+    date_from = max(date_from, session.start_date)
+    date_to = min(date_to, session.end_date, timezone.localdate())
+    report = {'scheduled': 0, 'marked': 0, 'missing': 0, 'teachers': []}
+    if date_from > date_to:
+        return report
+
+    working_keys = _working_day_keys(config)
+    dates_by_day = {}
+    current = date_from
+    while current <= date_to:
+        day_key = _weekday_key_safe(current)
+        if day_key in working_keys:
+            dates_by_day.setdefault(day_key, []).append(current)
+        current += timedelta(days=1)
+
+    enrolled_section_ids = set(
+        StudentSessionRecord.objects.filter(school=school, session=session)
+        .order_by()
+        .values_list('section_id', flat=True)
+        .distinct()
+    )
+    entries = TimetableEntry.objects.filter(
+        school=school,
+        session=session,
+        day_of_week__in=list(dates_by_day),
+        section_id__in=enrolled_section_ids,
+        is_active=True,
+    ).order_by().values_list(
+        'day_of_week',
+        'period_id',
+        'period__period_number',
+        'section_id',
+        'section__name',
+        'school_class__name',
+        'school_class__display_order',
+        'subject_id',
+        'subject__code',
+        'teacher_id',
+    )
+
+    marked = set(
+        StudentPeriodAttendance.objects.filter(
+            school=school,
+            session=session,
+            date__range=(date_from, date_to),
+        ).order_by().values_list('section_id', 'date', 'period_id').distinct()
+    )
+    substitutes = {
+        (sub_date, period_id, section_id, subject_id, original_id): substitute_id
+        for sub_date, period_id, section_id, subject_id, original_id, substitute_id in Substitution.objects.filter(
+            school=school,
+            session=session,
+            date__range=(date_from, date_to),
+            is_active=True,
+        ).order_by().values_list(
+            'date',
+            'period_id',
+            'section_id',
+            'subject_id',
+            'original_teacher_id',
+            'substitute_teacher_id',
+        )
+    }
+
+    missing_by_teacher = {}
+    for (
+        day_key,
+        period_id,
+        period_number,
+        section_id,
+        section_name,
+        class_name,
+        display_order,
+        subject_id,
+        subject_code,
+        teacher_id,
+    ) in entries:
+        for slot_date in dates_by_day[day_key]:
+            substitute_id = substitutes.get((slot_date, period_id, section_id, subject_id, teacher_id))
+            responsible_id = substitute_id or teacher_id
+            if teacher is not None and responsible_id != teacher.id:
+                continue
+            report['scheduled'] += 1
+            if (section_id, slot_date, period_id) in marked:
+                report['marked'] += 1
+                continue
+            missing_by_teacher.setdefault(responsible_id, []).append({
+                'date': slot_date,
+                'period_number': period_number,
+                'class_name': class_name,
+                'section_name': section_name,
+                'subject_code': subject_code,
+                'substituting_for_id': teacher_id if substitute_id else None,
+                '_order': (slot_date, period_number, display_order, section_name),
+            })
+
+    staff_map = {
+        member.id: member
+        for member in Staff.objects.filter(
+            id__in=set(missing_by_teacher) | {
+                slot['substituting_for_id']
+                for slots in missing_by_teacher.values()
+                for slot in slots
+                if slot['substituting_for_id']
+            },
+        ).select_related('user')
+    }
+    for teacher_id, slots in missing_by_teacher.items():
+        slots.sort(key=lambda slot: slot['_order'])
+        for slot in slots:
+            del slot['_order']
+            slot['substituting_for'] = staff_map.get(slot.pop('substituting_for_id'))
+        report['missing'] += len(slots)
+        report['teachers'].append({'teacher': staff_map.get(teacher_id), 'slots': slots})
+    report['teachers'].sort(key=lambda row: (-len(row['slots']), row['teacher'].employee_id))
+    return report
+
+
 def students_below_threshold(*, school, session, threshold, year, month):
     summaries = StudentAttendanceSummary.objects.filter(
         school=school,
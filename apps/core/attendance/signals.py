@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.students.profile import bump_student_profile_versions
+
+from .models import StudentAttendance
+
+
+@receiver(post_save, sender=StudentAttendance)
+@receiver(post_delete, sender=StudentAttendance)
+def bump_student_profile_on_attendance_change(sender, instance, **kwargs):
+    bump_student_profile_versions([instance.student_id])
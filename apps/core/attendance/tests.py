@@ -19,6 +19,8 @@ from .services import (
     lock_attendance_records,
     mark_student_daily_attendance_bulk,
     mark_student_period_attendance_bulk,
+    session_attendance_percentages,
+    unmarked_period_report,
 )
 
 
@@ -360,6 +362,114 @@ class AttendanceServiceTests(AttendanceBaseTestCase):
         self.assertIsInstance(summary, StudentAttendanceSummary)
         self.assertGreaterEqual(summary.present_days, 2)
 
+    def test_session_attendance_percentages_are_batched(self):
+        upto = self.session_start + timedelta(days=6)
+        statuses = [StudentAttendance.STATUS_PRESENT, StudentAttendance.STATUS_LATE, StudentAttendance.STATUS_ABSENT]
+        for offset, status in enumerate(statuses):
+            StudentAttendance.objects.create(
+                school=self.school,
+                session=self.session,
+                student=self.student_1,
+                school_class=self.school_class,
+                section=self.section,
+                date=self.session_start + timedelta(days=offset),
+                status=status,
+                marked_by=self.teacher_user_1,
+            )
+
+        with self.assertNumQueries(2):
+            percentages = session_attendance_percentages(
+                session=self.session,
+                student_ids=[self.student_1.id, self.student_2.id],
+                upto=upto,
+            )
+
+        self.assertEqual(str(percentages[self.student_1.id]), '33.33')
+        self.assertIsNone(percentages[self.student_2.id])
+
+
+class UnmarkedPeriodReportTests(AttendanceBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.mondays = [self.monday - timedelta(days=14), self.monday - timedelta(days=7), self.monday]
+        self.config = AcademicConfig.objects.create(
+            school=self.school,
+            session=self.session,
+            working_days=['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday'],
+            attendance_type=AcademicConfig.ATTENDANCE_PERIOD,
+        )
+        mark_student_period_attendance_bulk(
+            school=self.school,
+            session=self.session,
+            school_class=self.school_class,
+            section=self.section,
+            target_date=self.mondays[1],
+            period=self.period_1,
+            status_by_student_id={self.student_1.id: StudentAttendance.STATUS_PRESENT},
+            marked_by=self.admin_user,
+        )
+        Substitution.objects.create(
+            school=self.school,
+            session=self.session,
+            date=self.mondays[2],
+            period=self.period_1,
+            school_class=self.school_class,
+            section=self.section,
+            subject=self.subject,
+            original_teacher=self.teacher_1,
+            substitute_teacher=self.teacher_2,
+            is_active=True,
+        )
+
+    def test_missing_slots_are_charged_to_effective_teacher(self):
+        with self.assertNumQueries(6):
+            report = unmarked_period_report(
+                school=self.school,
+                session=self.session,
+                date_from=self.mondays[0],
+                date_to=self.mondays[2] + timedelta(days=1),
+            )
+
+        self.assertEqual((report['scheduled'], report['marked'], report['missing']), (3, 1, 2))
+        by_teacher = {row['teacher'].id: row['slots'] for row in report['teachers']}
+        self.assertEqual([slot['date'] for slot in by_teacher[self.teacher_1.id]], [self.mondays[0]])
+        self.assertEqual([slot['date'] for slot in by_teacher[self.teacher_2.id]], [self.mondays[2]])
+        self.assertEqual(by_teacher[self.teacher_2.id][0]['substituting_for'], self.teacher_1)
+
+    def test_daily_attendance_school_has_no_unmarked_periods(self):
+        self.config.attendance_type = AcademicConfig.ATTENDANCE_DAILY
+        self.config.save(update_fields=['attendance_type'])
+
+        with self.assertRaisesMessage(ValidationError, 'Period-wise attendance is not enabled'):
+            unmarked_period_report(
+                school=self.school,
+                session=self.session,
+                date_from=self.mondays[0],
+                date_to=self.mondays[2],
+            )
+
+        self.client.login(username='attendance_teacher_2', password='pass12345')
+        response = self.client.get(reverse('attendance_report_unmarked'), {
+            'session': self.session.id,
+            'date_from': self.mondays[0].isoformat(),
+            'date_to': self.mondays[2].isoformat(),
+        })
+        self.assertContains(response, 'Period-wise attendance is not enabled')
+        self.assertIsNone(response.context['report'])
+
+    def test_teacher_view_is_limited_to_own_slots(self):
+        self.client.login(username='attendance_teacher_2', password='pass12345')
+        response = self.client.get(reverse('attendance_report_unmarked'), {
+            'session': self.session.id,
+            'date_from': self.mondays[0].isoformat(),
+            'date_to': self.mondays[2].isoformat(),
+            'teacher': self.teacher_1.id,
+        })
+        self.assertEqual(response.status_code, 200)
+        report = response.context['report']
+        self.assertEqual([row['teacher'] for row in report['teachers']], [self.teacher_2])
+        self.assertEqual(report['scheduled'], 1)
+
 
 class AttendanceViewTests(AttendanceBaseTestCase):
     def test_schooladmin_can_mark_daily_attendance_from_view(self):
@@ -7,6 +7,7 @@ from .views import (
     attendance_report_staff,
     attendance_report_student_monthly,
     attendance_report_threshold,
+    attendance_report_unmarked,
     attendance_staff_edit,
     attendance_staff_list,
     attendance_staff_mark,
@@ -29,4 +30,5 @@ urlpatterns = [
     path('reports/staff/', attendance_report_staff, name='attendance_report_staff'),
     path('reports/threshold/', attendance_report_threshold, name='attendance_report_threshold'),
     path('reports/absentees/', attendance_report_absentees, name='attendance_report_absentees'),
+    path('reports/unmarked/', attendance_report_unmarked, name='attendance_report_unmarked'),
 ]
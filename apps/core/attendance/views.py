@@ -12,8 +12,10 @@ from apps.core.academics.models import AcademicConfig
 from apps.core.hr.models import Staff, StaffAttendance
 from apps.core.students.models import Student
 from apps.core.timetable.models import TimetableEntry
+from apps.core.timetable.services import substitutions_for_day
 from apps.core.users.audit import log_audit_event
 from apps.core.users.decorators import role_required
+from apps.core.utils.pagination import keyset_paginate
 
 from .forms import (
     AttendanceLockForm,
@@ -26,6 +28,7 @@ from .forms import (
     StudentMonthlyReportForm,
     StudentPeriodAttendanceSelectionForm,
     ThresholdReportForm,
+    UnmarkedPeriodReportForm,
 )
 from .models import StudentAttendance, StudentPeriodAttendance
 from .services import (
@@ -41,6 +44,7 @@ from .services import (
     students_below_threshold,
     table_pdf_bytes,
     teacher_staff_attendance_report,
+    unmarked_period_report,
 )
 
 
@@ -170,9 +174,11 @@ def attendance_staff_list(request):
         else:
             attendances = attendances.filter(staff=actor_staff)
 
+    page = keyset_paginate(request, attendances, ('-date', 'staff__employee_id', 'id'))
     return render(request, 'attendance_core/staff_list.html', {
         'filter_form': filter_form,
-        'attendances': attendances.order_by('-date', 'staff__employee_id'),
+        'attendances': page.object_list,
+        'page': page,
         'actor_is_admin': actor_is_admin,
         'selected_session': selected_session,
     })
@@ -515,6 +521,12 @@ def attendance_student_period_mark(request):
                             status_by_student_id=status_by_student_id,
                             marked_by=request.user,
                             allow_override=request.user.role == 'schooladmin',
+                            substitutions=substitutions_for_day(
+                                school=school,
+                                session=selected_session,
+                                target_date=target_date,
+                                request=request,
+                            ),
                         )
                     except ValidationError as exc:
                         selection_form.add_error(None, '; '.join(exc.messages))
@@ -588,6 +600,13 @@ def attendance_student_period_mark(request):
             period=selected_period,
             is_active=True,
         ).select_related('subject', 'teacher', 'teacher__user').first()
+        if timetable_entry and active_substitution is None:
+            active_substitution = substitutions_for_day(
+                school=school,
+                session=selected_session,
+                target_date=target_date,
+                request=request,
+            ).for_entry(timetable_entry)
 
     return render(request, 'attendance_core/student_period_mark.html', {
         'selection_form': selection_form,
@@ -979,3 +998,72 @@ def attendance_report_absentees(request):
         'form': form,
         'records': records,
     })
+
+
+@login_required
+@role_required(['schooladmin', 'teacher'])
+def attendance_report_unmarked(request):
+    school = request.user.school
+    _, default_session = _session_from_request(request, school)
+    form = UnmarkedPeriodReportForm(
+        request.GET or None,
+        school=school,
+        default_session=default_session,
+    )
+    is_admin = request.user.role == 'schooladmin'
+    actor_staff = None if is_admin else _actor_staff(request.user)
+    if not is_admin:
+        form.fields['teacher'].widget = form.fields['teacher'].hidden_widget()
+        if not actor_staff:
+            messages.error(request, 'Your staff profile is not configured.')
+    report = None
+    selected_session = form.cleaned_data['session'] if form.is_valid() else default_session
+    period_mode = bool(selected_session) and (
+        _attendance_mode_for_session(school=school, session=selected_session) == AcademicConfig.ATTENDANCE_PERIOD
+    )
+
+    if period_mode and form.is_valid() and (is_admin or actor_staff):
+        cleaned = form.cleaned_data
+        try:
+            report = unmarked_period_report(
+                school=school,
+                session=cleaned['session'],
+                date_from=cleaned['date_from'],
+                date_to=cleaned['date_to'],
+                teacher=cleaned.get('teacher') if is_admin else actor_staff,
+            )
+        except ValidationError as exc:
+            form.add_error(None, exc)
+
+        export = request.GET.get('export')
+        if report and export in {'csv', 'pdf'}:
+            rows = [
+                [
+                    row['teacher'].employee_id,
+                    row['teacher'].full_name,
+                    slot['date'],
+                    slot['period_number'],
+                    f"{slot['class_name']}-{slot['section_name']}",
+                    slot['subject_code'],
+                    slot['substituting_for'].full_name if slot['substituting_for'] else '',
+                ]
+                for row in report['teachers']
+                for slot in row['slots']
+            ]
+            headers = ['Employee ID', 'Teacher', 'Date', 'Period', 'Class/Section', 'Subject', 'Substituting For']
+            title = f"Unmarked Periods ({cleaned['date_from']} to {cleaned['date_to']})"
+            response = _response_for_export(
+                title=title,
+                headers=headers,
+                rows=rows,
+                filename_base='unmarked_periods',
+                export_type=export,
+            )
+            if response:
+                return response
+
+    return render(request, 'attendance_core/report_unmarked.html', {
+        'form': form,
+        'report': report,
+        'period_mode': period_mode,
+    })
@@ -1,6 +1,16 @@
 from django.contrib import admin
 
-from .models import Exam, ExamResultSummary, ExamSubject, ExamType, GradeScale, StudentMark
+from .models import (
+    Exam,
+    ExamResultSummary,
+    ExamSubject,
+    ExamType,
+    GradeScale,
+    StudentMark,
+    TermAggregation,
+    TermAggregationComponent,
+    TermResultSummary,
+)
 
 
 @admin.register(ExamType)
@@ -52,3 +62,23 @@ class ExamResultSummaryAdmin(admin.ModelAdmin):
     list_display = ('exam', 'student', 'total_marks', 'percentage', 'grade', 'rank', 'result_status', 'is_locked')
     list_filter = ('school', 'session', 'exam', 'result_status', 'is_locked')
     search_fields = ('student__admission_number', 'student__first_name')
+
+
+class TermAggregationComponentInline(admin.TabularInline):
+    model = TermAggregationComponent
+    extra = 1
+
+
+@admin.register(TermAggregation)
+class TermAggregationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'school_class', 'session', 'is_stale', 'computed_at', 'is_active')
+    list_filter = ('school', 'session', 'is_stale', 'is_active')
+    search_fields = ('name', 'school_class__name')
+    inlines = [TermAggregationComponentInline]
+
+
+@admin.register(TermResultSummary)
+class TermResultSummaryAdmin(admin.ModelAdmin):
+    list_display = ('term', 'student', 'weighted_percentage', 'grade', 'rank', 'result_status')
+    list_filter = ('school', 'session', 'term', 'result_status')
+    search_fields = ('student__admission_number', 'student__first_name')
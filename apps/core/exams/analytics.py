@@ -0,0 +1,219 @@
+"""Exam-level mark statistics computed from a students x subjects matrix."""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from itertools import combinations
+
+from django.core.cache import cache
+
+from .models import Exam, ExamSubject, StudentMark
+
+
+ANALYTICS_CACHE_TIMEOUT = 60 * 60 * 24
+HISTOGRAM_BINS = 10
+PERCENTILE_BANDS = (10, 25, 50, 75, 90)
+
+
+@dataclass
+class MarkMatrix:
+    subjects: list = field(default_factory=list)
+    student_ids: list = field(default_factory=list)
+    sections: list = field(default_factory=list)
+    columns: list = field(default_factory=list)
+
+
+def exam_analytics_cache_key(exam_id) -> str:
+    return f"exams:analytics:{exam_id}"
+
+
+def invalidate_exam_analytics(exam_id):
+    cache.delete(exam_analytics_cache_key(exam_id))
+
+
+def load_mark_matrix(exam: Exam) -> MarkMatrix:
+    exam_subjects = list(
+        ExamSubject.objects.filter(exam=exam, is_active=True).select_related('subject').order_by('subject__name', 'id')
+    )
+    matrix = MarkMatrix(
+        subjects=[
+            {
+                'subject_id': row.subject_id,
+                'name': row.subject.name,
+                'max_marks': float(row.max_marks),
+                'pass_marks': float(row.pass_marks),
+            }
+            for row in exam_subjects
+        ],
+    )
+    matrix.columns = [[] for _ in exam_subjects]
+    subject_index = {row.subject_id: idx for idx, row in enumerate(exam_subjects)}
+    student_index = {}
+
+    marks = StudentMark.objects.filter(
+        exam=exam,
+        subject_id__in=subject_index,
+    ).order_by().values_list('student_id', 'subject_id', 'marks_obtained', 'student__current_section__name')
+
+    for student_id, subject_id, marks_obtained, section_name in marks.iterator():
+        row = student_index.get(student_id)
+        if row is None:
+            row = len(matrix.student_ids)
+            student_index[student_id] = row
+            matrix.student_ids.append(student_id)
+            matrix.sections.append(section_name or '-')
+            for column in matrix.columns:
+                column.append(None)
+        matrix.columns[subject_index[subject_id]][row] = float(marks_obtained)
+
+    return matrix
+
+
+def _round(value):
+    return None if value is None else round(value, 2)
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _histogram(values, max_marks):
+    counts = [0] * HISTOGRAM_BINS
+    width = max_marks / HISTOGRAM_BINS if max_marks > 0 else 0
+    for value in values:
+        index = int(value / width) if width else 0
+        counts[min(max(index, 0), HISTOGRAM_BINS - 1)] += 1
+    return [
+        {
+            'lower': _round(width * idx),
+            'upper': _round(width * (idx + 1)),
+            'count': count,
+        }
+        for idx, count in enumerate(counts)
+    ]
+
+
+def _column_stats(values, *, max_marks, pass_marks):
+    present = sorted(value for value in values if value is not None)
+    count = len(present)
+    if not count:
+        return {
+            'count': 0,
+            'mean': None,
+            'median': None,
+            'std': None,
+            'min': None,
+            'max': None,
+            'pass_rate': None,
+            'percentiles': {pct: None for pct in PERCENTILE_BANDS},
+            'histogram': _histogram([], max_marks),
+        }
+
+    mean = math.fsum(present) / count
+    variance = math.fsum((value - mean) ** 2 for value in present) / count
+    passed = count - _count_below(present, pass_marks)
+    return {
+        'count': count,
+        'mean': _round(mean),
+        'median': _round(_percentile(present, 50)),
+        'std': _round(math.sqrt(variance)),
+        'min': present[0],
+        'max': present[-1],
+        'pass_rate': _round(passed * 100 / count),
+        'percentiles': {pct: _round(_percentile(present, pct)) for pct in PERCENTILE_BANDS},
+        'histogram': _histogram(present, max_marks),
+    }
+
+
+def _count_below(sorted_values, threshold):
+    low, high = 0, len(sorted_values)
+    while low < high:
+        mid = (low + high) // 2
+        if sorted_values[mid] < threshold:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+def _pearson(xs, ys):
+    pairs = [(x, y) for x, y in zip(xs, ys) if x is not None and y is not None]
+    if len(pairs) < 2:
+        return None
+    count = len(pairs)
+    mean_x = math.fsum(x for x, _ in pairs) / count
+    mean_y = math.fsum(y for _, y in pairs) / count
+    cov = math.fsum((x - mean_x) * (y - mean_y) for x, y in pairs)
+    var_x = math.fsum((x - mean_x) ** 2 for x, _ in pairs)
+    var_y = math.fsum((y - mean_y) ** 2 for _, y in pairs)
+    if var_x == 0 or var_y == 0:
+        return None
+    return _round(cov / math.sqrt(var_x * var_y))
+
+
+def _section_comparison(matrix: MarkMatrix):
+    rows_by_section = {}
+    for row, section_name in enumerate(matrix.sections):
+        rows_by_section.setdefault(section_name, []).append(row)
+
+    comparison = []
+    for section_name in sorted(rows_by_section):
+        rows = rows_by_section[section_name]
+        subjects = []
+        for subject, column in zip(matrix.subjects, matrix.columns):
+            values = [column[row] for row in rows if column[row] is not None]
+            subjects.append({
+                'subject_id': subject['subject_id'],
+                'mean': _round(math.fsum(values) / len(values)) if values else None,
+                'pass_rate': (
+                    _round(sum(1 for value in values if value >= subject['pass_marks']) * 100 / len(values))
+                    if values else None
+                ),
+            })
+        comparison.append({
+            'section': section_name,
+            'students': len(rows),
+            'subjects': subjects,
+        })
+    return comparison
+
+
+def compute_exam_analytics(matrix: MarkMatrix) -> dict:
+    subjects = []
+    for subject, column in zip(matrix.subjects, matrix.columns):
+        subjects.append({
+            **subject,
+            **_column_stats(column, max_marks=subject['max_marks'], pass_marks=subject['pass_marks']),
+        })
+
+    correlations = [
+        {
+            'subject_a': matrix.subjects[a]['name'],
+            'subject_b': matrix.subjects[b]['name'],
+            'coefficient': _pearson(matrix.columns[a], matrix.columns[b]),
+        }
+        for a, b in combinations(range(len(matrix.subjects)), 2)
+    ]
+
+    return {
+        'student_count': len(matrix.student_ids),
+        'subjects': subjects,
+        'sections': _section_comparison(matrix),
+        'correlations': correlations,
+    }
+
+
+def exam_analytics(exam: Exam) -> dict:
+    cache_key = exam_analytics_cache_key(exam.id)
+    analytics = cache.get(cache_key)
+    if analytics is None:
+        analytics = compute_exam_analytics(load_mark_matrix(exam))
+        cache.set(cache_key, analytics, ANALYTICS_CACHE_TIMEOUT)
+    return analytics
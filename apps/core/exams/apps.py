@@ -5,3 +5,6 @@ class ExamsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core.exams'
     label = 'core_exams'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academic_sessions', '0005_rename_academic_se_school__b91eb8_idx_academic_se_school__56b97e_idx'),
+        ('academics', '0003_academicconfig_classsubject_period_and_more'),
+        ('core_exams', '0001_initial'),
+        ('core_students', '0001_initial'),
+        ('schools', '0003_schooldomain_alter_school_options_school_code_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermAggregation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_stale', models.BooleanField(default=True)),
+                ('computed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_aggregations', to='schools.school')),
+                ('school_class', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='term_aggregations', to='academics.schoolclass')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_aggregations', to='academic_sessions.academicsession')),
+            ],
+            options={
+                'ordering': ['school_class__display_order', 'name', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TermAggregationComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('exam_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='term_components', to='core_exams.examtype')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='components', to='core_exams.termaggregation')),
+            ],
+            options={
+                'ordering': ['exam_type__name', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TermResultSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weighted_percentage', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('grade', models.CharField(blank=True, max_length=20)),
+                ('rank', models.PositiveIntegerField(blank=True, null=True)),
+                ('result_status', models.CharField(choices=[('pass', 'Pass'), ('fail', 'Fail')], default='fail', max_length=10)),
+                ('components_counted', models.PositiveSmallIntegerField(default=0)),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_result_summaries', to='schools.school')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_result_summaries', to='academic_sessions.academicsession')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_result_summaries', to='core_students.student')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='core_exams.termaggregation')),
+            ],
+            options={
+                'ordering': ['rank', '-weighted_percentage', 'student__admission_number'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='termaggregation',
+            index=models.Index(fields=['school', 'session', 'school_class'], name='core_exams__school__be1b66_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='termaggregation',
+            constraint=models.UniqueConstraint(fields=('school', 'session', 'school_class', 'name'), name='unique_term_aggregation_per_class'),
+        ),
+        migrations.AddConstraint(
+            model_name='termaggregationcomponent',
+            constraint=models.UniqueConstraint(fields=('term', 'exam_type'), name='unique_term_component_exam_type'),
+        ),
+        migrations.AddIndex(
+            model_name='termresultsummary',
+            index=models.Index(fields=['school', 'session', 'term', 'rank'], name='core_exams__school__b997f7_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='termresultsummary',
+            constraint=models.UniqueConstraint(fields=('term', 'student'), name='unique_term_result_per_student'),
+        ),
+    ]
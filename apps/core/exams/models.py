@@ -522,3 +522,142 @@ class ExamResultSummary(models.Model):
 
     def __str__(self):
         return f"{self.student.admission_number} - {self.exam.id} ({self.percentage}%)"
+
+
+class TermAggregation(models.Model):
+    school = models.ForeignKey(
+        School,
+        on_delete=models.CASCADE,
+        related_name='term_aggregations',
+    )
+    session = models.ForeignKey(
+        AcademicSession,
+        on_delete=models.CASCADE,
+        related_name='term_aggregations',
+    )
+    objects = SchoolManager()
+
+    name = models.CharField(max_length=100)
+    school_class = models.ForeignKey(
+        SchoolClass,
+        on_delete=models.PROTECT,
+        related_name='term_aggregations',
+    )
+    is_active = models.BooleanField(default=True)
+    is_stale = models.BooleanField(default=True)
+    computed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['school_class__display_order', 'name', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['school', 'session', 'school_class', 'name'],
+                name='unique_term_aggregation_per_class',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['school', 'session', 'school_class']),
+        ]
+
+    def clean(self):
+        super().clean()
+        if self.session_id and self.session.school_id != self.school_id:
+            raise ValidationError({'session': 'Session must belong to selected school.'})
+
+        if self.school_class_id:
+            if self.school_class.school_id != self.school_id:
+                raise ValidationError({'school_class': 'Class must belong to selected school.'})
+            if self.session_id and self.school_class.session_id != self.session_id:
+                raise ValidationError({'school_class': 'Class must belong to selected session.'})
+
+    def __str__(self):
+        return f"{self.name} - {self.school_class.name} ({self.session.name})"
+
+
+class TermAggregationComponent(models.Model):
+    term = models.ForeignKey(
+        TermAggregation,
+        on_delete=models.CASCADE,
+        related_name='components',
+    )
+    exam_type = models.ForeignKey(
+        ExamType,
+        on_delete=models.PROTECT,
+        related_name='term_components',
+    )
+    weight = models.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        ordering = ['exam_type__name', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'exam_type'],
+                name='unique_term_component_exam_type',
+            ),
+        ]
+
+    def clean(self):
+        super().clean()
+        if self.term_id and self.exam_type_id:
+            if self.exam_type.school_id != self.term.school_id:
+                raise ValidationError({'exam_type': 'Exam type must belong to selected school.'})
+            if self.exam_type.session_id != self.term.session_id:
+                raise ValidationError({'exam_type': 'Exam type must belong to selected session.'})
+
+        if self.weight is not None and self.weight <= 0:
+            raise ValidationError({'weight': 'Weight must be greater than zero.'})
+
+    def __str__(self):
+        return f"{self.term.name}: {self.exam_type.name} x {self.weight}"
+
+
+class TermResultSummary(models.Model):
+    school = models.ForeignKey(
+        School,
+        on_delete=models.CASCADE,
+        related_name='term_result_summaries',
+    )
+    session = models.ForeignKey(
+        AcademicSession,
+        on_delete=models.CASCADE,
+        related_name='term_result_summaries',
+    )
+    objects = SchoolManager()
+
+    term = models.ForeignKey(
+        TermAggregation,
+        on_delete=models.CASCADE,
+        related_name='results',
+    )
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+        related_name='term_result_summaries',
+    )
+    weighted_percentage = models.DecimalField(max_digits=6, decimal_places=2)
+    grade = models.CharField(max_length=20, blank=True)
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    result_status = models.CharField(
+        max_length=10,
+        choices=ExamResultSummary.STATUS_CHOICES,
+        default=ExamResultSummary.STATUS_FAIL,
+    )
+    components_counted = models.PositiveSmallIntegerField(default=0)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['rank', '-weighted_percentage', 'student__admission_number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'student'],
+                name='unique_term_result_per_student',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['school', 'session', 'term', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.student.admission_number} - {self.term.name} ({self.weighted_percentage}%)"
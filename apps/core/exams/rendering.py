@@ -0,0 +1,55 @@
+from PIL import Image, ImageDraw
+
+
+def render_report_card_image(card: dict):
+    """Draw one report card page from a plain-data payload (no database access)."""
+    width = 1240
+    height = 1754
+    page = Image.new('RGB', (width, height), color='white')
+    draw = ImageDraw.Draw(page)
+
+    draw.rectangle((30, 30, width - 30, height - 30), outline='black', width=3)
+    draw.text((60, 60), f"{card['school_name']} - Report Card", fill='black')
+    draw.text((60, 110), f"Exam: {card['exam_name']}", fill='black')
+    draw.text((60, 150), f"Session: {card['session_name']}", fill='black')
+    draw.text((60, 190), f"Student: {card['student_name']} ({card['admission_number']})", fill='black')
+    draw.text((60, 230), f"Class: {card['class_name']}", fill='black')
+    draw.text((300, 230), f"Section: {card['section_name']}", fill='black')
+
+    draw.text((60, 285), 'Subject', fill='black')
+    draw.text((520, 285), 'Max', fill='black')
+    draw.text((640, 285), 'Pass', fill='black')
+    draw.text((760, 285), 'Obtained', fill='black')
+    draw.text((930, 285), 'Grade', fill='black')
+    draw.line((60, 310, width - 60, 310), fill='black')
+
+    y = 330
+    for subject_name, max_marks, pass_marks, obtained, grade in card['subjects']:
+        draw.text((60, y), subject_name, fill='black')
+        draw.text((520, y), max_marks, fill='black')
+        draw.text((640, y), pass_marks, fill='black')
+        draw.text((760, y), obtained, fill='black')
+        draw.text((930, y), grade, fill='black')
+        y += 38
+
+    y += 24
+    draw.line((60, y, width - 60, y), fill='black')
+    y += 24
+    draw.text((60, y), f"Total Marks: {card['total_marks']}", fill='black')
+    y += 36
+    draw.text((60, y), f"Percentage: {card['percentage']}%", fill='black')
+    y += 36
+    draw.text((60, y), f"Grade: {card['grade']}", fill='black')
+    y += 36
+    draw.text((60, y), f"Rank: {card['rank']}", fill='black')
+    y += 36
+    draw.text((60, y), f"Result Status: {card['result_status']}", fill='black')
+    y += 36
+    draw.text((60, y), f"Attendance %: {card['attendance_percentage']}", fill='black')
+    y += 60
+
+    draw.text((60, y), f"Teacher Remarks: {card['teacher_remarks']}", fill='black')
+    y += 120
+    draw.text((60, y), f"Principal Signature: {card['principal_signature']}", fill='black')
+
+    return page
@@ -1,17 +1,37 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from contextlib import contextmanager
 from decimal import Decimal, ROUND_HALF_UP
+from threading import local
 from typing import Iterable
 
-from PIL import Image, ImageDraw
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
 
-from apps.core.attendance.models import StudentAttendanceSummary
+from apps.core.artifacts.models import GeneratedArtifact
+from apps.core.artifacts.services import ArtifactDocument, student_scope
+from apps.core.attendance.services import session_attendance_percentages
 from apps.core.hr.models import Staff, TeacherSubjectAssignment
 from apps.core.students.models import Student, StudentSessionRecord, image_to_pdf_bytes
+from apps.core.utils.pdf import iter_pdf_bytes, iter_rendered_pages
 
-from .models import Exam, ExamResultSummary, ExamSubject, GradeScale, StudentMark
+from .models import (
+    Exam,
+    ExamResultSummary,
+    ExamSubject,
+    GradeScale,
+    StudentMark,
+    TermAggregation,
+    TermResultSummary,
+)
+from .rendering import render_report_card_image
+
+
+REPORT_CARD_TEMPLATE_VERSION = 1
+
+_deferred_staleness = local()
 
 
 def _quantize(value: Decimal) -> Decimal:
@@ -54,14 +74,7 @@ def grade_for_percentage(*, school, session, percentage: Decimal) -> str:
 
 
 def _attendance_percentage(student: Student, session) -> Decimal | None:
-    summary = StudentAttendanceSummary.objects.filter(
-        school=student.school,
-        session=session,
-        student=student,
-    ).order_by('-year', '-month').first()
-    if not summary:
-        return None
-    return summary.attendance_percentage
+    return session_attendance_percentages(session=session, student_ids=[student.id])[student.id]
 
 
 def _teacher_allowed_to_enter(*, user, exam: Exam, subject_id: int) -> bool:
@@ -179,7 +192,7 @@ def upsert_student_mark(
 
 
 @transaction.atomic
-def calculate_student_result(*, exam: Exam, student: Student, allow_override=False):
+def calculate_student_result(*, exam: Exam, student: Student, allow_override=False, attendance_percentages=None):
     exam_subjects = _active_exam_subjects(exam)
     if not exam_subjects:
         raise ValidationError('Cannot calculate result without active exam subjects.')
@@ -214,6 +227,10 @@ def calculate_student_result(*, exam: Exam, student: Student, allow_override=Fal
     if total_max > 0:
         percentage = _quantize((total_obtained / total_max) * Decimal('100'))
     grade = grade_for_percentage(school=exam.school, session=exam.session, percentage=percentage)
+    if attendance_percentages is not None:
+        attendance_percentage = attendance_percentages.get(student.id)
+    else:
+        attendance_percentage = _attendance_percentage(student, exam.session)
 
     summary, created = ExamResultSummary.objects.get_or_create(
         school=exam.school,
@@ -224,7 +241,7 @@ def calculate_student_result(*, exam: Exam, student: Student, allow_override=Fal
             'total_marks': _quantize(total_obtained),
             'percentage': percentage,
             'grade': grade,
-            'attendance_percentage': _attendance_percentage(student, exam.session),
+            'attendance_percentage': attendance_percentage,
             'result_status': ExamResultSummary.STATUS_PASS if all_passed else ExamResultSummary.STATUS_FAIL,
             'rank': None,
             'is_locked': exam.is_locked,
@@ -238,7 +255,7 @@ def calculate_student_result(*, exam: Exam, student: Student, allow_override=Fal
         summary.total_marks = _quantize(total_obtained)
         summary.percentage = percentage
         summary.grade = grade
-        summary.attendance_percentage = _attendance_percentage(student, exam.session)
+        summary.attendance_percentage = attendance_percentage
         summary.result_status = (
             ExamResultSummary.STATUS_PASS if all_passed else ExamResultSummary.STATUS_FAIL
         )
@@ -294,19 +311,30 @@ def generate_exam_results(*, exam: Exam, allow_override=False):
     if not students:
         raise ValidationError('No eligible students found for this exam.')
 
-    summaries = []
-    missing_errors = []
-    for student in students:
-        try:
-            summaries.append(calculate_student_result(exam=exam, student=student, allow_override=allow_override))
-        except ValidationError as exc:
-            missing_errors.extend(exc.messages)
-
-    if missing_errors:
-        raise ValidationError(missing_errors)
-
-    recalculate_exam_ranks(exam=exam, allow_override=allow_override)
-    return summaries
+    # Every summary save below would mark the exam's terms stale again.
+    with defer_term_staleness():
+        attendance_percentages = session_attendance_percentages(
+            session=exam.session,
+            student_ids=[student.id for student in students],
+        )
+        summaries = []
+        missing_errors = []
+        for student in students:
+            try:
+                summaries.append(calculate_student_result(
+                    exam=exam,
+                    student=student,
+                    allow_override=allow_override,
+                    attendance_percentages=attendance_percentages,
+                ))
+            except ValidationError as exc:
+                missing_errors.extend(exc.messages)
+
+        if missing_errors:
+            raise ValidationError(missing_errors)
+
+        recalculate_exam_ranks(exam=exam, allow_override=allow_override)
+        return summaries
 
 
 @transaction.atomic
@@ -332,67 +360,70 @@ def unlock_exam_results(*, exam: Exam, allow_override=False):
     return exam
 
 
-def build_report_card_image(*, summary: ExamResultSummary, teacher_remarks='', principal_signature=''):
-    width = 1240
-    height = 1754
-    page = Image.new('RGB', (width, height), color='white')
-    draw = ImageDraw.Draw(page)
+def _report_card_payload(*, summary, exam, student, exam_subjects, mark_map, teacher_remarks, principal_signature):
+    if exam.section_id:
+        section_name = exam.section.name
+    elif student.current_section_id:
+        section_name = student.current_section.name
+    else:
+        section_name = '-'
+
+    subjects = []
+    for row in exam_subjects:
+        mark = mark_map.get(row.subject_id)
+        subjects.append((
+            row.subject.name,
+            str(row.max_marks),
+            str(row.pass_marks),
+            str(mark[0] if mark else '-'),
+            mark[1] if mark else '-',
+        ))
+
+    return {
+        'school_name': exam.school.name,
+        'exam_name': exam.exam_type.name,
+        'session_name': exam.session.name,
+        'student_name': student.full_name,
+        'admission_number': student.admission_number,
+        'class_name': exam.school_class.name,
+        'section_name': section_name,
+        'subjects': subjects,
+        'total_marks': str(summary.total_marks),
+        'percentage': str(summary.percentage),
+        'grade': summary.grade or '-',
+        'rank': str(summary.rank or '-'),
+        'result_status': summary.get_result_status_display(),
+        'attendance_percentage': (
+            str(summary.attendance_percentage) if summary.attendance_percentage is not None else '-'
+        ),
+        'teacher_remarks': teacher_remarks or '-',
+        'principal_signature': principal_signature or '____________________',
+    }
 
+
+def report_card_payload(*, summary: ExamResultSummary, teacher_remarks='', principal_signature=''):
     exam = summary.exam
-    student = summary.student
-
-    draw.rectangle((30, 30, width - 30, height - 30), outline='black', width=3)
-    draw.text((60, 60), f"{summary.school.name} - Report Card", fill='black')
-    draw.text((60, 110), f"Exam: {exam.exam_type.name}", fill='black')
-    draw.text((60, 150), f"Session: {summary.session.name}", fill='black')
-    draw.text((60, 190), f"Student: {student.full_name} ({student.admission_number})", fill='black')
-    draw.text((60, 230), f"Class: {exam.school_class.name}", fill='black')
-    draw.text((300, 230), f"Section: {(exam.section.name if exam.section_id else student.current_section.name if student.current_section_id else '-')}", fill='black')
-
-    draw.text((60, 285), 'Subject', fill='black')
-    draw.text((520, 285), 'Max', fill='black')
-    draw.text((640, 285), 'Pass', fill='black')
-    draw.text((760, 285), 'Obtained', fill='black')
-    draw.text((930, 285), 'Grade', fill='black')
-    draw.line((60, 310, width - 60, 310), fill='black')
-
-    subject_rows = _active_exam_subjects(exam)
-    marks = {
-        row.subject_id: row
-        for row in StudentMark.objects.filter(exam=exam, student=student).select_related('subject')
+    mark_map = {
+        row.subject_id: (row.marks_obtained, row.grade)
+        for row in StudentMark.objects.filter(exam=exam, student=summary.student)
     }
+    return _report_card_payload(
+        summary=summary,
+        exam=exam,
+        student=summary.student,
+        exam_subjects=_active_exam_subjects(exam),
+        mark_map=mark_map,
+        teacher_remarks=teacher_remarks,
+        principal_signature=principal_signature,
+    )
+
 
-    y = 330
-    for row in subject_rows:
-        mark = marks.get(row.subject_id)
-        draw.text((60, y), row.subject.name, fill='black')
-        draw.text((520, y), str(row.max_marks), fill='black')
-        draw.text((640, y), str(row.pass_marks), fill='black')
-        draw.text((760, y), str(mark.marks_obtained if mark else '-'), fill='black')
-        draw.text((930, y), mark.grade if mark else '-', fill='black')
-        y += 38
-
-    y += 24
-    draw.line((60, y, width - 60, y), fill='black')
-    y += 24
-    draw.text((60, y), f"Total Marks: {summary.total_marks}", fill='black')
-    y += 36
-    draw.text((60, y), f"Percentage: {summary.percentage}%", fill='black')
-    y += 36
-    draw.text((60, y), f"Grade: {summary.grade or '-'}", fill='black')
-    y += 36
-    draw.text((60, y), f"Rank: {summary.rank or '-'}", fill='black')
-    y += 36
-    draw.text((60, y), f"Result Status: {summary.get_result_status_display()}", fill='black')
-    y += 36
-    draw.text((60, y), f"Attendance %: {summary.attendance_percentage if summary.attendance_percentage is not None else '-'}", fill='black')
-    y += 60
-
-    draw.text((60, y), f"Teacher Remarks: {teacher_remarks or '-'}", fill='black')
-    y += 120
-    draw.text((60, y), f"Principal Signature: {principal_signature or '____________________'}", fill='black')
-
-    return page
+def build_report_card_image(*, summary: ExamResultSummary, teacher_remarks='', principal_signature=''):
+    return render_report_card_image(report_card_payload(
+        summary=summary,
+        teacher_remarks=teacher_remarks,
+        principal_signature=principal_signature,
+    ))
 
 
 def generate_report_card_pdf(*, summary: ExamResultSummary, teacher_remarks='', principal_signature=''):
@@ -404,18 +435,249 @@ def generate_report_card_pdf(*, summary: ExamResultSummary, teacher_remarks='',
     return image_to_pdf_bytes([image])
 
 
+def report_card_document(*, summary: ExamResultSummary, teacher_remarks='', principal_signature=''):
+    payload = report_card_payload(
+        summary=summary,
+        teacher_remarks=teacher_remarks,
+        principal_signature=principal_signature,
+    )
+    return ArtifactDocument(
+        kind=GeneratedArtifact.KIND_REPORT_CARD,
+        template_version=REPORT_CARD_TEMPLATE_VERSION,
+        scope=student_scope(summary.student_id),
+        source=payload,
+        render=lambda: image_to_pdf_bytes([render_report_card_image(payload)]),
+    )
+
+
+def bulk_report_card_payloads(*, summaries: Iterable[ExamResultSummary], teacher_remarks='', principal_signature=''):
+    """Build report card payloads for many summaries with a fixed number of queries."""
+    summaries = list(summaries)
+    if not summaries:
+        return []
+
+    exam_ids = {summary.exam_id for summary in summaries}
+    student_ids = {summary.student_id for summary in summaries}
+
+    exams = {
+        exam.id: exam
+        for exam in Exam.objects.filter(id__in=exam_ids).select_related(
+            'school',
+            'session',
+            'exam_type',
+            'school_class',
+            'section',
+        )
+    }
+    students = {
+        student.id: student
+        for student in Student.objects.filter(id__in=student_ids).select_related('current_section')
+    }
+
+    subjects_by_exam = defaultdict(list)
+    for row in ExamSubject.objects.filter(
+        exam_id__in=exam_ids,
+        is_active=True,
+    ).select_related('subject').order_by('subject__name', 'id'):
+        subjects_by_exam[row.exam_id].append(row)
+
+    marks_by_student = defaultdict(dict)
+    for exam_id, student_id, subject_id, marks_obtained, grade in StudentMark.objects.filter(
+        exam_id__in=exam_ids,
+        student_id__in=student_ids,
+    ).values_list('exam_id', 'student_id', 'subject_id', 'marks_obtained', 'grade'):
+        marks_by_student[(exam_id, student_id)][subject_id] = (marks_obtained, grade)
+
+    return [
+        _report_card_payload(
+            summary=summary,
+            exam=exams[summary.exam_id],
+            student=students[summary.student_id],
+            exam_subjects=subjects_by_exam[summary.exam_id],
+            mark_map=marks_by_student[(summary.exam_id, summary.student_id)],
+            teacher_remarks=teacher_remarks,
+            principal_signature=principal_signature,
+        )
+        for summary in summaries
+    ]
+
+
+def stream_bulk_report_cards_pdf(
+    *,
+    summaries: Iterable[ExamResultSummary],
+    teacher_remarks='',
+    principal_signature='',
+    workers=None,
+):
+    payloads = bulk_report_card_payloads(
+        summaries=summaries,
+        teacher_remarks=teacher_remarks,
+        principal_signature=principal_signature,
+    )
+    return iter_pdf_bytes(iter_rendered_pages(render_report_card_image, payloads, workers=workers))
+
+
 def generate_bulk_report_cards_pdf(
     *,
     summaries: Iterable[ExamResultSummary],
     teacher_remarks='',
     principal_signature='',
 ):
-    pages = [
-        build_report_card_image(
-            summary=summary,
+    summaries = list(summaries)
+    if not summaries:
+        return b''
+    return b''.join(
+        stream_bulk_report_cards_pdf(
+            summaries=summaries,
             teacher_remarks=teacher_remarks,
             principal_signature=principal_signature,
         )
-        for summary in summaries
-    ]
-    return image_to_pdf_bytes(pages)
+    )
+
+
+def _grade_resolver(*, school, session):
+    scales = list(
+        GradeScale.objects.filter(
+            school=school,
+            session=session,
+            is_active=True,
+        ).order_by('display_order', '-max_percentage')
+    )
+
+    def resolve(percentage):
+        for scale in scales:
+            if scale.min_percentage <= percentage <= scale.max_percentage:
+                return scale.grade_name
+        return ''
+
+    return resolve
+
+
+@contextmanager
+def defer_term_staleness():
+    """Collect the exams whose results change in the block and mark their terms stale once at the end."""
+    if getattr(_deferred_staleness, 'exam_ids', None) is not None:
+        yield
+        return
+    _deferred_staleness.exam_ids = exam_ids = set()
+    try:
+        yield
+    finally:
+        _deferred_staleness.exam_ids = None
+    for exam_id in exam_ids:
+        mark_term_aggregations_stale(exam_id=exam_id)
+
+
+def mark_term_aggregations_stale(*, exam_id):
+    pending = getattr(_deferred_staleness, 'exam_ids', None)
+    if pending is not None:
+        pending.add(exam_id)
+        return 0
+    return TermAggregation.objects.filter(
+        is_stale=False,
+        school_class__exams__id=exam_id,
+        components__exam_type__exams__id=exam_id,
+    ).update(is_stale=True)
+
+
+@transaction.atomic
+def compute_term_results(*, term: TermAggregation):
+    """Combine every constituent exam summary of the term's class in one pass.
+
+    Exams of the same type are averaged before weighting; a missing component
+    counts as zero and makes the cumulative result a fail.
+    """
+    weights = dict(term.components.values_list('exam_type_id', 'weight'))
+    if not weights:
+        raise ValidationError('Term aggregation needs at least one exam type component.')
+    total_weight = sum(weights.values(), Decimal('0.00'))
+
+    rows = ExamResultSummary.objects.filter(
+        school=term.school,
+        session=term.session,
+        exam__school_class=term.school_class,
+        exam__exam_type_id__in=weights,
+        exam__is_active=True,
+    ).values_list('student_id', 'student__admission_number', 'exam__exam_type_id', 'percentage', 'result_status')
+
+    percentages = defaultdict(lambda: defaultdict(list))
+    admission_numbers = {}
+    failed = set()
+    for student_id, admission_number, exam_type_id, percentage, result_status in rows.iterator():
+        percentages[student_id][exam_type_id].append(percentage)
+        admission_numbers[student_id] = admission_number
+        if result_status != ExamResultSummary.STATUS_PASS:
+            failed.add(student_id)
+
+    resolve_grade = _grade_resolver(school=term.school, session=term.session)
+    computed = {}
+    for student_id, by_type in percentages.items():
+        weighted = sum(
+            (weights[exam_type_id] * sum(values) / len(values) for exam_type_id, values in by_type.items()),
+            Decimal('0.00'),
+        )
+        weighted_percentage = _quantize(weighted / total_weight)
+        passed = len(by_type) == len(weights) and student_id not in failed
+        computed[student_id] = {
+            'weighted_percentage': weighted_percentage,
+            'grade': resolve_grade(weighted_percentage),
+            'result_status': ExamResultSummary.STATUS_PASS if passed else ExamResultSummary.STATUS_FAIL,
+            'components_counted': len(by_type),
+        }
+
+    ordered = sorted(
+        computed,
+        key=lambda student_id: (-computed[student_id]['weighted_percentage'], admission_numbers[student_id]),
+    )
+    current_rank = 0
+    prev_percentage = None
+    for index, student_id in enumerate(ordered, start=1):
+        if computed[student_id]['weighted_percentage'] != prev_percentage:
+            current_rank = index
+            prev_percentage = computed[student_id]['weighted_percentage']
+        computed[student_id]['rank'] = current_rank
+
+    now = timezone.now()
+    fields = ['weighted_percentage', 'grade', 'rank', 'result_status', 'components_counted']
+    existing = {row.student_id: row for row in TermResultSummary.objects.filter(term=term)}
+    to_create = []
+    to_update = []
+    for student_id, values in computed.items():
+        row = existing.pop(student_id, None)
+        if row is None:
+            to_create.append(TermResultSummary(
+                school=term.school,
+                session=term.session,
+                term=term,
+                student_id=student_id,
+                **values,
+            ))
+            continue
+        if any(getattr(row, field) != values[field] for field in fields):
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.generated_at = now
+            to_update.append(row)
+
+    TermResultSummary.objects.bulk_create(to_create, batch_size=500)
+    TermResultSummary.objects.bulk_update(to_update, fields + ['generated_at'], batch_size=500)
+    if existing:
+        TermResultSummary.objects.filter(id__in=[row.id for row in existing.values()]).delete()
+
+    term.is_stale = False
+    term.computed_at = now
+    term.save(update_fields=['is_stale', 'computed_at', 'updated_at'])
+    return {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'removed': len(existing),
+    }
+
+
+def term_results(*, term: TermAggregation):
+    if term.is_stale:
+        compute_term_results(term=term)
+    return TermResultSummary.objects.filter(term=term).select_related('student').order_by(
+        'rank',
+        'student__admission_number',
+    )
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.students.profile import bump_student_profile_versions
+
+from .analytics import invalidate_exam_analytics
+from .models import Exam, ExamResultSummary, ExamSubject, StudentMark, TermAggregation, TermAggregationComponent
+from .services import mark_term_aggregations_stale
+
+
+@receiver(post_save, sender=StudentMark)
+@receiver(post_delete, sender=StudentMark)
+@receiver(post_save, sender=ExamSubject)
+@receiver(post_delete, sender=ExamSubject)
+def invalidate_analytics_on_mark_change(sender, instance, **kwargs):
+    invalidate_exam_analytics(instance.exam_id)
+
+
+@receiver(post_save, sender=ExamResultSummary)
+@receiver(post_delete, sender=ExamResultSummary)
+def mark_terms_stale_on_result_change(sender, instance, **kwargs):
+    mark_term_aggregations_stale(exam_id=instance.exam_id)
+    bump_student_profile_versions([instance.student_id])
+
+
+@receiver(post_save, sender=Exam)
+def mark_terms_stale_on_exam_change(sender, instance, created, **kwargs):
+    if not created:
+        mark_term_aggregations_stale(exam_id=instance.pk)
+
+
+@receiver(post_save, sender=TermAggregationComponent)
+@receiver(post_delete, sender=TermAggregationComponent)
+def mark_term_stale_on_component_change(sender, instance, **kwargs):
+    TermAggregation.objects.filter(pk=instance.term_id).update(is_stale=True)
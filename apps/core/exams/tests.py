@@ -1,23 +1,44 @@
+import shutil
+import tempfile
 from datetime import timedelta
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
 from apps.core.academic_sessions.models import AcademicSession
 from apps.core.academics.models import ClassSubject, SchoolClass, Section, Subject
+from apps.core.attendance.models import StudentAttendance
 from apps.core.hr.models import Designation, Staff, TeacherSubjectAssignment
 from apps.core.schools.models import School
 from apps.core.students.models import Student, StudentSessionRecord, StudentSubject
 
-from .models import Exam, ExamSubject, ExamType, StudentMark
-from .services import generate_exam_results, upsert_student_mark
+from .analytics import exam_analytics, load_mark_matrix
+from .models import Exam, ExamSubject, ExamType, StudentMark, TermAggregation, TermAggregationComponent
+from .services import (
+    bulk_report_card_payloads,
+    generate_exam_results,
+    stream_bulk_report_cards_pdf,
+    term_results,
+    upsert_student_mark,
+)
 
 
+TEST_MEDIA_ROOT = tempfile.mkdtemp(prefix='exams_core_tests_')
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
 class ExamsBaseTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         user_model = get_user_model()
         self.today = timezone.localdate()
@@ -236,6 +257,31 @@ class ExamServiceTests(ExamsBaseTestCase):
         self.assertEqual(rank_map[self.student_2.id], 1)
         self.assertEqual(rank_map[self.student_3.id], 3)
 
+    def test_results_store_session_attendance_percentage(self):
+        exam = self._create_exam()
+        StudentAttendance.objects.create(
+            school=self.school,
+            session=self.session,
+            student=self.student_1,
+            school_class=self.school_class,
+            section=self.section,
+            date=self.today - timedelta(days=1),
+            status=StudentAttendance.STATUS_PRESENT,
+        )
+        for student in [self.student_1, self.student_2, self.student_3]:
+            upsert_student_mark(
+                exam=exam,
+                student=student,
+                subject_id=self.math.id,
+                marks_obtained=Decimal('50'),
+                entered_by=self.admin,
+            )
+
+        generate_exam_results(exam=exam)
+        attendance = dict(exam.result_summaries.values_list('student_id', 'attendance_percentage'))
+        self.assertGreater(attendance[self.student_1.id], Decimal('0'))
+        self.assertIsNone(attendance[self.student_2.id])
+
 
 class ExamViewTests(ExamsBaseTestCase):
     def test_schooladmin_can_create_exam_type(self):
@@ -315,3 +361,182 @@ class ExamViewTests(ExamsBaseTestCase):
         response = self.client.get(reverse('report_card_download', args=[exam.id, self.student_1.id]))
         self.assertEqual(response.status_code, 200)
         self.assertIn('application/pdf', response['Content-Type'])
+
+
+class ReportCardBulkTests(ExamsBaseTestCase):
+    def _generate_results(self):
+        exam = self._create_exam()
+        for student, marks in [(self.student_1, '88'), (self.student_2, '77'), (self.student_3, '66')]:
+            upsert_student_mark(
+                exam=exam,
+                student=student,
+                subject_id=self.math.id,
+                marks_obtained=Decimal(marks),
+                entered_by=self.admin,
+            )
+        generate_exam_results(exam=exam)
+        return exam
+
+    def test_bulk_payloads_use_constant_queries(self):
+        exam = self._generate_results()
+        summaries = list(exam.result_summaries.all())
+
+        with self.assertNumQueries(4):
+            payloads = bulk_report_card_payloads(summaries=summaries)
+
+        self.assertEqual(len(payloads), 3)
+        marks_by_admission = {row['admission_number']: row['subjects'][0][3] for row in payloads}
+        self.assertEqual(marks_by_admission['EX-S1'], '88.00')
+
+    def test_streamed_pdf_contains_one_page_per_summary(self):
+        exam = self._generate_results()
+        pdf_bytes = b''.join(stream_bulk_report_cards_pdf(summaries=exam.result_summaries.all(), workers=1))
+
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+        self.assertTrue(pdf_bytes.rstrip().endswith(b'%%EOF'))
+        self.assertIn(b'/Count 3', pdf_bytes)
+
+    def test_bulk_download_streams_pdf(self):
+        exam = self._generate_results()
+        self.client.login(username='exam_admin', password='pass12345')
+        response = self.client.get(reverse('report_card_bulk_download', args=[exam.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+
+class ExamAnalyticsTests(ExamsBaseTestCase):
+    def _enter_marks(self, exam, subject, values):
+        for student, marks in zip([self.student_1, self.student_2, self.student_3], values):
+            upsert_student_mark(
+                exam=exam,
+                student=student,
+                subject_id=subject.id,
+                marks_obtained=Decimal(marks),
+                entered_by=self.admin,
+            )
+
+    def test_subject_statistics_and_correlation(self):
+        exam = self._create_exam()
+        ExamSubject.objects.create(exam=exam, subject=self.science, max_marks=50, pass_marks=20, is_active=True)
+        self._enter_marks(exam, self.math, ['90', '60', '30'])
+        self._enter_marks(exam, self.science, ['45', '30', '15'])
+
+        with self.assertNumQueries(2):
+            matrix = load_mark_matrix(exam)
+        self.assertEqual(len(matrix.student_ids), 3)
+
+        analytics = exam_analytics(exam)
+        math_row = next(row for row in analytics['subjects'] if row['name'] == 'Math')
+        self.assertEqual(math_row['mean'], 60.0)
+        self.assertEqual(math_row['median'], 60.0)
+        self.assertEqual(math_row['std'], 24.49)
+        self.assertEqual(math_row['pass_rate'], 66.67)
+        self.assertEqual(math_row['percentiles'][25], 45.0)
+        self.assertEqual(sum(bucket['count'] for bucket in math_row['histogram']), 3)
+        self.assertEqual(analytics['correlations'][0]['coefficient'], 1.0)
+        self.assertEqual(analytics['sections'][0]['students'], 3)
+
+    def test_analytics_cache_is_invalidated_when_marks_change(self):
+        exam = self._create_exam()
+        self._enter_marks(exam, self.math, ['90', '60', '30'])
+        self.assertEqual(exam_analytics(exam)['subjects'][0]['mean'], 60.0)
+
+        with self.assertNumQueries(0):
+            exam_analytics(exam)
+
+        self._enter_marks(exam, self.math, ['90', '60', '90'])
+        self.assertEqual(exam_analytics(exam)['subjects'][0]['mean'], 80.0)
+
+    def test_analytics_view_renders(self):
+        exam = self._create_exam()
+        self._enter_marks(exam, self.math, ['90', '60', '30'])
+        self.client.login(username='exam_admin', password='pass12345')
+        response = self.client.get(reverse('exam_analytics', args=[exam.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Subject Statistics')
+
+
+class TermAggregationTests(ExamsBaseTestCase):
+    def _exam_with_results(self, exam_type, marks):
+        exam = Exam.objects.create(
+            school=self.school,
+            session=self.session,
+            exam_type=exam_type,
+            school_class=self.school_class,
+            section=self.section,
+            start_date=self.today - timedelta(days=5),
+            end_date=self.today - timedelta(days=1),
+            created_by=self.admin,
+        )
+        ExamSubject.objects.create(exam=exam, subject=self.math, max_marks=100, pass_marks=33, is_active=True)
+        for student, value in zip([self.student_1, self.student_2, self.student_3], marks):
+            upsert_student_mark(
+                exam=exam,
+                student=student,
+                subject_id=self.math.id,
+                marks_obtained=Decimal(value),
+                entered_by=self.admin,
+            )
+        generate_exam_results(exam=exam)
+        return exam
+
+    def _term(self):
+        annual_type = ExamType.objects.create(school=self.school, session=self.session, name='Annual')
+        self.mid_exam = self._exam_with_results(self.exam_type, ['40', '80', '20'])
+        self.annual_exam = self._exam_with_results(annual_type, ['90', '60', '50'])
+        term = TermAggregation.objects.create(
+            school=self.school,
+            session=self.session,
+            name='Final',
+            school_class=self.school_class,
+        )
+        TermAggregationComponent.objects.create(term=term, exam_type=self.exam_type, weight=Decimal('30'))
+        TermAggregationComponent.objects.create(term=term, exam_type=annual_type, weight=Decimal('70'))
+        return term
+
+    def test_weighted_results_are_computed_and_ranked(self):
+        term = self._term()
+        results = {row.student_id: row for row in term_results(term=term)}
+
+        self.assertEqual(results[self.student_1.id].weighted_percentage, Decimal('75.00'))
+        self.assertEqual(results[self.student_2.id].weighted_percentage, Decimal('66.00'))
+        self.assertEqual(results[self.student_1.id].rank, 1)
+        self.assertEqual(results[self.student_3.id].result_status, 'fail')
+        self.assertEqual(results[self.student_1.id].components_counted, 2)
+
+    def test_results_are_reused_until_a_constituent_exam_changes(self):
+        term = self._term()
+        term_results(term=term)
+        term.refresh_from_db()
+        self.assertFalse(term.is_stale)
+
+        with self.assertNumQueries(1):
+            list(term_results(term=term))
+
+        upsert_student_mark(
+            exam=self.annual_exam,
+            student=self.student_2,
+            subject_id=self.math.id,
+            marks_obtained=Decimal('100'),
+            entered_by=self.admin,
+        )
+        generate_exam_results(exam=self.annual_exam)
+        term.refresh_from_db()
+        self.assertTrue(term.is_stale)
+
+        results = {row.student_id: row for row in term_results(term=term)}
+        self.assertEqual(results[self.student_2.id].weighted_percentage, Decimal('94.00'))
+        self.assertEqual(results[self.student_2.id].rank, 1)
+
+    def test_result_generation_marks_terms_stale_once(self):
+        self._term()
+        table = TermAggregation._meta.db_table
+
+        with CaptureQueriesContext(connection) as queries:
+            generate_exam_results(exam=self.annual_exam)
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith(f'UPDATE "{table}"')]
+        self.assertEqual(len(updates), 1)
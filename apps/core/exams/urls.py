@@ -1,6 +1,7 @@
 from django.urls import path
 
 from .views import (
+    exam_analytics_view,
     exam_create,
     exam_list,
     exam_lock,
@@ -21,6 +22,8 @@ from .views import (
     marks_entry,
     report_card_bulk_download,
     report_card_download,
+    term_list,
+    term_result_summary,
 )
 
 urlpatterns = [
@@ -45,7 +48,11 @@ urlpatterns = [
     path('marks-entry/', marks_entry, name='marks_entry_core'),
 
     path('results/<int:exam_id>/', exam_result_summary, name='exam_result_summary'),
+    path('results/<int:exam_id>/analytics/', exam_analytics_view, name='exam_analytics'),
     path('results/<int:exam_id>/generate/', exam_result_generate, name='exam_result_generate'),
     path('results/<int:exam_id>/report-card/<int:student_id>/', report_card_download, name='report_card_download'),
     path('results/<int:exam_id>/report-card-bulk/', report_card_bulk_download, name='report_card_bulk_download'),
+
+    path('terms/', term_list, name='term_list'),
+    path('terms/<int:term_id>/results/', term_result_summary, name='term_result_summary'),
 ]
@@ -3,24 +3,27 @@ from decimal import Decimal, InvalidOperation
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.http import require_POST
 
 from apps.core.academic_sessions.models import AcademicSession
+from apps.core.artifacts.http import artifact_pdf_response
 from apps.core.users.audit import log_audit_event
 from apps.core.users.decorators import role_required
 
+from .analytics import exam_analytics
 from .forms import ExamForm, ExamSubjectForm, ExamTypeForm, GradeScaleForm, MarkEntrySelectionForm
-from .models import Exam, ExamResultSummary, ExamSubject, ExamType, GradeScale, StudentMark
+from .models import Exam, ExamResultSummary, ExamSubject, ExamType, GradeScale, StudentMark, TermAggregation
 from .services import (
     eligible_students_for_exam,
-    generate_bulk_report_cards_pdf,
     generate_exam_results,
-    generate_report_card_pdf,
     lock_exam_results,
     recalculate_exam_ranks,
+    report_card_document,
+    stream_bulk_report_cards_pdf,
+    term_results,
     upsert_student_mark,
 )
 
@@ -547,6 +550,58 @@ def exam_result_summary(request, exam_id):
     })
 
 
+@login_required
+@role_required(['schooladmin', 'teacher'])
+def exam_analytics_view(request, exam_id):
+    exam = get_object_or_404(
+        Exam.objects.select_related('exam_type', 'school_class', 'section', 'session'),
+        pk=exam_id,
+        school=request.user.school,
+    )
+    return render(request, 'exams_core/exam_analytics.html', {
+        'exam': exam,
+        'analytics': exam_analytics(exam),
+    })
+
+
+@login_required
+@role_required(['schooladmin', 'teacher'])
+def term_list(request):
+    school = request.user.school
+    sessions, selected_session = _resolve_selected_session(request, school)
+
+    terms = TermAggregation.objects.filter(school=school, is_active=True).select_related('session', 'school_class')
+    if selected_session:
+        terms = terms.filter(session=selected_session)
+
+    return render(request, 'exams_core/term_list.html', {
+        'terms': terms.prefetch_related('components__exam_type'),
+        'sessions': sessions,
+        'selected_session': selected_session,
+    })
+
+
+@login_required
+@role_required(['schooladmin', 'teacher'])
+def term_result_summary(request, term_id):
+    term = get_object_or_404(
+        TermAggregation.objects.select_related('school', 'session', 'school_class'),
+        pk=term_id,
+        school=request.user.school,
+    )
+    try:
+        results = term_results(term=term)
+    except ValidationError as exc:
+        messages.error(request, '; '.join(exc.messages))
+        return redirect('term_list')
+
+    return render(request, 'exams_core/term_result_summary.html', {
+        'term': term,
+        'components': term.components.select_related('exam_type'),
+        'results': results,
+    })
+
+
 @login_required
 @role_required('schooladmin')
 @require_POST
@@ -582,16 +637,17 @@ def report_card_download(request, exam_id, student_id):
     teacher_remarks = (request.GET.get('teacher_remarks') or '').strip()
     principal_signature = (request.GET.get('principal_signature') or '').strip()
 
-    pdf_bytes = generate_report_card_pdf(
+    document = report_card_document(
         summary=summary,
         teacher_remarks=teacher_remarks,
         principal_signature=principal_signature,
     )
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
-    response['Content-Disposition'] = (
-        f'attachment; filename=\"report_card_{summary.exam_id}_{summary.student.admission_number}.pdf\"'
+    return artifact_pdf_response(
+        request,
+        school=school,
+        document=document,
+        filename=f'report_card_{summary.exam_id}_{summary.student.admission_number}.pdf',
     )
-    return response
 
 
 @login_required
@@ -603,7 +659,7 @@ def report_card_bulk_download(request, exam_id):
         ExamResultSummary.objects.filter(
             school=school,
             exam=exam,
-        ).select_related('student').order_by('rank', 'student__admission_number')
+        ).order_by('rank', 'student__admission_number')
     )
     if not summaries:
         messages.error(request, 'No result summaries found. Generate results first.')
@@ -611,12 +667,12 @@ def report_card_bulk_download(request, exam_id):
 
     teacher_remarks = (request.GET.get('teacher_remarks') or '').strip()
     principal_signature = (request.GET.get('principal_signature') or '').strip()
-    pdf_bytes = generate_bulk_report_cards_pdf(
+    pdf_stream = stream_bulk_report_cards_pdf(
         summaries=summaries,
         teacher_remarks=teacher_remarks,
         principal_signature=principal_signature,
     )
 
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
+    response = StreamingHttpResponse(pdf_stream, content_type='application/pdf')
     response['Content-Disposition'] = f'attachment; filename=\"report_cards_exam_{exam.id}.pdf\"'
     return response
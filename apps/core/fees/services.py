@@ -10,6 +10,8 @@ from django.db.models import Sum
 from django.utils import timezone
 
 from apps.core.academic_sessions.models import AcademicSession
+from apps.core.artifacts.models import GeneratedArtifact
+from apps.core.artifacts.services import ArtifactDocument, student_scope
 from apps.core.students.models import Student, image_to_pdf_bytes
 
 from .models import (
@@ -27,6 +29,9 @@ from .models import (
 )
 
 
+FEE_RECEIPT_TEMPLATE_VERSION = 1
+
+
 def _to_decimal(value) -> Decimal:
     return Decimal(str(value or '0'))
 
@@ -719,3 +724,42 @@ def build_fee_receipt_image(receipt: FeeReceipt):
 def generate_fee_receipt_pdf(receipt: FeeReceipt) -> bytes:
     image = build_fee_receipt_image(receipt)
     return image_to_pdf_bytes([image])
+
+
+def fee_receipt_document(receipt: FeeReceipt):
+    payment = receipt.payment
+    student = receipt.student
+    allocations = payment.allocations.select_related('student_fee__fee_type').order_by('id')
+    source = {
+        'receipt_id': receipt.id,
+        'receipt_number': receipt.receipt_number,
+        'generated_at': receipt.generated_at.strftime('%Y-%m-%d %H:%M'),
+        'school_name': receipt.school.name,
+        'session_name': receipt.session.name,
+        'student': (student.full_name, student.admission_number),
+        'installment': payment.installment.name,
+        'payment': (
+            str(payment.payment_date),
+            payment.payment_mode,
+            payment.reference_number,
+            str(payment.amount_paid),
+            str(payment.fine_amount),
+            str(payment.total_collected),
+            payment.is_reversed,
+            payment.reversal_reason,
+        ),
+        'allocations': [
+            (
+                allocation.student_fee.fee_type.name if allocation.student_fee_id else '',
+                str(_quantize(allocation.amount)),
+            )
+            for allocation in allocations
+        ],
+    }
+    return ArtifactDocument(
+        kind=GeneratedArtifact.KIND_FEE_RECEIPT,
+        template_version=FEE_RECEIPT_TEMPLATE_VERSION,
+        scope=student_scope(receipt.student_id),
+        source=source,
+        render=lambda: generate_fee_receipt_pdf(receipt),
+    )
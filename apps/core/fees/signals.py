@@ -1,10 +1,12 @@
 from django.db import transaction
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from apps.core.academic_sessions.models import AcademicSession
 from apps.core.students.models import Student
+from apps.core.students.profile import bump_student_profile_versions
 
+from .models import FeePayment, StudentFee
 from .services import sync_student_fees_for_student
 
 
@@ -50,3 +52,13 @@ def sync_student_fees_after_student_save(sender, instance: Student, **kwargs):
         previous_session_id = None
 
     transaction.on_commit(lambda: _safe_sync(instance.id, previous_session_id=previous_session_id))
+
+
+@receiver(post_save, sender=StudentFee)
+@receiver(post_delete, sender=StudentFee)
+@receiver(post_save, sender=FeePayment)
+@receiver(post_delete, sender=FeePayment)
+def bump_student_profile_on_fee_change(sender, instance, **kwargs):
+    # Payment allocations are written after the payment row, so wait for the commit.
+    student_id = instance.student_id
+    transaction.on_commit(lambda: bump_student_profile_versions([student_id]))
@@ -2,15 +2,16 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.http import require_POST
 
 from apps.core.academic_sessions.models import AcademicSession
+from apps.core.artifacts.http import artifact_pdf_response
 from apps.core.students.models import Student
 from apps.core.users.audit import log_audit_event
 from apps.core.users.decorators import role_required
+from apps.core.utils.pagination import keyset_paginate
 
 from .forms import (
     CarryForwardForm,
@@ -38,8 +39,8 @@ from .models import (
 from .services import (
     collect_fee_payment,
     create_fee_refund,
+    fee_receipt_document,
     generate_carry_forward_due,
-    generate_fee_receipt_pdf,
     recalculate_student_fee_concessions,
     reverse_fee_payment,
     reverse_fee_refund,
@@ -565,10 +566,12 @@ def fee_receipt_pdf(request, receipt_id):
         pk=receipt_id,
         school=request.user.school,
     )
-    pdf_bytes = generate_fee_receipt_pdf(receipt)
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{receipt.receipt_number}.pdf"'
-    return response
+    return artifact_pdf_response(
+        request,
+        school=request.user.school,
+        document=fee_receipt_document(receipt),
+        filename=f'{receipt.receipt_number}.pdf',
+    )
 
 
 @login_required
@@ -731,8 +734,10 @@ def ledger_list(request):
     if entry_type:
         rows = rows.filter(transaction_type=entry_type)
 
+    page = keyset_paginate(request, rows, ('-date', '-id'))
     return render(request, 'fees_core/ledger_list.html', {
-        'rows': rows.order_by('-date', '-id')[:500],
+        'rows': page.object_list,
+        'page': page,
         'sessions': sessions,
         'selected_session': selected_session,
         'selected_type': entry_type,
@@ -8,6 +8,7 @@ from django.views.decorators.http import require_POST
 from apps.core.academic_sessions.models import AcademicSession
 from apps.core.users.audit import log_audit_event
 from apps.core.users.decorators import role_required
+from apps.core.utils.pagination import keyset_paginate
 
 from .forms import (
     ClassTeacherForm,
@@ -145,8 +146,10 @@ def hr_staff_list(request):
     if status:
         staff_members = staff_members.filter(status=status)
 
+    page = keyset_paginate(request, staff_members, ('employee_id', 'id'))
     return render(request, 'hr/staff_list.html', {
-        'staff_members': staff_members.order_by('employee_id'),
+        'staff_members': page.object_list,
+        'page': page,
         'selected_status': status,
     })
 
@@ -718,8 +721,10 @@ def hr_substitution_list(request):
     if selected_date:
         substitutions = substitutions.filter(date=selected_date)
 
+    page = keyset_paginate(request, substitutions, ('-date', 'period__period_number', 'id'))
     return render(request, 'hr/substitution_list.html', {
-        'substitutions': substitutions.order_by('-date', 'period__period_number'),
+        'substitutions': page.object_list,
+        'page': page,
         'sessions': sessions,
         'selected_session': selected_session,
         'selected_date': selected_date,
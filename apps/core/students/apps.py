@@ -5,3 +5,6 @@ class StudentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core.students'
     label = 'core_students'
+
+    def ready(self):
+        from . import signals  # noqa: F401
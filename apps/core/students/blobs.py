@@ -0,0 +1,164 @@
+"""Reference counts and garbage collection for content-addressed student files."""
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.core.utils.storage import BLOB_PREFIX, blob_digest, blob_storage, is_blob_original
+
+from .models import StoredBlob, Student, StudentDocument
+
+
+BLOB_FIELDS = (
+    (Student, 'photo'),
+    (StudentDocument, 'file'),
+)
+BLOB_GRACE_PERIOD = timedelta(hours=24)
+
+
+@dataclass
+class BlobCollection:
+    checked: int = 0
+    removed: int = 0
+    freed_bytes: int = 0
+
+
+def _blob_field_name(instance):
+    for model, field_name in BLOB_FIELDS:
+        if isinstance(instance, model):
+            return field_name
+    return None
+
+
+def blob_field_names(instance) -> set:
+    """Blob names ``instance`` currently holds; deferred fields are skipped."""
+    field_name = _blob_field_name(instance)
+    if field_name is None or field_name not in instance.__dict__:
+        return set()
+    name = getattr(instance, field_name).name
+    return {name} if is_blob_original(name) else set()
+
+
+def stored_blob_names(instance, update_fields=None) -> set | None:
+    """Blob names the row of ``instance`` holds in the database before it is saved.
+
+    ``None`` when the save does not write the blob field, so nothing can change.
+    """
+    field_name = _blob_field_name(instance)
+    if field_name is None or (update_fields is not None and field_name not in update_fields):
+        return None
+    if instance.pk is None:
+        return set()
+    name = type(instance)._base_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+    return {name} if is_blob_original(name) else set()
+
+
+def count_blob_references(names=None) -> Counter:
+    """References per blob name over every blob field; all blobs when ``names`` is ``None``."""
+    counts = Counter()
+    for model, field_name in BLOB_FIELDS:
+        rows = model._base_manager.exclude(**{field_name: ''}).exclude(**{f"{field_name}__isnull": True})
+        if names is not None:
+            rows = rows.filter(**{f"{field_name}__in": list(names)})
+        for row in rows.values(field_name).annotate(references=Count('pk')).order_by():
+            counts[row[field_name]] += row['references']
+    return counts
+
+
+def sync_blob_references(names) -> None:
+    """Recount the references of ``names`` and store them on their ``StoredBlob`` rows."""
+    names = {name for name in names if is_blob_original(name)}
+    if not names:
+        return
+    counts = count_blob_references(names)
+    existing = {blob.name: blob for blob in StoredBlob.objects.filter(name__in=names)}
+    storage = blob_storage()
+    for name in names:
+        blob = existing.get(name)
+        if blob is None:
+            size = storage.size(name) if storage.exists(name) else 0
+            StoredBlob.objects.create(name=name, digest=blob_digest(name), size=size, ref_count=counts[name])
+        elif blob.ref_count != counts[name]:
+            blob.ref_count = counts[name]
+            blob.save(update_fields=['ref_count', 'updated_at'])
+
+
+def school_can_read_blob(school, name) -> bool:
+    """Whether a row of ``school`` references the blob ``name`` is, or is derived from."""
+    digest = blob_digest(name)
+    if digest is None:
+        return False
+    # Renditions do not keep the original's extension; the blob rows map the digest back.
+    names = set(StoredBlob.objects.filter(digest=digest).values_list('name', flat=True))
+    if is_blob_original(name):
+        names.add(name)
+    if not names:
+        return False
+    return (
+        Student.objects.filter(school=school, photo__in=names).exists()
+        or StudentDocument.objects.filter(student__school=school, file__in=names).exists()
+    )
+
+
+def _blob_files(storage):
+    """Yield ``(originals, derived)`` name lists for each ``blobs/<aa>`` directory."""
+    if not storage.exists(BLOB_PREFIX):
+        return
+    prefixes, _ = storage.listdir(BLOB_PREFIX)
+    for prefix in sorted(prefixes):
+        directory = f"{BLOB_PREFIX}/{prefix}"
+        subdirectories, files = storage.listdir(directory)
+        originals = [f"{directory}/{filename}" for filename in files]
+        derived = []
+        for subdirectory in subdirectories:
+            _, derived_files = storage.listdir(f"{directory}/{subdirectory}")
+            derived.extend(f"{directory}/{subdirectory}/{filename}" for filename in derived_files)
+        yield originals, derived
+
+
+def collect_blobs(*, grace=BLOB_GRACE_PERIOD, dry_run=False) -> BlobCollection:
+    """Recount references, then remove blobs (and their renditions) nothing points at."""
+    storage = blob_storage()
+    counts = count_blob_references()
+    cutoff = timezone.now() - grace
+    result = BlobCollection()
+    removed = set()
+    blobs = {blob.name: blob for blob in StoredBlob.objects.all()}
+
+    for originals, derived in _blob_files(storage):
+        live_digests = set()
+        for name in originals:
+            if not is_blob_original(name):
+                continue
+            result.checked += 1
+            blob = blobs.pop(name, None)
+            references = counts[name]
+            if references or storage.get_modified_time(name) > cutoff:
+                live_digests.add(blob_digest(name))
+                if dry_run:
+                    continue
+                if blob is None:
+                    StoredBlob.objects.create(
+                        name=name, digest=blob_digest(name), size=storage.size(name), ref_count=references,
+                    )
+                elif blob.ref_count != references:
+                    StoredBlob.objects.filter(pk=blob.pk).update(ref_count=references, updated_at=timezone.now())
+                continue
+            result.removed += 1
+            result.freed_bytes += storage.size(name)
+            removed.add(name)
+            if not dry_run:
+                storage.purge(name)
+        for name in derived:
+            if blob_digest(name) not in live_digests and not dry_run:
+                storage.purge(name)
+
+    # Rows whose file is already gone.
+    removed.update(blobs)
+    if not dry_run:
+        StoredBlob.objects.filter(name__in=removed).delete()
+    return result
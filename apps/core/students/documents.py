@@ -0,0 +1,137 @@
+"""Set-based admission document checks for a whole session."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import DocumentType, Student, StudentDocument
+from .profile import bump_student_profile_versions
+
+
+REVIEW_STATUSES = (StudentDocument.STATUS_APPROVED, StudentDocument.STATUS_REJECTED)
+
+
+@dataclass
+class MissingDocumentRow:
+    student_id: int
+    admission_number: str
+    full_name: str
+    class_name: str
+    section_name: str
+    missing: list
+
+
+@dataclass
+class MissingDocumentsReport:
+    document_types: list
+    rows: list = field(default_factory=list)
+    eligible_ids: list = field(default_factory=list)
+    checked: int = 0
+
+    def missing_counts(self):
+        counts = {doc_type.id: 0 for doc_type in self.document_types}
+        names = {doc_type.name: doc_type.id for doc_type in self.document_types}
+        for row in self.rows:
+            for name in row.missing:
+                counts[names[name]] += 1
+        return [(doc_type, counts[doc_type.id]) for doc_type in self.document_types]
+
+
+def missing_documents_report(*, school, session, school_class=None, section=None, pending_only=True):
+    """Students of ``session`` still missing an approved mandatory document, in two queries.
+
+    ``eligible_ids`` lists the students that miss nothing; with
+    ``pending_only`` only students whose admission is not finalized are read.
+    """
+    if session.school_id != school.id:
+        raise ValidationError('Selected session does not belong to your school.')
+
+    document_types = list(
+        DocumentType.objects.filter(school=school, is_active=True, is_mandatory=True).order_by('name')
+    )
+    report = MissingDocumentsReport(document_types=document_types)
+
+    students = Student.objects.filter(school=school, session=session, is_archived=False)
+    if pending_only:
+        students = students.filter(admission_finalized=False)
+    if school_class is not None:
+        students = students.filter(current_class=school_class)
+    if section is not None:
+        students = students.filter(current_section=section)
+    flags = {
+        f"has_{doc_type.id}": Exists(
+            StudentDocument.objects.filter(
+                student_id=OuterRef('pk'),
+                document_type_id=doc_type.id,
+                status=StudentDocument.STATUS_APPROVED,
+            )
+        )
+        for doc_type in document_types
+    }
+
+    for values in students.annotate(**flags).values(
+        'id', 'admission_number', 'first_name', 'last_name', 'admission_type',
+        'current_class__name', 'current_section__name', *flags,
+    ).order_by('current_class__display_order', 'current_section__name', 'admission_number'):
+        report.checked += 1
+        missing = [
+            doc_type.name
+            for doc_type in document_types
+            if doc_type.required_for in (DocumentType.FOR_BOTH, values['admission_type'])
+            and not values[f"has_{doc_type.id}"]
+        ]
+        if not missing:
+            report.eligible_ids.append(values['id'])
+            continue
+        report.rows.append(MissingDocumentRow(
+            student_id=values['id'],
+            admission_number=values['admission_number'],
+            full_name=f"{values['first_name']} {values['last_name']}".strip(),
+            class_name=values['current_class__name'] or '-',
+            section_name=values['current_section__name'] or '-',
+            missing=missing,
+        ))
+    return report
+
+
+@transaction.atomic
+def bulk_review_documents(*, school, document_ids, status, verified_by=None, remarks='') -> int:
+    """Approve or reject many documents of ``school`` in one statement; returns the number updated."""
+    if status not in REVIEW_STATUSES:
+        raise ValidationError('Invalid document status provided.')
+    documents = StudentDocument.objects.filter(id__in=list(document_ids), student__school=school)
+    student_ids = set(documents.values_list('student_id', flat=True))
+    updated = documents.update(
+        status=status,
+        remarks=remarks,
+        verified_by=verified_by,
+        verified_at=timezone.now(),
+    )
+    bump_student_profile_versions(student_ids)
+    return updated
+
+
+@transaction.atomic
+def finalize_eligible_admissions(*, school, session, finalized_by=None, school_class=None, section=None) -> int:
+    """Finalize every pending admission of the session that has all mandatory documents approved."""
+    report = missing_documents_report(
+        school=school,
+        session=session,
+        school_class=school_class,
+        section=section,
+    )
+    if not report.eligible_ids:
+        return 0
+    now = timezone.now()
+    finalized = Student.objects.filter(id__in=report.eligible_ids, admission_finalized=False).update(
+        admission_finalized=True,
+        admission_finalized_at=now,
+        admission_finalized_by=finalized_by,
+        updated_at=now,
+    )
+    bump_student_profile_versions(report.eligible_ids)
+    return finalized
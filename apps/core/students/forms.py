@@ -196,3 +196,33 @@ class StudentDocumentForm(forms.ModelForm):
 class StudentStatusForm(forms.Form):
     status = forms.ChoiceField(choices=Student.STATUS_CHOICES)
     reason = forms.CharField(max_length=255, required=False)
+
+
+class StudentPromotionForm(forms.Form):
+    source_session = forms.ModelChoiceField(queryset=AcademicSession.objects.none(), label='Promote from session')
+    target_session = forms.ModelChoiceField(queryset=AcademicSession.objects.none(), label='Promote into session')
+
+    def __init__(self, *args, **kwargs):
+        school = kwargs.pop('school')
+        super().__init__(*args, **kwargs)
+        sessions = AcademicSession.objects.filter(school=school).order_by('-start_date')
+        self.fields['source_session'].queryset = sessions
+        self.fields['target_session'].queryset = sessions
+
+    def clean(self):
+        cleaned_data = super().clean()
+        source = cleaned_data.get('source_session')
+        target = cleaned_data.get('target_session')
+        if source and target and source.pk == target.pk:
+            raise ValidationError('Target session must differ from the source session.')
+        return cleaned_data
+
+
+class StudentImportForm(forms.Form):
+    session = forms.ModelChoiceField(queryset=AcademicSession.objects.none())
+    file = forms.FileField(help_text='CSV or XLSX with a header row; see the column list below.')
+
+    def __init__(self, *args, **kwargs):
+        school = kwargs.pop('school')
+        super().__init__(*args, **kwargs)
+        self.fields['session'].queryset = _school_sessions(school)
@@ -0,0 +1,308 @@
+"""Bulk admission import from CSV or XLSX spreadsheets."""
+from __future__ import annotations
+
+import codecs
+import csv
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.academics.models import SchoolClass, Section
+
+from .models import Parent, Student, StudentSessionRecord
+from .search import reindex_students
+from .services import bulk_sync_student_subjects, queue_student_fee_sync
+
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_COLUMNS = (
+    'admission_number',
+    'first_name',
+    'last_name',
+    'gender',
+    'date_of_birth',
+    'blood_group',
+    'admission_date',
+    'admission_type',
+    'previous_school_name',
+    'class',
+    'section',
+    'roll_number',
+    'father_name',
+    'mother_name',
+    'guardian_name',
+    'parent_phone',
+    'parent_email',
+    'address',
+)
+REQUIRED_COLUMNS = ('admission_number', 'first_name', 'class', 'section')
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y')
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, row_number, values, message):
+        self.errors.append((row_number, values, message))
+
+    def error_file(self) -> bytes:
+        output = StringIO()
+        writer = csv.writer(output)
+        writer.writerow(['row', *IMPORT_COLUMNS, 'error'])
+        for row_number, values, message in self.errors:
+            writer.writerow([row_number, *(values.get(column, '') for column in IMPORT_COLUMNS), message])
+        return output.getvalue().encode('utf-8')
+
+
+def _header_key(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, float) and value.is_integer():
+        # Spreadsheet apps store numeric admission numbers, rolls and phones as floats.
+        return str(int(value))
+    return str(value).strip()
+
+
+def _iter_csv(uploaded_file):
+    reader = csv.reader(codecs.iterdecode(uploaded_file, 'utf-8-sig'))
+    yield from reader
+
+
+def _iter_xlsx(uploaded_file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ValidationError('XLSX import needs the openpyxl package; upload the sheet as CSV instead.') from exc
+
+    workbook = load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_import_rows(uploaded_file):
+    """Yield ``(row_number, {column: value})`` for each non-blank data row of the upload."""
+    name = (getattr(uploaded_file, 'name', '') or '').lower()
+    if name.endswith('.xlsx'):
+        rows = _iter_xlsx(uploaded_file)
+    elif name.endswith('.csv'):
+        rows = _iter_csv(uploaded_file)
+    else:
+        raise ValidationError('Upload a .csv or .xlsx file.')
+
+    header = next(rows, None)
+    if not header:
+        raise ValidationError('The file is empty.')
+    columns = [_header_key(value) for value in header]
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValidationError(f"Missing column(s): {', '.join(missing)}.")
+
+    for row_number, row in enumerate(rows, start=2):
+        values = {
+            column: _cell(value)
+            for column, value in zip(columns, row)
+            if column in IMPORT_COLUMNS
+        }
+        if any(values.values()):
+            yield row_number, values
+
+
+def _parse_date(value):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+def _choice(value, choices, label):
+    if not value:
+        return ''
+    lookup = {key.lower(): key for key, _ in choices}
+    lookup.update({str(name).lower(): key for key, name in choices})
+    try:
+        return lookup[value.lower()]
+    except KeyError:
+        raise ValueError(f"Invalid {label} '{value}'.") from None
+
+
+class _ImportLookups:
+    def __init__(self, *, school, session):
+        self.classes = {
+            school_class.name.lower(): school_class
+            for school_class in SchoolClass.objects.filter(school=school, session=session, is_active=True)
+        }
+        self.sections = {
+            (section.school_class_id, section.name.lower()): section
+            for section in Section.objects.filter(
+                school_class__school=school,
+                school_class__session=session,
+                is_active=True,
+            )
+        }
+        self.admission_numbers = {
+            value.lower()
+            for value in Student.objects.filter(school=school).values_list('admission_number', flat=True)
+        }
+        self.rolls = set(
+            Student.objects.filter(school=school, session=session, roll_number__isnull=False).values_list(
+                'current_class_id', 'current_section_id', 'roll_number',
+            )
+        )
+
+
+def _check_fields(instance, exclude):
+    """Run the model's field validators (lengths, choices) and report them as a row error."""
+    try:
+        instance.clean_fields(exclude=exclude)
+    except ValidationError as exc:
+        raise ValueError('; '.join(
+            f"{name.replace('_', ' ').capitalize()}: {' '.join(messages)}"
+            for name, messages in exc.message_dict.items()
+        )) from None
+
+
+def _build_row(values, *, school, session, lookups, today):
+    admission_number = values.get('admission_number', '')
+    first_name = values.get('first_name', '')
+    if not admission_number or not first_name:
+        raise ValueError('Admission number and first name are required.')
+    if admission_number.lower() in lookups.admission_numbers:
+        raise ValueError(f"Admission number '{admission_number}' already exists.")
+
+    school_class = lookups.classes.get(values.get('class', '').lower())
+    if school_class is None:
+        raise ValueError(f"Class '{values.get('class', '')}' does not exist in {session.name}.")
+    section = lookups.sections.get((school_class.id, values.get('section', '').lower()))
+    if section is None:
+        raise ValueError(f"Section '{values.get('section', '')}' does not exist in class {school_class.name}.")
+
+    roll_number = values.get('roll_number') or None
+    if roll_number and (school_class.id, section.id, roll_number) in lookups.rolls:
+        raise ValueError(f"Roll number {roll_number} is already used in {school_class.name}-{section.name}.")
+
+    try:
+        date_of_birth = _parse_date(values['date_of_birth']) if values.get('date_of_birth') else None
+        admission_date = _parse_date(values['admission_date']) if values.get('admission_date') else today
+    except ValueError as exc:
+        raise ValueError(f"Invalid date '{exc}'; use YYYY-MM-DD.") from None
+
+    admission_type = _choice(values.get('admission_type', ''), Student.ADMISSION_TYPE_CHOICES, 'admission type')
+    admission_type = admission_type or Student.ADMISSION_FRESH
+    previous_school_name = values.get('previous_school_name', '')
+    if admission_type == Student.ADMISSION_TRANSFER and not previous_school_name:
+        raise ValueError('Previous school is required for transfer admission.')
+
+    student = Student(
+        school=school,
+        session=session,
+        admission_number=admission_number,
+        first_name=first_name,
+        last_name=values.get('last_name', ''),
+        gender=_choice(values.get('gender', ''), Student.GENDER_CHOICES, 'gender'),
+        date_of_birth=date_of_birth,
+        blood_group=_choice(values.get('blood_group', ''), Student.BLOOD_GROUP_CHOICES, 'blood group'),
+        admission_date=admission_date,
+        admission_type=admission_type,
+        previous_school_name=previous_school_name,
+        current_class=school_class,
+        current_section=section,
+        roll_number=roll_number,
+    )
+    _check_fields(student, exclude=['school', 'session', 'current_class', 'current_section', 'admission_finalized_by'])
+
+    parent = None
+    phone = values.get('parent_phone', '')
+    parent_names = [values.get(key, '') for key in ('father_name', 'mother_name', 'guardian_name')]
+    if phone or any(parent_names):
+        if not phone:
+            raise ValueError('Parent phone is required when parent details are given.')
+        email = values.get('parent_email', '')
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                raise ValueError(f"Invalid parent email '{email}'.") from None
+        parent = Parent(
+            student=student,
+            father_name=parent_names[0],
+            mother_name=parent_names[1],
+            guardian_name=parent_names[2],
+            phone=phone,
+            email=email,
+            address=values.get('address', ''),
+        )
+        _check_fields(parent, exclude=['student'])
+
+    lookups.admission_numbers.add(admission_number.lower())
+    if roll_number:
+        lookups.rolls.add((school_class.id, section.id, roll_number))
+    return student, parent
+
+
+def _write_batch(batch, session):
+    students = Student.objects.bulk_create([student for student, _ in batch])
+    Parent.objects.bulk_create([parent for _, parent in batch if parent is not None])
+    StudentSessionRecord.objects.bulk_create([
+        StudentSessionRecord(
+            student=student,
+            school_id=student.school_id,
+            session=session,
+            school_class=student.current_class,
+            section=student.current_section,
+            roll_number=student.roll_number,
+            status=student.status,
+            is_current=True,
+        )
+        for student in students
+    ])
+    return students
+
+
+@transaction.atomic
+def import_students(*, school, session, rows, batch_size=IMPORT_BATCH_SIZE) -> ImportResult:
+    """Create students (and parents / session records) from ``iter_import_rows`` output."""
+    if session.school_id != school.id:
+        raise ValidationError('Selected session does not belong to your school.')
+
+    result = ImportResult()
+    lookups = _ImportLookups(school=school, session=session)
+    today = timezone.localdate()
+    created = []
+    batch = []
+    for row_number, values in rows:
+        try:
+            batch.append(_build_row(values, school=school, session=session, lookups=lookups, today=today))
+        except ValueError as exc:
+            result.add_error(row_number, values, str(exc))
+            continue
+        if len(batch) >= batch_size:
+            created.extend(_write_batch(batch, session))
+            batch = []
+    if batch:
+        created.extend(_write_batch(batch, session))
+
+    # bulk_create skips the Student save signals, so linked data and the search index are built once.
+    bulk_sync_student_subjects(created)
+    reindex_students(created)
+    queue_student_fee_sync([student.id for student in created])
+    result.created = len(created)
+    return result
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.schools.models import School
+from apps.core.students.models import Student
+from apps.core.utils.images import LOGO_RENDITIONS, PHOTO_RENDITIONS, generate_renditions
+
+
+class Command(BaseCommand):
+    help = "Generate missing photo and logo renditions for media uploaded before renditions existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', help='School code; defaults to every school.')
+        parser.add_argument('--overwrite', action='store_true', help='Regenerate renditions that already exist.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        schools = School.objects.order_by('id')
+        students = Student.objects.exclude(photo='').exclude(photo__isnull=True).order_by('id')
+        if options['school']:
+            schools = schools.filter(code=options['school'])
+            if not schools.exists():
+                raise CommandError(f"School '{options['school']}' not found.")
+            students = students.filter(school__in=schools)
+
+        overwrite = options['overwrite']
+        written = 0
+        for school in schools:
+            written += len(generate_renditions(getattr(school, 'logo', None), LOGO_RENDITIONS, overwrite=overwrite))
+
+        batch_size = max(1, options['batch_size'])
+        photos = 0
+        last_id = 0
+        while True:
+            batch = list(students.filter(id__gt=last_id).only('id', 'photo')[:batch_size])
+            if not batch:
+                break
+            for student in batch:
+                written += len(generate_renditions(student.photo, PHOTO_RENDITIONS, overwrite=overwrite))
+            photos += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Checked {photos} student photo(s); wrote {written} rendition(s)."))
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.core.students.blobs import BLOB_GRACE_PERIOD, collect_blobs
+
+
+class Command(BaseCommand):
+    help = "Recount references to stored student files and remove the blobs nothing points at."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=BLOB_GRACE_PERIOD.total_seconds() / 3600,
+            help='Keep unreferenced blobs written more recently than this.',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be removed without deleting.')
+
+    def handle(self, *args, **options):
+        result = collect_blobs(grace=timedelta(hours=options['grace_hours']), dry_run=options['dry_run'])
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {result.checked} blob(s); {verb.lower()} {result.removed} ({result.freed_bytes} bytes)."
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.core.schools.models import School
+from apps.core.students.models import Student
+from apps.core.students.search import reindex_students
+
+
+class Command(BaseCommand):
+    help = "Rebuild the student search index for one school or all schools."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school', help='School code; defaults to every school.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        students = Student.objects.order_by('id')
+        if options['school']:
+            school = School.objects.filter(code=options['school']).first()
+            if not school:
+                raise CommandError(f"School '{options['school']}' not found.")
+            students = students.filter(school=school)
+
+        batch_size = max(1, options['batch_size'])
+        indexed = 0
+        terms = 0
+        last_id = 0
+        while True:
+            batch = list(students.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                terms += reindex_students(batch)
+            indexed += len(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} student(s) with {terms} search term(s)."))
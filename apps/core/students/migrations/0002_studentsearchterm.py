@@ -0,0 +1,53 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.core.students.search import student_search_terms
+
+
+def build_search_index(apps, schema_editor):
+    Student = apps.get_model('core_students', 'Student')
+    Parent = apps.get_model('core_students', 'Parent')
+    StudentSearchTerm = apps.get_model('core_students', 'StudentSearchTerm')
+
+    parents = {parent.student_id: parent for parent in Parent.objects.all()}
+    rows = []
+    for student in Student.objects.all().iterator():
+        terms = student_search_terms(
+            admission_number=student.admission_number,
+            first_name=student.first_name,
+            last_name=student.last_name,
+            parent=parents.get(student.id),
+        )
+        rows.extend(
+            StudentSearchTerm(school_id=student.school_id, student_id=student.id, term=term, weight=weight)
+            for term, weight in terms.items()
+        )
+        if len(rows) >= 5000:
+            StudentSearchTerm.objects.bulk_create(rows)
+            rows = []
+    StudentSearchTerm.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_students', '0001_initial'),
+        ('schools', '0003_schooldomain_alter_school_options_school_code_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveSmallIntegerField(default=1)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_search_terms', to='schools.school')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='core_students.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'term', 'student', 'weight'], name='student_search_school_term')],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
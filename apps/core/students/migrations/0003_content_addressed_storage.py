@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:00
+
+import apps.core.utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_students', '0002_studentsearchterm'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=apps.core.utils.storage.blob_storage, upload_to='students/photos/'),
+        ),
+        migrations.AlterField(
+            model_name='studentdocument',
+            name='file',
+            field=models.FileField(storage=apps.core.utils.storage.blob_storage, upload_to='students/documents/'),
+        ),
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('digest', models.CharField(db_index=True, max_length=64)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='stored_blob_unreferenced')],
+            },
+        ),
+    ]
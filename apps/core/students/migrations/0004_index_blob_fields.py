@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:53
+
+import apps.core.utils.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core_students', '0003_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='photo',
+            field=models.ImageField(blank=True, db_index=True, null=True, storage=apps.core.utils.storage.blob_storage, upload_to='students/photos/'),
+        ),
+        migrations.AlterField(
+            model_name='studentdocument',
+            name='file',
+            field=models.FileField(db_index=True, storage=apps.core.utils.storage.blob_storage, upload_to='students/documents/'),
+        ),
+    ]
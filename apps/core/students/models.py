@@ -1,6 +1,6 @@
 from io import BytesIO
 
-from PIL import Image, ImageDraw, ImageOps
+from PIL import Image, ImageDraw
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
@@ -10,7 +10,9 @@ from django.utils import timezone
 from apps.core.academic_sessions.models import AcademicSession
 from apps.core.academics.models import SchoolClass, Section, Subject
 from apps.core.schools.models import School
+from apps.core.utils.images import rendition_bytes, rendition_url
 from apps.core.utils.managers import SchoolManager
+from apps.core.utils.storage import blob_storage
 
 
 class Student(models.Model):
@@ -81,7 +83,9 @@ class Student(models.Model):
     roll_number = models.CharField(max_length=20, null=True, blank=True)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
-    photo = models.ImageField(upload_to='students/photos/', null=True, blank=True)
+    photo = models.ImageField(
+        upload_to='students/photos/', storage=blob_storage, null=True, blank=True, db_index=True,
+    )
     is_active = models.BooleanField(default=True)
     is_archived = models.BooleanField(default=False)
     archived_at = models.DateTimeField(null=True, blank=True)
@@ -128,6 +132,10 @@ class Student(models.Model):
             models.Index(fields=['school', 'is_active']),
         ]
 
+    @property
+    def avatar_url(self):
+        return rendition_url(self.photo, 'avatar')
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
@@ -227,7 +235,7 @@ class StudentDocument(models.Model):
 
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='documents')
     document_type = models.ForeignKey(DocumentType, on_delete=models.CASCADE, related_name='student_documents')
-    file = models.FileField(upload_to='students/documents/')
+    file = models.FileField(upload_to='students/documents/', storage=blob_storage, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     verified_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -336,6 +344,41 @@ class StudentSessionRecord(models.Model):
         return f"{self.student.admission_number} - {self.session.name}"
 
 
+class StudentSearchTerm(models.Model):
+    """One normalized word or trigram of a student's searchable text (see ``search.py``)."""
+    school = models.ForeignKey(School, on_delete=models.CASCADE, related_name='student_search_terms')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['school', 'term', 'student', 'weight'], name='student_search_school_term'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id}: {self.term}"
+
+
+class StoredBlob(models.Model):
+    """A content-addressed file and the number of rows that point at it (see ``blobs.py``)."""
+    name = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='stored_blob_unreferenced'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
+
+
 def image_to_pdf_bytes(images):
     if not images:
         return b''
@@ -356,28 +399,17 @@ def build_id_card_image(student, include_qr=False):
     draw.text((24, 256), f"Section: {student.current_section.name if student.current_section else '-'}", fill='black')
     draw.text((24, 304), f"Session: {student.session.name}", fill='black')
 
-    if student.photo:
-        try:
-            with student.photo.open('rb') as photo_file:
-                photo = Image.open(photo_file).convert('RGB')
-                photo = ImageOps.fit(photo, (220, 260))
-                card.paste(photo, (740, 130))
-        except Exception:
-            draw.rectangle([(740, 130), (960, 390)], outline='black')
-            draw.text((760, 250), "PHOTO", fill='black')
+    photo = rendition_bytes(student.photo, 'id_card') if student.photo else None
+    if photo:
+        card.paste(Image.open(BytesIO(photo)).convert('RGB'), (740, 130))
     else:
         draw.rectangle([(740, 130), (960, 390)], outline='black')
         draw.text((760, 250), "PHOTO", fill='black')
 
-    school_logo = getattr(student.school, 'logo', None)
-    if school_logo:
-        try:
-            with school_logo.open('rb') as logo_file:
-                logo = Image.open(logo_file).convert('RGBA')
-                logo = ImageOps.contain(logo, (120, 70))
-                card.paste(logo, (860, 10), mask=logo if logo.mode == 'RGBA' else None)
-        except Exception:
-            pass
+    logo = rendition_bytes(getattr(student.school, 'logo', None), 'logo')
+    if logo:
+        logo = Image.open(BytesIO(logo))
+        card.paste(logo, (860, 10), mask=logo if logo.mode == 'RGBA' else None)
 
     if include_qr:
         draw.rectangle([(740, 430), (900, 590)], outline='black')
@@ -0,0 +1,196 @@
+"""One-page student profile (identity, history, documents, attendance, fees, exams)."""
+from __future__ import annotations
+
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
+
+from .models import DocumentType, Student, StudentDocument, StudentSessionRecord
+
+
+PROFILE_CACHE_TIMEOUT = 60 * 15
+PROFILE_RECENT_RESULTS = 5
+
+
+def _version_key(student_id):
+    return f"student-profile:version:{student_id}"
+
+
+def student_profile_version(student_id):
+    key = _version_key(student_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_student_profile_versions(student_ids) -> None:
+    version = time.time_ns()
+    cache.set_many({_version_key(student_id): version for student_id in set(student_ids)}, None)
+
+
+def _session_history(student):
+    return [
+        {
+            'session': record.session.name,
+            'class_name': record.school_class.name,
+            'section': record.section.name,
+            'roll_number': record.roll_number or '',
+            'status': record.get_status_display(),
+            'is_current': record.is_current,
+        }
+        for record in student.session_records.all()
+    ]
+
+
+def _document_status(student):
+    required_types = DocumentType.objects.filter(
+        school_id=student.school_id,
+        is_active=True,
+        is_mandatory=True,
+        required_for__in=[DocumentType.FOR_BOTH, student.admission_type],
+    ).order_by('name')
+    documents = list(student.documents.all())
+    approved_type_ids = {
+        document.document_type_id for document in documents if document.status == StudentDocument.STATUS_APPROVED
+    }
+    counts = {status: 0 for status, _ in StudentDocument.STATUS_CHOICES}
+    for document in documents:
+        counts[document.status] = counts.get(document.status, 0) + 1
+    return {
+        'documents': [
+            {
+                'document_type': document.document_type.name,
+                'status': document.get_status_display(),
+                'uploaded_at': document.uploaded_at,
+            }
+            for document in documents
+        ],
+        'counts': counts,
+        'missing_required': [doc_type.name for doc_type in required_types if doc_type.id not in approved_type_ids],
+    }
+
+
+def _attendance_to_date(student, today):
+    if not apps.is_installed('apps.core.attendance'):
+        return None
+    from apps.core.attendance.models import StudentAttendance
+    from apps.core.attendance.services import session_attendance_percentages
+
+    session = student.session
+    breakdown = StudentAttendance.objects.filter(
+        student=student,
+        session=session,
+        date__range=(session.start_date, min(today, session.end_date)),
+    ).aggregate(
+        marked_days=Count('id'),
+        **{
+            f"{status}_days": Count('id', filter=Q(status=status))
+            for status, _ in StudentAttendance.STATUS_CHOICES
+        },
+    )
+    breakdown['percentage'] = session_attendance_percentages(
+        session=session,
+        student_ids=[student.id],
+        upto=today,
+    )[student.id]
+    return breakdown
+
+
+def _fee_outstanding(student):
+    if not apps.is_installed('apps.core.fees'):
+        return None
+    from apps.core.fees.services import principal_outstanding
+
+    return principal_outstanding(student=student, session=student.session)
+
+
+def _latest_results(student):
+    if not apps.is_installed('apps.core.exams'):
+        return []
+    from apps.core.exams.models import ExamResultSummary
+
+    return [
+        {
+            'exam_type': summary.exam.exam_type.name,
+            'end_date': summary.exam.end_date,
+            'session': summary.session.name,
+            'percentage': summary.percentage,
+            'grade': summary.grade,
+            'rank': summary.rank,
+            'result_status': summary.get_result_status_display(),
+        }
+        for summary in ExamResultSummary.objects.filter(student=student).select_related(
+            'exam', 'exam__exam_type', 'session',
+        ).order_by('-exam__end_date', '-id')[:PROFILE_RECENT_RESULTS]
+    ]
+
+
+def build_student_profile(*, school, student_id, today=None) -> dict | None:
+    """Assemble the profile from the database; ``None`` when the student is not in ``school``."""
+    today = today or timezone.localdate()
+    student = Student.objects.filter(pk=student_id, school=school).select_related(
+        'school', 'session__school', 'current_class', 'current_section', 'parent_info',
+    ).prefetch_related(
+        Prefetch(
+            'session_records',
+            queryset=StudentSessionRecord.objects.select_related('session', 'school_class', 'section'),
+        ),
+        Prefetch(
+            'documents',
+            queryset=StudentDocument.objects.select_related('document_type').order_by('document_type__name', '-id'),
+        ),
+    ).first()
+    if student is None:
+        return None
+
+    parent = getattr(student, 'parent_info', None)
+    return {
+        'student': {
+            'id': student.id,
+            'admission_number': student.admission_number,
+            'full_name': student.full_name,
+            'gender': student.get_gender_display(),
+            'date_of_birth': student.date_of_birth,
+            'blood_group': student.get_blood_group_display(),
+            'admission_date': student.admission_date,
+            'admission_type': student.get_admission_type_display(),
+            'admission_finalized': student.admission_finalized,
+            'session': student.session.name,
+            'class_name': student.current_class.name if student.current_class else '',
+            'section': student.current_section.name if student.current_section else '',
+            'roll_number': student.roll_number or '',
+            'status': student.get_status_display(),
+            'avatar_url': student.avatar_url,
+        },
+        'parent': {
+            'father_name': parent.father_name,
+            'mother_name': parent.mother_name,
+            'guardian_name': parent.guardian_name,
+            'phone': parent.phone,
+            'email': parent.email,
+        } if parent else None,
+        'session_history': _session_history(student),
+        'documents': _document_status(student),
+        'attendance': _attendance_to_date(student, today),
+        'fee_outstanding': _fee_outstanding(student),
+        'latest_results': _latest_results(student),
+        'as_of': today,
+    }
+
+
+def student_profile(*, school, student_id) -> dict | None:
+    """Cached ``build_student_profile``; refreshed when the student's version changes or the day rolls over."""
+    today = timezone.localdate()
+    version = student_profile_version(student_id)
+    key = f"student-profile:{school.id}:{student_id}:{version}:{today.isoformat()}"
+    profile = cache.get(key)
+    if profile is None:
+        profile = build_student_profile(school=school, student_id=student_id, today=today)
+        if profile is not None:
+            cache.set(key, profile, PROFILE_CACHE_TIMEOUT)
+    return profile
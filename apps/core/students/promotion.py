@@ -0,0 +1,231 @@
+"""Move a session's students into the next session in one pass."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.academics.models import Section
+from apps.core.artifacts.services import invalidate_artifacts, student_scope
+
+from .models import Student, StudentSessionRecord, StudentStatusHistory
+from .profile import bump_student_profile_versions
+from .services import bulk_sync_student_subjects, queue_student_fee_sync
+
+
+ACTION_PROMOTE = 'promote'
+ACTION_RETAIN = 'retain'
+ACTION_TRANSFER = 'transfer'
+ACTION_ALUMNI = 'alumni'
+ACTION_CHOICES = (
+    (ACTION_PROMOTE, 'Promote'),
+    (ACTION_RETAIN, 'Retain'),
+    (ACTION_TRANSFER, 'Transferred'),
+    (ACTION_ALUMNI, 'Alumni'),
+)
+LEAVING_STATUSES = {
+    ACTION_TRANSFER: Student.STATUS_TRANSFERRED,
+    ACTION_ALUMNI: Student.STATUS_ALUMNI,
+}
+
+
+@dataclass
+class PromotionRow:
+    student: Student
+    action: str
+    target_section: Section | None = None
+    error: str = ''
+
+
+@dataclass
+class PromotionPlan:
+    source_session: object
+    target_session: object
+    rows: list = field(default_factory=list)
+
+    def counts(self):
+        counts = {action: 0 for action, _ in ACTION_CHOICES}
+        counts['errors'] = 0
+        for row in self.rows:
+            counts['errors' if row.error else row.action] += 1
+        return counts
+
+
+def default_section_mapping(*, school, source_session, target_session):
+    """Map each source section to the same-named section of the next class (by display order).
+
+    Sections of the last class map to ``None`` (passed out). When the next
+    class has no section of the same name its first section is used.
+    """
+    source_sections = list(
+        Section.objects.filter(
+            school_class__school=school,
+            school_class__session=source_session,
+            school_class__is_active=True,
+            is_active=True,
+        ).select_related('school_class')
+    )
+    target_sections = list(
+        Section.objects.filter(
+            school_class__school=school,
+            school_class__session=target_session,
+            school_class__is_active=True,
+            is_active=True,
+        ).select_related('school_class').order_by('school_class__display_order', 'name')
+    )
+    target_orders = sorted({section.school_class.display_order for section in target_sections})
+
+    mapping = {}
+    for section in source_sections:
+        next_order = next((order for order in target_orders if order > section.school_class.display_order), None)
+        candidates = [row for row in target_sections if row.school_class.display_order == next_order]
+        mapping[section.id] = next(
+            (row for row in candidates if row.name == section.name),
+            candidates[0] if candidates else None,
+        )
+    return mapping
+
+
+def plan_promotion(*, school, source_session, target_session, mapping, overrides=None) -> PromotionPlan:
+    """Build a promotion preview.
+
+    ``mapping`` is ``{source_section_id: target Section or None}``; ``overrides``
+    is ``{student_id: action}`` for students that should not simply follow it.
+    """
+    if source_session.school_id != school.id or target_session.school_id != school.id:
+        raise ValidationError('Both sessions must belong to the selected school.')
+    if source_session.id == target_session.id:
+        raise ValidationError('Target session must differ from the source session.')
+
+    overrides = overrides or {}
+    allowed_actions = {action for action, _ in ACTION_CHOICES}
+    for action in overrides.values():
+        if action not in allowed_actions:
+            raise ValidationError('Invalid promotion action.')
+
+    for target in mapping.values():
+        if target is not None and (
+            target.school_class.session_id != target_session.id or target.school_class.school_id != school.id
+        ):
+            raise ValidationError('Target sections must belong to the target session.')
+
+    retain_sections = {
+        (section.school_class.name, section.name): section
+        for section in Section.objects.filter(
+            school_class__school=school,
+            school_class__session=target_session,
+            is_active=True,
+        ).select_related('school_class')
+    }
+
+    plan = PromotionPlan(source_session=source_session, target_session=target_session)
+    for student in Student.objects.filter(
+        school=school,
+        session=source_session,
+        current_section_id__in=list(mapping),
+        status=Student.STATUS_ACTIVE,
+        is_archived=False,
+    ).select_related('current_class', 'current_section').order_by(
+        'current_class__display_order', 'current_section__name', 'admission_number',
+    ):
+        target = mapping[student.current_section_id]
+        action = overrides.get(student.id) or (ACTION_PROMOTE if target is not None else ACTION_ALUMNI)
+        row = PromotionRow(student=student, action=action)
+        if action == ACTION_PROMOTE:
+            row.target_section = target
+            if target is None:
+                row.error = 'No target section mapped for this section.'
+        elif action == ACTION_RETAIN:
+            row.target_section = retain_sections.get((student.current_class.name, student.current_section.name))
+            if row.target_section is None:
+                row.error = 'Same class and section do not exist in the target session.'
+        plan.rows.append(row)
+    return plan
+
+
+@transaction.atomic
+def apply_promotion(*, plan: PromotionPlan, changed_by=None):
+    """Write a promotion plan with bulk statements; rows with errors are left untouched."""
+    source_session = plan.source_session
+    target_session = plan.target_session
+    rows = [row for row in plan.rows if not row.error]
+    if not rows:
+        return plan.counts()
+
+    reason = f"Promotion from {source_session.name} to {target_session.name}"
+    moving = [row for row in rows if row.target_section is not None]
+    leaving = [row for row in rows if row.action in LEAVING_STATUSES]
+    history = []
+    now = timezone.now()
+
+    for row in rows:
+        # bulk_update() skips auto_now.
+        row.student.updated_at = now
+    for row in moving:
+        student = row.student
+        student.session = target_session
+        student.current_class = row.target_section.school_class
+        student.current_section = row.target_section
+        student.roll_number = None
+    for row in leaving:
+        student = row.student
+        new_status = LEAVING_STATUSES[row.action]
+        history.append(StudentStatusHistory(
+            student=student,
+            old_status=student.status,
+            new_status=new_status,
+            changed_by=changed_by,
+            reason=reason,
+        ))
+        student.status = new_status
+        student.is_active = False
+
+    Student.objects.bulk_update(
+        [row.student for row in rows],
+        ['session', 'current_class', 'current_section', 'roll_number', 'status', 'is_active', 'updated_at'],
+        batch_size=500,
+    )
+    StudentStatusHistory.objects.bulk_create(history, batch_size=500)
+
+    # Session records: close the source year, then upsert one current row per moving student.
+    for action, status in LEAVING_STATUSES.items():
+        leaving_ids = [row.student.id for row in leaving if row.action == action]
+        if leaving_ids:
+            StudentSessionRecord.objects.filter(student_id__in=leaving_ids, session=source_session).update(status=status)
+    moving_ids = [row.student.id for row in moving]
+    StudentSessionRecord.objects.filter(student_id__in=moving_ids, is_current=True).exclude(
+        session=target_session,
+    ).update(is_current=False)
+
+    existing_records = {
+        record.student_id: record
+        for record in StudentSessionRecord.objects.filter(student_id__in=moving_ids, session=target_session)
+    }
+    new_records = []
+    for row in moving:
+        record = existing_records.get(row.student.id)
+        if record is None:
+            record = StudentSessionRecord(student=row.student, session=target_session)
+            new_records.append(record)
+        record.school_id = row.student.school_id
+        record.school_class = row.target_section.school_class
+        record.section = row.target_section
+        record.roll_number = None
+        record.status = Student.STATUS_ACTIVE
+        record.is_current = True
+    StudentSessionRecord.objects.bulk_update(
+        list(existing_records.values()),
+        ['school', 'school_class', 'section', 'roll_number', 'status', 'is_current'],
+        batch_size=500,
+    )
+    StudentSessionRecord.objects.bulk_create(new_records, batch_size=500)
+
+    bulk_sync_student_subjects([row.student for row in moving])
+    invalidate_artifacts(scopes=[student_scope(row.student.id) for row in rows])
+    bump_student_profile_versions([row.student.id for row in rows])
+
+    queue_student_fee_sync(moving_ids, previous_session=source_session)
+
+    return plan.counts()
@@ -0,0 +1,190 @@
+"""Indexed student search over names, admission numbers and parent contacts."""
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+
+from django.db.models import Case, Count, F, IntegerField, Max, Q, Value, When
+
+from .models import Parent, StudentSearchTerm
+
+
+SEARCH_RESULT_LIMIT = 200
+NARROW_CANDIDATES = 500
+TERM_MAX_LENGTH = 64
+TRIGRAM_PREFIX = '~'
+PREFIX_END = '\U0010ffff'
+
+WEIGHT_ADMISSION = 4
+WEIGHT_NAME = 3
+WEIGHT_PARENT = 2
+WEIGHT_CONTACT = 1
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def normalize_words(text) -> list:
+    """Casefolded words of ``text`` with accents stripped."""
+    decomposed = unicodedata.normalize('NFKD', str(text or ''))
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return [word.replace('_', '') for word in _WORD_RE.findall(folded) if word.strip('_')]
+
+
+def trigrams(word) -> set:
+    padded = f"  {word} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def student_search_terms(*, admission_number='', first_name='', last_name='', parent=None) -> dict:
+    """``{term: weight}`` for one student; ``parent`` is any object with Parent's fields, or ``None``."""
+    weighted = [
+        (normalize_words(admission_number), WEIGHT_ADMISSION),
+        (normalize_words(f"{first_name} {last_name}"), WEIGHT_NAME),
+    ]
+    compact_admission = ''.join(normalize_words(admission_number))
+    if compact_admission:
+        # "ADM-2026-14" is also findable as "adm202614".
+        weighted.append(([compact_admission], WEIGHT_ADMISSION))
+    if parent is not None:
+        weighted.append((
+            normalize_words(f"{parent.father_name} {parent.mother_name} {parent.guardian_name}"),
+            WEIGHT_PARENT,
+        ))
+        weighted.append(([re.sub(r'\D', '', parent.phone or '')], WEIGHT_CONTACT))
+        weighted.append((normalize_words((parent.email or '').split('@')[0]), WEIGHT_CONTACT))
+
+    terms = {}
+    for words, weight in weighted:
+        for word in words:
+            if not word:
+                continue
+            word = word[:TERM_MAX_LENGTH]
+            terms[word] = max(terms.get(word, 0), weight)
+            if weight in (WEIGHT_NAME, WEIGHT_PARENT) and not word.isdigit():
+                for gram in trigrams(word):
+                    terms.setdefault(f"{TRIGRAM_PREFIX}{gram}", 1)
+    return terms
+
+
+def reindex_students(students) -> int:
+    """Rebuild search terms for the given students; returns the number of terms written."""
+    students = [student for student in students if student.pk]
+    if not students:
+        return 0
+
+    student_ids = [student.id for student in students]
+    parents = {parent.student_id: parent for parent in Parent.objects.filter(student_id__in=student_ids)}
+    rows = [
+        StudentSearchTerm(school_id=student.school_id, student_id=student.id, term=term, weight=weight)
+        for student in students
+        for term, weight in student_search_terms(
+            admission_number=student.admission_number,
+            first_name=student.first_name,
+            last_name=student.last_name,
+            parent=parents.get(student.id),
+        ).items()
+    ]
+    StudentSearchTerm.objects.filter(student_id__in=student_ids).delete()
+    StudentSearchTerm.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _prefix(token):
+    return Q(term__gte=token, term__lt=f"{token}{PREFIX_END}")
+
+
+def _trigram_terms(token):
+    if len(token) < 3 or token.isdigit():
+        return []
+    return [f"{TRIGRAM_PREFIX}{gram}" for gram in trigrams(token)]
+
+
+def _fuzzy_threshold(grams):
+    return max(2, math.ceil(len(grams) / 2))
+
+
+def _token_scores(terms, token, *, fuzzy):
+    """``{student_id: score}`` for one token from a single index range scan (or trigram lookup)."""
+    scores = dict(
+        terms.filter(_prefix(token))
+        .values('student_id')
+        .annotate(score=Max(Case(
+            When(term=token, then=F('weight') + 20),
+            default=F('weight') + 10,
+            output_field=IntegerField(),
+        )))
+        .order_by()
+        .values_list('student_id', 'score')
+    )
+
+    grams = _trigram_terms(token) if fuzzy else []
+    if grams:
+        # Trigrams are stored once per student, so the row count is the number the token
+        # shares with all of the student's name and parent words together, not with one word.
+        for student_id, shared in (
+            terms.filter(term__in=grams)
+            .values('student_id')
+            .annotate(shared=Count('term'))
+            .filter(shared__gte=_fuzzy_threshold(grams))
+            .values_list('student_id', 'shared')
+        ):
+            scores.setdefault(student_id, shared)
+    return scores
+
+
+def _ranked(*, school, tokens, fuzzy):
+    terms = StudentSearchTerm.objects.filter(school=school)
+    scores = None
+    # Longest tokens are usually the rarest; once few students are left, the
+    # broader tokens are only looked up for those students.
+    for token in sorted(tokens, key=len, reverse=True):
+        scoped = terms
+        if scores is not None and len(scores) <= NARROW_CANDIDATES:
+            scoped = terms.filter(student_id__in=list(scores))
+        token_scores = _token_scores(scoped, token, fuzzy=fuzzy)
+        if scores is None:
+            scores = token_scores
+        else:
+            scores = {
+                student_id: scores[student_id] + score
+                for student_id, score in token_scores.items()
+                if student_id in scores
+            }
+        if not scores:
+            return []
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def ranked_student_ids(*, school, query, limit=SEARCH_RESULT_LIMIT) -> list:
+    """``[(student_id, rank), ...]`` best first, for students of ``school`` matching every query token.
+
+    Trigram (typo-tolerant) matching is only tried when no student matches every token by prefix.
+    ``limit=None`` returns every match.
+    """
+    tokens = list(dict.fromkeys(normalize_words(query)))[:8]
+    if not tokens:
+        return []
+    ranked = _ranked(school=school, tokens=tokens, fuzzy=False)
+    if not ranked and any(_trigram_terms(token) for token in tokens):
+        ranked = _ranked(school=school, tokens=tokens, fuzzy=True)
+    return ranked if limit is None else ranked[:limit]
+
+
+def search_students(queryset, *, school, query, limit=SEARCH_RESULT_LIMIT):
+    """Restrict ``queryset`` to the best ``limit`` matches, annotated with ``search_rank`` and ordered by it.
+
+    Returns ``(queryset, total)``, where ``total`` counts every match in the school.
+    """
+    ranked = ranked_student_ids(school=school, query=query, limit=None)
+    total = len(ranked)
+    ranked = ranked[:limit]
+    if not ranked:
+        return queryset.none(), total
+    return queryset.filter(id__in=[student_id for student_id, _ in ranked]).annotate(
+        search_rank=Case(
+            *(When(id=student_id, then=Value(rank)) for student_id, rank in ranked),
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+    ).order_by('-search_rank', 'admission_number', 'id'), total
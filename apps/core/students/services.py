@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+from io import BytesIO
 from typing import Iterable
 
-from PIL import Image, ImageDraw, ImageOps
+from PIL import Image, ImageDraw
+from django.apps import apps
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.utils import timezone
 
 from apps.core.academics.models import ClassSubject
+from apps.core.artifacts.models import GeneratedArtifact
+from apps.core.artifacts.services import ArtifactDocument, student_scope
+from apps.core.utils.images import rendition_bytes
 
+from .id_cards import id_card_payload, logo_thumbnail, render_id_card, stream_id_card_sheets_pdf
 from .models import (
     DocumentType,
     Student,
@@ -19,6 +25,9 @@ from .models import (
 )
 
 
+ID_CARD_TEMPLATE_VERSION = 1
+
+
 def get_required_document_types(student: Student):
     required_for = [DocumentType.FOR_BOTH, student.admission_type]
     return DocumentType.objects.filter(
@@ -128,6 +137,157 @@ def sync_student_academic_links(student: Student) -> None:
     sync_student_subjects(student)
 
 
+@transaction.atomic
+def bulk_sync_student_subjects(students: Iterable[Student]) -> int:
+    """Run ``sync_student_subjects`` for many students with one read per table and bulk writes.
+
+    Returns how many of the students had subject rows created, reactivated or deactivated.
+    """
+    students = [student for student in students if student.session_id]
+    if not students:
+        return 0
+
+    mapped_subjects = {}
+    for class_id, subject_id in ClassSubject.objects.filter(
+        school_class_id__in={student.current_class_id for student in students if student.current_class_id},
+        subject__is_active=True,
+    ).order_by().values_list('school_class_id', 'subject_id'):
+        mapped_subjects.setdefault(class_id, set()).add(subject_id)
+
+    sessions_by_student = {student.id: student.session_id for student in students}
+    existing_subjects = {}
+    for row in StudentSubject.objects.filter(
+        student_id__in=list(sessions_by_student),
+        session_id__in=set(sessions_by_student.values()),
+    ).order_by():
+        if row.session_id == sessions_by_student[row.student_id]:
+            existing_subjects.setdefault(row.student_id, {})[row.subject_id] = row
+
+    to_create = []
+    to_update = []
+    stale_ids = []
+    touched = set()
+    for student in students:
+        mapped = mapped_subjects.get(student.current_class_id, set()) if student.current_class_id else set()
+        current = existing_subjects.get(student.id, {})
+        for subject_id, row in current.items():
+            if subject_id not in mapped:
+                if row.is_active:
+                    stale_ids.append(row.id)
+                    touched.add(student.id)
+            elif not row.is_active or row.school_class_id != student.current_class_id:
+                row.is_active = True
+                row.school_class_id = student.current_class_id
+                to_update.append(row)
+                touched.add(student.id)
+        for subject_id in mapped.difference(current):
+            to_create.append(StudentSubject(
+                student=student,
+                subject_id=subject_id,
+                school_class_id=student.current_class_id,
+                session_id=student.session_id,
+                is_active=True,
+            ))
+            touched.add(student.id)
+
+    if to_create:
+        StudentSubject.objects.bulk_create(to_create, batch_size=500)
+    if to_update:
+        StudentSubject.objects.bulk_update(to_update, ['is_active', 'school_class'], batch_size=500)
+    if stale_ids:
+        StudentSubject.objects.filter(id__in=stale_ids).update(is_active=False)
+    return len(touched)
+
+
+@transaction.atomic
+def sync_class_student_subjects(school_class) -> int:
+    """Align every enrolled student of a class with its current subject mappings.
+
+    One read of the class's subject rows, then at most three writes: an insert
+    for missing rows, one UPDATE reactivating rows and one deactivating stale
+    rows. Returns how many students had any row changed.
+    """
+    student_ids = list(
+        Student.objects.filter(
+            current_class=school_class,
+            session_id=school_class.session_id,
+            is_archived=False,
+        ).order_by().values_list('id', flat=True)
+    )
+    if not student_ids:
+        return 0
+
+    mapped = set(
+        ClassSubject.objects.filter(school_class=school_class, subject__is_active=True)
+        .order_by()
+        .values_list('subject_id', flat=True)
+    )
+    present = set()
+    reactivate_ids = []
+    stale_ids = []
+    touched = set()
+    for row_id, student_id, subject_id, is_active, class_id in StudentSubject.objects.filter(
+        student_id__in=student_ids,
+        session_id=school_class.session_id,
+    ).order_by().values_list('id', 'student_id', 'subject_id', 'is_active', 'school_class_id'):
+        present.add((student_id, subject_id))
+        if subject_id in mapped:
+            if not is_active or class_id != school_class.id:
+                reactivate_ids.append(row_id)
+                touched.add(student_id)
+        elif is_active:
+            stale_ids.append(row_id)
+            touched.add(student_id)
+
+    to_create = [
+        StudentSubject(
+            student_id=student_id,
+            subject_id=subject_id,
+            school_class=school_class,
+            session_id=school_class.session_id,
+            is_active=True,
+        )
+        for student_id in student_ids
+        for subject_id in mapped
+        if (student_id, subject_id) not in present
+    ]
+    touched.update(row.student_id for row in to_create)
+
+    if to_create:
+        StudentSubject.objects.bulk_create(to_create, batch_size=1000)
+    if reactivate_ids:
+        StudentSubject.objects.filter(id__in=reactivate_ids).update(is_active=True, school_class=school_class)
+    if stale_ids:
+        StudentSubject.objects.filter(id__in=stale_ids).update(is_active=False)
+    return len(touched)
+
+
+def _sync_fees_for_students(student_ids, previous_session_id=None):
+    from apps.core.academic_sessions.models import AcademicSession
+    from apps.core.fees.services import sync_student_fees_for_student
+
+    previous_session = None
+    if previous_session_id:
+        previous_session = AcademicSession.objects.filter(pk=previous_session_id).first()
+    for student in Student.objects.filter(pk__in=student_ids, is_archived=False).select_related(
+        'school', 'session', 'current_class',
+    ):
+        try:
+            sync_student_fees_for_student(student=student, previous_session=previous_session)
+        except Exception:
+            # Fee sync should not block bulk student writes, same as the save signal.
+            pass
+
+
+def queue_student_fee_sync(student_ids, previous_session=None) -> None:
+    """Fee sync for students written with bulk statements, which skip the Student save signals."""
+    student_ids = list(student_ids)
+    if not student_ids or not apps.is_installed('apps.core.fees'):
+        return
+    previous_session_id = previous_session.id if previous_session else None
+    transaction.on_commit(lambda: _sync_fees_for_students(student_ids, previous_session_id))
+
+
 @transaction.atomic
 def finalize_admission(student: Student, finalized_by=None) -> Student:
     missing_document_type_ids = get_missing_required_documents(student)
@@ -182,46 +342,6 @@ def archive_student(student: Student, reason: str = ''):
     student.delete()
 
 
-def _build_qr_fallback(payload: str):
-    """
-    Lightweight QR-like fallback when `qrcode` package is unavailable.
-    Produces a deterministic square code based on payload hash.
-    """
-    import hashlib
-
-    digest = hashlib.sha256(payload.encode('utf-8')).digest()
-    size = 29
-    scale = 6
-    image = Image.new('RGB', (size * scale, size * scale), 'white')
-    draw = ImageDraw.Draw(image)
-
-    bit_index = 0
-    for row in range(size):
-        for col in range(size):
-            byte = digest[(bit_index // 8) % len(digest)]
-            bit = (byte >> (bit_index % 8)) & 1
-            if bit:
-                x1 = col * scale
-                y1 = row * scale
-                draw.rectangle((x1, y1, x1 + scale - 1, y1 + scale - 1), fill='black')
-            bit_index += 1
-
-    return image
-
-
-def _make_qr_image(payload: str):
-    try:
-        import qrcode
-
-        qr = qrcode.QRCode(border=1, box_size=8)
-        qr.add_data(payload)
-        qr.make(fit=True)
-        image = qr.make_image(fill_color='black', back_color='white')
-        return image.convert('RGB')
-    except Exception:
-        return _build_qr_fallback(payload)
-
-
 def _build_transfer_certificate_image(student: Student):
     page = Image.new('RGB', (1240, 1754), color='white')
     draw = ImageDraw.Draw(page)
@@ -249,14 +369,9 @@ def _build_transfer_certificate_image(student: Student):
     draw.text((90, 1450), 'This certificate is system generated by AHV School ERP.', fill='black')
     draw.text((900, 1580), 'Authorized Signatory', fill='black')
 
-    if student.photo:
-        try:
-            with student.photo.open('rb') as photo_file:
-                photo = Image.open(photo_file).convert('RGB')
-                photo = ImageOps.fit(photo, (220, 260))
-                page.paste(photo, (930, 250))
-        except Exception:
-            pass
+    photo = rendition_bytes(student.photo, 'certificate') if student.photo else None
+    if photo:
+        page.paste(Image.open(BytesIO(photo)).convert('RGB'), (930, 250))
 
     return page
 
@@ -266,9 +381,31 @@ def generate_id_card_pdf(student: Student, include_qr: bool = False) -> bytes:
     return image_to_pdf_bytes([card])
 
 
+def id_card_document(student: Student, include_qr: bool = False):
+    school_logo = getattr(student.school, 'logo', None) if student.school_id else None
+    source = {
+        'student_id': student.id,
+        'school_name': student.school.name if student.school_id else '',
+        'full_name': student.full_name,
+        'admission_number': student.admission_number,
+        'class_name': student.current_class.name if student.current_class else '',
+        'section_name': student.current_section.name if student.current_section else '',
+        'session_name': student.session.name if student.session_id else '',
+        'photo': student.photo.name if student.photo else '',
+        'logo': school_logo.name if school_logo else '',
+        'include_qr': include_qr,
+    }
+    return ArtifactDocument(
+        kind=GeneratedArtifact.KIND_ID_CARD,
+        template_version=ID_CARD_TEMPLATE_VERSION,
+        scope=student_scope(student.id),
+        source=source,
+        render=lambda: generate_id_card_pdf(student, include_qr=include_qr),
+    )
+
+
 def generate_bulk_id_cards_pdf(students: Iterable[Student], include_qr: bool = False) -> bytes:
-    cards = [build_student_id_card_image(student, include_qr=include_qr) for student in students]
-    return image_to_pdf_bytes(cards)
+    return b''.join(stream_id_card_sheets_pdf(students, include_qr=include_qr))
 
 
 def generate_transfer_certificate_pdf(student: Student) -> bytes:
@@ -279,45 +416,5 @@ def generate_transfer_certificate_pdf(student: Student) -> bytes:
 
 
 def build_student_id_card_image(student: Student, include_qr: bool = False):
-    card = Image.new('RGB', (1000, 600), color='white')
-    draw = ImageDraw.Draw(card)
-    draw.rectangle((0, 0, 1000, 90), fill=(37, 99, 235))
-
-    school_name = student.school.name if student.school_id else 'School'
-    draw.text((24, 30), school_name, fill='white')
-    draw.text((24, 112), f"Name: {student.full_name}", fill='black')
-    draw.text((24, 160), f"Admission No: {student.admission_number}", fill='black')
-    draw.text((24, 208), f"Class: {student.current_class.name if student.current_class else '-'}", fill='black')
-    draw.text((24, 256), f"Section: {student.current_section.name if student.current_section else '-'}", fill='black')
-    draw.text((24, 304), f"Session: {student.session.name if student.session_id else '-'}", fill='black')
-
-    if student.photo:
-        try:
-            with student.photo.open('rb') as photo_file:
-                photo = Image.open(photo_file).convert('RGB')
-                photo = ImageOps.fit(photo, (220, 260))
-                card.paste(photo, (740, 130))
-        except Exception:
-            draw.rectangle((740, 130, 960, 390), outline='black')
-            draw.text((790, 250), 'PHOTO', fill='black')
-    else:
-        draw.rectangle((740, 130, 960, 390), outline='black')
-        draw.text((790, 250), 'PHOTO', fill='black')
-
-    school_logo = getattr(student.school, 'logo', None) if student.school_id else None
-    if school_logo:
-        try:
-            with school_logo.open('rb') as logo_file:
-                logo = Image.open(logo_file).convert('RGBA')
-                logo = ImageOps.contain(logo, (120, 70))
-                card.paste(logo, (860, 10), mask=logo if logo.mode == 'RGBA' else None)
-        except Exception:
-            pass
-
-    if include_qr:
-        qr_payload = f"STUDENT:{student.id}:{student.admission_number}"
-        qr_image = _make_qr_image(qr_payload)
-        qr_image = ImageOps.contain(qr_image, (170, 170))
-        card.paste(qr_image, (730, 420))
-
-    return card
+    school = student.school if student.school_id else None
+    return render_id_card(id_card_payload(student, include_qr=include_qr), logo=logo_thumbnail(school))
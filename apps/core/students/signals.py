@@ -0,0 +1,73 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.core.utils.images import generate_renditions
+
+from .blobs import blob_field_names, stored_blob_names, sync_blob_references
+from .models import Parent, Student, StudentDocument, StudentSessionRecord
+from .profile import bump_student_profile_versions
+from .search import reindex_students
+
+
+SEARCH_FIELDS = {'admission_number', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Student)
+def reindex_student_search(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS.intersection(update_fields):
+        return
+    reindex_students([instance])
+
+
+@receiver(post_save, sender=Student)
+def build_student_photo_renditions(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'photo' not in update_fields:
+        return
+    if instance.photo:
+        generate_renditions(instance.photo)
+
+
+@receiver(post_save, sender=Parent)
+@receiver(post_delete, sender=Parent)
+def reindex_parent_student_search(sender, instance, **kwargs):
+    student = Student.objects.filter(pk=instance.student_id).first()
+    if student:
+        reindex_students([student])
+
+
+@receiver(post_save, sender=Student)
+def bump_student_profile_on_student_change(sender, instance, **kwargs):
+    bump_student_profile_versions([instance.pk])
+
+
+@receiver(post_save, sender=Parent)
+@receiver(post_delete, sender=Parent)
+@receiver(post_save, sender=StudentDocument)
+@receiver(post_delete, sender=StudentDocument)
+@receiver(post_save, sender=StudentSessionRecord)
+@receiver(post_delete, sender=StudentSessionRecord)
+def bump_student_profile_on_related_change(sender, instance, **kwargs):
+    bump_student_profile_versions([instance.student_id])
+
+
+@receiver(pre_save, sender=Student)
+@receiver(pre_save, sender=StudentDocument)
+def remember_stored_blob_names(sender, instance, update_fields=None, **kwargs):
+    instance._stored_blob_names = stored_blob_names(instance, update_fields)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=StudentDocument)
+def update_blob_references_on_save(sender, instance, **kwargs):
+    previous = getattr(instance, '_stored_blob_names', None)
+    if previous is None:
+        return
+    current = blob_field_names(instance)
+    if current != previous:
+        sync_blob_references(current | previous)
+
+
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=StudentDocument)
+def update_blob_references_on_delete(sender, instance, **kwargs):
+    sync_blob_references(blob_field_names(instance))
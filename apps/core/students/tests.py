@@ -1,31 +1,56 @@
 import shutil
 import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from PIL import Image
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.core.files.base import ContentFile
+from django.core.management import call_command
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from apps.core.academic_sessions.models import AcademicSession
 from apps.core.academics.models import ClassSubject, SchoolClass, Section, Subject
 from apps.core.schools.models import School
+from apps.core.utils.images import RENDITIONS, rendition_name
 
 from .models import (
     DocumentType,
     Parent,
+    StoredBlob,
     Student,
     StudentDocument,
     StudentSessionRecord,
     StudentStatusHistory,
     StudentSubject,
 )
+from .blobs import collect_blobs, school_can_read_blob
+from .documents import missing_documents_report
+from .id_cards import (
+    CARDS_PER_SHEET,
+    SHEET_SIZE,
+    id_card_sheet_payloads,
+    render_id_card_sheet,
+    stream_id_card_sheets_pdf,
+)
+from .importer import import_students, iter_import_rows
+from .profile import student_profile
+from .promotion import ACTION_RETAIN, ACTION_TRANSFER, apply_promotion, default_section_mapping, plan_promotion
+from .search import ranked_student_ids
 from .services import (
     change_student_status,
     finalize_admission,
+    generate_bulk_id_cards_pdf,
     generate_id_card_pdf,
     generate_transfer_certificate_pdf,
+    sync_class_student_subjects,
     sync_student_academic_links,
 )
 
@@ -206,6 +231,65 @@ class StudentLifecycleServiceTests(TestCase):
         pdf_bytes = generate_id_card_pdf(self.student, include_qr=True)
         self.assertTrue(pdf_bytes.startswith(b'%PDF'))
 
+    def test_id_card_sheets_gang_ten_cards_per_a4_page(self):
+        for index in range(11):
+            Student.objects.create(
+                school=self.school,
+                session=self.session,
+                admission_number=f'SHEET-{index:02d}',
+                first_name='Sheet',
+                admission_type=Student.ADMISSION_FRESH,
+                current_class=self.school_class,
+                current_section=self.section,
+            )
+        students = Student.objects.filter(school=self.school).select_related(
+            'school', 'session', 'current_class', 'current_section',
+        ).order_by('admission_number')
+
+        sheets = list(id_card_sheet_payloads(students))
+        self.assertEqual([len(sheet['cards']) for sheet in sheets], [CARDS_PER_SHEET, 2])
+        self.assertEqual(render_id_card_sheet(sheets[1]).size, SHEET_SIZE)
+
+        pdf_bytes = b''.join(stream_id_card_sheets_pdf(students, workers=1))
+        self.assertTrue(pdf_bytes.startswith(b'%PDF'))
+        self.assertIn(b'/Count 2', pdf_bytes)
+        self.assertIn(b'/MediaBox [0 0 595.2 841.92]', pdf_bytes)
+
+    def test_photo_upload_builds_upright_renditions(self):
+        photo = Image.new('RGB', (600, 200), 'red')
+        photo.paste(Image.new('RGB', (300, 200), 'blue'), (300, 0))
+        exif = Image.Exif()
+        exif[0x0112] = 6  # stored sideways; shown rotated 90 degrees clockwise
+        upload = BytesIO()
+        photo.save(upload, format='JPEG', exif=exif)
+        self.student.photo.save('sideways.jpg', ContentFile(upload.getvalue()))
+
+        storage = self.student.photo.storage
+        id_card = Image.open(storage.open(rendition_name(self.student.photo.name, 'id_card')))
+        self.assertEqual(id_card.size, RENDITIONS['id_card'].size)
+        red, green, blue = id_card.getpixel((110, 10))
+        self.assertGreater(red, blue)
+        self.assertTrue(storage.exists(rendition_name(self.student.photo.name, 'avatar')))
+
+        with mock.patch.object(type(self.student.photo), 'open', side_effect=AssertionError('original reopened')):
+            self.assertTrue(generate_bulk_id_cards_pdf([self.student]).startswith(b'%PDF'))
+
+    def test_build_image_renditions_backfills_missing_files(self):
+        upload = BytesIO()
+        Image.new('RGB', (1200, 900), 'green').save(upload, format='JPEG')
+        self.student.photo.save('old.jpg', ContentFile(upload.getvalue()), save=False)
+        Student.objects.filter(pk=self.student.pk).update(photo=self.student.photo.name)
+        avatar_name = rendition_name(self.student.photo.name, 'avatar')
+        self.assertFalse(self.student.photo.storage.exists(avatar_name))
+        self.assertEqual(self.student.avatar_url, self.student.photo.url)
+
+        output = StringIO()
+        call_command('build_image_renditions', stdout=output)
+
+        self.assertTrue(self.student.photo.storage.exists(avatar_name))
+        self.assertEqual(self.student.avatar_url, self.student.photo.storage.url(avatar_name))
+        self.assertIn('wrote 2 rendition(s)', output.getvalue())
+
     def test_transfer_certificate_requires_transferred_status(self):
         with self.assertRaises(ValidationError):
             generate_transfer_certificate_pdf(self.student)
@@ -333,11 +417,716 @@ class StudentLifecycleViewTests(TestCase):
         self.client.login(username='view_admin', password='pass12345')
         self._create_student('ADM-V-300')
 
-        response = self.client.get(reverse('student_id_card_bulk_download'))
-        self.assertEqual(response.status_code, 200)
-        self.assertIn('application/pdf', response['Content-Type'])
+        with override_settings(DOCUMENT_RENDER_WORKERS=1):
+            response = self.client.get(reverse('student_id_card_bulk_download'))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('application/pdf', response['Content-Type'])
+            self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_student_profile_page_renders(self):
+        self.client.login(username='view_admin', password='pass12345')
+        student = self._create_student('ADM-V-400')
+
+        response = self.client.get(reverse('student_profile', args=[student.id]))
+        self.assertContains(response, 'ADM-V-400')
+        self.assertContains(response, 'Session History')
 
     def test_teacher_cannot_access_student_lifecycle_pages(self):
         self.client.login(username='view_teacher', password='pass12345')
         response = self.client.get(reverse('student_list'))
         self.assertEqual(response.status_code, 403)
+
+
+class StudentPromotionTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name='Promotion School', code='promo_school')
+        self.source = AcademicSession.objects.create(
+            school=self.school,
+            name='2025-26',
+            start_date='2025-04-01',
+            end_date='2026-03-31',
+        )
+        self.target = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+        )
+        self.subject = Subject.objects.create(school=self.school, name='Science', code='SCI')
+
+        self.sections = {}
+        for session in (self.source, self.target):
+            for order, name in ((6, '6th'), (7, '7th')):
+                school_class = SchoolClass.objects.create(
+                    school=self.school,
+                    session=session,
+                    name=name,
+                    display_order=order,
+                )
+                ClassSubject.objects.create(school_class=school_class, subject=self.subject)
+                self.sections[(session.id, name)] = Section.objects.create(school_class=school_class, name='A')
+
+        self.admin = get_user_model().objects.create_user(
+            username='promotion_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+
+    def _create_student(self, admission_number, class_name):
+        section = self.sections[(self.source.id, class_name)]
+        student = Student.objects.create(
+            school=self.school,
+            session=self.source,
+            admission_number=admission_number,
+            first_name='Kiran',
+            current_class=section.school_class,
+            current_section=section,
+            roll_number=admission_number.split('-')[-1],
+        )
+        sync_student_academic_links(student)
+        return student
+
+    def test_default_mapping_moves_to_next_class_and_last_class_passes_out(self):
+        mapping = default_section_mapping(school=self.school, source_session=self.source, target_session=self.target)
+
+        self.assertEqual(mapping[self.sections[(self.source.id, '6th')].id], self.sections[(self.target.id, '7th')])
+        self.assertIsNone(mapping[self.sections[(self.source.id, '7th')].id])
+
+    def test_apply_promotion_moves_students_records_subjects_and_history(self):
+        promoted = self._create_student('ADM-P-1', '6th')
+        retained = self._create_student('ADM-P-2', '6th')
+        transferred = self._create_student('ADM-P-3', '6th')
+        graduate = self._create_student('ADM-P-4', '7th')
+
+        mapping = default_section_mapping(school=self.school, source_session=self.source, target_session=self.target)
+        plan = plan_promotion(
+            school=self.school,
+            source_session=self.source,
+            target_session=self.target,
+            mapping=mapping,
+            overrides={retained.id: ACTION_RETAIN, transferred.id: ACTION_TRANSFER},
+        )
+        self.assertEqual(plan.counts(), {'promote': 1, 'retain': 1, 'transfer': 1, 'alumni': 1, 'errors': 0})
+
+        with self.assertNumQueries(15):
+            apply_promotion(plan=plan, changed_by=self.admin)
+
+        promoted.refresh_from_db()
+        self.assertEqual(promoted.session_id, self.target.id)
+        self.assertEqual(promoted.current_section, self.sections[(self.target.id, '7th')])
+        self.assertIsNone(promoted.roll_number)
+        record = StudentSessionRecord.objects.get(student=promoted, is_current=True)
+        self.assertEqual(record.session_id, self.target.id)
+        self.assertFalse(StudentSessionRecord.objects.get(student=promoted, session=self.source).is_current)
+        self.assertTrue(
+            StudentSubject.objects.filter(student=promoted, session=self.target, subject=self.subject, is_active=True).exists()
+        )
+
+        retained.refresh_from_db()
+        self.assertEqual(retained.current_section, self.sections[(self.target.id, '6th')])
+
+        transferred.refresh_from_db()
+        graduate.refresh_from_db()
+        self.assertEqual(transferred.status, Student.STATUS_TRANSFERRED)
+        self.assertEqual(transferred.session_id, self.source.id)
+        self.assertEqual(graduate.status, Student.STATUS_ALUMNI)
+        self.assertFalse(graduate.is_active)
+        self.assertEqual(
+            StudentSessionRecord.objects.get(student=graduate, session=self.source).status,
+            Student.STATUS_ALUMNI,
+        )
+        self.assertEqual(StudentStatusHistory.objects.filter(student__in=[transferred, graduate]).count(), 2)
+
+    def test_promotion_view_previews_then_applies(self):
+        student = self._create_student('ADM-P-10', '6th')
+        self.client.login(username='promotion_admin', password='pass12345')
+        params = {'source_session': self.source.id, 'target_session': self.target.id}
+
+        preview = self.client.get(reverse('student_promotion'), params)
+        self.assertEqual(preview.status_code, 200)
+        self.assertContains(preview, 'ADM-P-10')
+        student.refresh_from_db()
+        self.assertEqual(student.session_id, self.source.id)
+
+        response = self.client.post(reverse('student_promotion'), {**params, 'action': 'commit'})
+        self.assertEqual(response.status_code, 302)
+        student.refresh_from_db()
+        self.assertEqual(student.session_id, self.target.id)
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class StudentImportTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name='Import School', code='import_school')
+        self.session = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+        )
+        self.school_class = SchoolClass.objects.create(school=self.school, session=self.session, name='5th')
+        self.section = Section.objects.create(school_class=self.school_class, name='A')
+        self.subject = Subject.objects.create(school=self.school, name='Maths', code='MAT')
+        ClassSubject.objects.create(school_class=self.school_class, subject=self.subject)
+        Student.objects.create(
+            school=self.school,
+            session=self.session,
+            admission_number='ADM-I-1',
+            first_name='Existing',
+            current_class=self.school_class,
+            current_section=self.section,
+            roll_number='1',
+        )
+        self.admin = get_user_model().objects.create_user(
+            username='import_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+
+    def _csv(self, *lines):
+        header = 'Admission Number,First Name,Class,Section,Roll Number,Father Name,Parent Phone'
+        return SimpleUploadedFile('admissions.csv', '\n'.join([header, *lines]).encode('utf-8'), content_type='text/csv')
+
+    def test_import_creates_valid_rows_and_reports_row_errors(self):
+        upload = self._csv(
+            'ADM-I-2,Asha,5th,A,2,Ravi,9876543210',
+            'ADM-I-3,Vikram,5th,A,3,,',
+            'ADM-I-1,Duplicate,5th,A,4,,',
+            'ADM-I-4,Roll Clash,5th,A,2,,',
+            'ADM-I-5,Lost,9th,A,,,',
+            'ADM-I-2,Repeat,5th,A,,,',
+        )
+
+        result = import_students(school=self.school, session=self.session, rows=iter_import_rows(upload))
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([row_number for row_number, _, _ in result.errors], [4, 5, 6, 7])
+        student = Student.objects.get(school=self.school, admission_number='ADM-I-2')
+        self.assertEqual(student.parent_info.father_name, 'Ravi')
+        self.assertTrue(StudentSessionRecord.objects.filter(student=student, session=self.session, is_current=True).exists())
+        self.assertTrue(StudentSubject.objects.filter(student=student, subject=self.subject, is_active=True).exists())
+        self.assertIn(b'already exists', result.error_file())
+
+    def test_import_reports_over_long_values_as_row_errors(self):
+        upload = self._csv(
+            f"ADM-I-6,{'A' * 101},5th,A,,,",
+            f"ADM-I-7,Meera,5th,A,,Ravi,{'9' * 21}",
+            'ADM-I-8,Kabir,5th,A,,,',
+        )
+
+        result = import_students(school=self.school, session=self.session, rows=iter_import_rows(upload))
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([row_number for row_number, _, _ in result.errors], [2, 3])
+        self.assertIn('First name', result.errors[0][2])
+        self.assertIn('Phone', result.errors[1][2])
+
+    def test_import_view_uploads_file_and_serves_error_file(self):
+        self.client.login(username='import_admin', password='pass12345')
+
+        response = self.client.post(reverse('student_import'), {
+            'session': self.session.id,
+            'file': self._csv('ADM-I-10,Nila,5th,A,,,', 'ADM-I-11,,5th,A,,,'),
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Student.objects.filter(school=self.school, admission_number='ADM-I-10').exists())
+
+        errors = self.client.get(reverse('student_import_errors'))
+        self.assertEqual(errors.status_code, 200)
+        self.assertIn(b'ADM-I-11', errors.content)
+
+
+class StudentSearchTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name='Search School', code='search_school')
+        self.other_school = School.objects.create(name='Other School', code='other_search_school')
+        self.session = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+        )
+        self.other_session = AcademicSession.objects.create(
+            school=self.other_school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+        )
+        self.priya = self._create_student(self.school, self.session, 'ADM-S-1', 'Priya', 'Sharma')
+        self.prakash = self._create_student(self.school, self.session, 'ADM-S-2', 'Prakash', 'Verma')
+        self.outsider = self._create_student(self.other_school, self.other_session, 'ADM-S-3', 'Priya', 'Sharma')
+        Parent.objects.create(student=self.prakash, father_name='Rajesh Verma', phone='98450 12345')
+
+    def _create_student(self, school, session, admission_number, first_name, last_name):
+        return Student.objects.create(
+            school=school,
+            session=session,
+            admission_number=admission_number,
+            first_name=first_name,
+            last_name=last_name,
+        )
+
+    def _search(self, query):
+        return [student_id for student_id, _ in ranked_student_ids(school=self.school, query=query)]
+
+    def test_search_matches_prefix_reordered_tokens_parents_and_typos(self):
+        self.assertEqual(self._search('pr'), [self.priya.id, self.prakash.id])
+        self.assertEqual(self._search('sharma priya'), [self.priya.id])
+        self.assertEqual(self._search('rajesh'), [self.prakash.id])
+        self.assertEqual(self._search('9845012'), [self.prakash.id])
+        self.assertEqual(self._search('prakesh'), [self.prakash.id])
+        self.assertEqual(self._search('adm-s-2'), [self.prakash.id])
+
+    def test_search_index_follows_saves_and_ranks_exact_words_first(self):
+        self.priya.first_name = 'Pran'
+        self.priya.save()
+
+        self.assertEqual(self._search('priya'), [])
+        self.assertEqual(self._search('pran')[0], self.priya.id)
+        self.assertEqual(self._search('prakash'), [self.prakash.id])
+
+    def test_student_list_search_uses_index(self):
+        get_user_model().objects.create_user(
+            username='search_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+        self.client.login(username='search_admin', password='pass12345')
+
+        response = self.client.get(reverse('student_list'), {'q': 'verma rajesh'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['students']), [self.prakash])
+
+        with mock.patch('apps.core.students.views.SEARCH_RESULT_LIMIT', 1):
+            response = self.client.get(reverse('student_list'), {'q': 'pr'})
+        self.assertEqual(list(response.context['students']), [self.priya])
+        self.assertContains(response, 'Showing the top 1 of 2 matches')
+
+
+class StudentListPaginationTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name='Paging School', code='paging_school')
+        self.session = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+        )
+        Student.objects.bulk_create([
+            Student(
+                school=self.school,
+                session=self.session,
+                admission_number=f'ADM-K-{index:03d}',
+                first_name='Page',
+                status=Student.STATUS_ACTIVE if index % 5 else Student.STATUS_DROPPED,
+            )
+            for index in range(1, 36)
+        ])
+        get_user_model().objects.create_user(
+            username='paging_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+        self.client.login(username='paging_admin', password='pass12345')
+
+    def test_cursor_pages_keep_filters_and_sort_without_overlap(self):
+        params = {'status': Student.STATUS_ACTIVE, 'sort': '-admission', 'page_size': 10}
+        seen = []
+        response = self.client.get(reverse('student_list'), params)
+        while True:
+            page = response.context['page']
+            seen.extend(student.admission_number for student in page)
+            self.assertEqual(page.total, 28)
+            if not page.has_next:
+                break
+            self.assertIn('status=active', page.next_query)
+            self.assertIn('sort=-admission', page.next_query)
+            response = self.client.get(f"{reverse('student_list')}?{page.next_query}")
+
+        expected = sorted(
+            (f'ADM-K-{index:03d}' for index in range(1, 36) if index % 5),
+            reverse=True,
+        )
+        self.assertEqual(seen, expected)
+
+        previous = self.client.get(f"{reverse('student_list')}?{page.previous_query}").context['page']
+        self.assertEqual([student.admission_number for student in previous], expected[10:20])
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse('student_list'), {'after': 'not-a-cursor', 'page_size': 10})
+        page = response.context['page']
+        self.assertEqual(page.object_list[0].admission_number, 'ADM-K-001')
+        self.assertFalse(page.has_previous)
+
+
+class ClassSubjectSyncTests(TestCase):
+    def setUp(self):
+        self.school = School.objects.create(name='Sync School', code='sync_school')
+        self.session = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+        )
+        self.school_class = SchoolClass.objects.create(school=self.school, session=self.session, name='8th')
+        self.section = Section.objects.create(school_class=self.school_class, name='A')
+        self.english = Subject.objects.create(school=self.school, name='English', code='ENG')
+        self.history = Subject.objects.create(school=self.school, name='History', code='HIS')
+        self.english_mapping = ClassSubject.objects.create(school_class=self.school_class, subject=self.english)
+        self.students = [
+            Student.objects.create(
+                school=self.school,
+                session=self.session,
+                admission_number=f'ADM-C-{index}',
+                first_name='Sync',
+                current_class=self.school_class,
+                current_section=self.section,
+            )
+            for index in range(3)
+        ]
+        for student in self.students:
+            sync_student_academic_links(student)
+
+    def test_mapping_changes_are_applied_to_the_whole_class_in_bulk(self):
+        ClassSubject.objects.create(school_class=self.school_class, subject=self.history)
+        self.english_mapping.delete()
+
+        with self.assertNumQueries(7):
+            touched = sync_class_student_subjects(self.school_class)
+
+        self.assertEqual(touched, 3)
+        active = set(
+            StudentSubject.objects.filter(session=self.session, is_active=True).values_list('student_id', 'subject_id')
+        )
+        self.assertEqual(active, {(student.id, self.history.id) for student in self.students})
+
+        ClassSubject.objects.create(school_class=self.school_class, subject=self.english)
+        self.assertEqual(sync_class_student_subjects(self.school_class), 3)
+        self.assertEqual(StudentSubject.objects.filter(subject=self.english, is_active=True).count(), 3)
+        self.assertEqual(StudentSubject.objects.filter(subject=self.english).count(), 3)
+        self.assertEqual(sync_class_student_subjects(self.school_class), 0)
+
+    def test_class_subject_views_sync_enrolled_students(self):
+        get_user_model().objects.create_user(
+            username='sync_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+        self.client.login(username='sync_admin', password='pass12345')
+
+        response = self.client.post(reverse('class_subject_create'), {
+            'school_class': self.school_class.id,
+            'subject': self.history.id,
+            'is_compulsory': True,
+            'max_marks': '100',
+            'pass_marks': '33',
+        }, follow=True)
+        self.assertContains(response, 'Updated subjects for 3 student(s).')
+        self.assertEqual(StudentSubject.objects.filter(subject=self.history, is_active=True).count(), 3)
+
+        self.client.post(reverse('class_subject_delete', args=[self.english_mapping.id]))
+        self.assertFalse(StudentSubject.objects.filter(subject=self.english, is_active=True).exists())
+
+    def test_moving_a_mapping_deactivates_the_old_class_subjects(self):
+        get_user_model().objects.create_user(
+            username='sync_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+        self.client.login(username='sync_admin', password='pass12345')
+        other_class = SchoolClass.objects.create(school=self.school, session=self.session, name='9th')
+
+        self.client.post(reverse('class_subject_update', args=[self.english_mapping.id]), {
+            'school_class': other_class.id,
+            'subject': self.english.id,
+            'is_compulsory': True,
+            'max_marks': '100',
+            'pass_marks': '33',
+        })
+
+        self.english_mapping.refresh_from_db()
+        self.assertEqual(self.english_mapping.school_class, other_class)
+        self.assertFalse(
+            StudentSubject.objects.filter(
+                student__in=self.students,
+                subject=self.english,
+                is_active=True,
+            ).exists()
+        )
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class StudentProfileTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.school = School.objects.create(name='Profile School', code='profile_school')
+        self.session = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+            is_active=True,
+        )
+        school_class = SchoolClass.objects.create(school=self.school, session=self.session, name='6th', code='VI')
+        section = Section.objects.create(school_class=school_class, name='A')
+        self.document_type = DocumentType.objects.create(school=self.school, name='Birth Certificate')
+        self.student = Student.objects.create(
+            school=self.school,
+            session=self.session,
+            admission_number='PRO-1',
+            first_name='Meera',
+            admission_type=Student.ADMISSION_FRESH,
+            current_class=school_class,
+            current_section=section,
+            roll_number='1',
+        )
+        sync_student_academic_links(self.student)
+        Parent.objects.create(student=self.student, father_name='Raj', phone='9000000001')
+
+    def test_profile_is_built_with_fixed_queries_and_cached(self):
+        with self.assertNumQueries(8):
+            profile = student_profile(school=self.school, student_id=self.student.id)
+
+        self.assertEqual(profile['student']['admission_number'], 'PRO-1')
+        self.assertEqual(profile['parent']['father_name'], 'Raj')
+        self.assertEqual([row['session'] for row in profile['session_history']], ['2026-27'])
+        self.assertEqual(profile['documents']['missing_required'], ['Birth Certificate'])
+        with self.assertNumQueries(0):
+            self.assertEqual(student_profile(school=self.school, student_id=self.student.id), profile)
+
+        other_school = School.objects.create(name='Other School', code='other_profile_school')
+        self.assertIsNone(student_profile(school=other_school, student_id=self.student.id))
+
+    def test_related_changes_bump_the_cached_profile(self):
+        student_profile(school=self.school, student_id=self.student.id)
+
+        StudentDocument.objects.create(
+            student=self.student,
+            document_type=self.document_type,
+            file=SimpleUploadedFile('birth.pdf', b'%PDF-1.4', content_type='application/pdf'),
+            status=StudentDocument.STATUS_APPROVED,
+        )
+        profile = student_profile(school=self.school, student_id=self.student.id)
+        self.assertEqual(profile['documents']['missing_required'], [])
+        self.assertEqual(profile['documents']['counts'][StudentDocument.STATUS_APPROVED], 1)
+
+        self.student.first_name = 'Mira'
+        self.student.save()
+        self.assertEqual(student_profile(school=self.school, student_id=self.student.id)['student']['full_name'], 'Mira')
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
+class DocumentVerificationTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.school = School.objects.create(name='Docs School', code='docs_school')
+        self.session = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+            is_active=True,
+        )
+        self.school.current_session = self.session
+        self.school.save(update_fields=['current_session'])
+        school_class = SchoolClass.objects.create(school=self.school, session=self.session, name='1st', code='I')
+        section = Section.objects.create(school_class=school_class, name='A')
+        self.birth = DocumentType.objects.create(school=self.school, name='Birth Certificate')
+        self.leaving = DocumentType.objects.create(
+            school=self.school,
+            name='Leaving Certificate',
+            required_for=DocumentType.FOR_TRANSFER,
+        )
+        self.students = [
+            Student.objects.create(
+                school=self.school,
+                session=self.session,
+                admission_number=f'DOC-{index}',
+                first_name='Isha',
+                admission_type=admission_type,
+                previous_school_name='Old School' if admission_type == Student.ADMISSION_TRANSFER else '',
+                current_class=school_class,
+                current_section=section,
+            )
+            for index, admission_type in enumerate(
+                [Student.ADMISSION_FRESH, Student.ADMISSION_FRESH, Student.ADMISSION_TRANSFER]
+            )
+        ]
+        self.documents = [
+            StudentDocument.objects.create(
+                student=student,
+                document_type=self.birth,
+                file=SimpleUploadedFile(f'birth_{student.id}.pdf', b'%PDF-1.4', content_type='application/pdf'),
+            )
+            for student in self.students
+        ]
+
+    def test_missing_documents_report_runs_in_two_queries(self):
+        StudentDocument.objects.filter(id=self.documents[0].id).update(status=StudentDocument.STATUS_APPROVED)
+
+        with self.assertNumQueries(2):
+            report = missing_documents_report(school=self.school, session=self.session)
+
+        self.assertEqual(report.checked, 3)
+        self.assertEqual(report.eligible_ids, [self.students[0].id])
+        self.assertEqual(
+            {row.admission_number: row.missing for row in report.rows},
+            {'DOC-1': ['Birth Certificate'], 'DOC-2': ['Birth Certificate', 'Leaving Certificate']},
+        )
+        self.assertEqual(dict((doc_type.name, count) for doc_type, count in report.missing_counts()), {
+            'Birth Certificate': 2,
+            'Leaving Certificate': 1,
+        })
+
+    def test_bulk_verify_and_finalize_eligible_admissions(self):
+        admin = get_user_model().objects.create_user(
+            username='docs_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+        self.client.login(username='docs_admin', password='pass12345')
+        url = reverse('document_verification')
+
+        response = self.client.post(url, {
+            'action': StudentDocument.STATUS_APPROVED,
+            'document_ids': [document.id for document in self.documents],
+        }, follow=True)
+        self.assertContains(response, 'Updated 3 document(s).')
+        self.assertEqual(
+            StudentDocument.objects.filter(status=StudentDocument.STATUS_APPROVED, verified_by=admin).count(),
+            3,
+        )
+
+        response = self.client.post(url, {'action': 'finalize'}, follow=True)
+        self.assertContains(response, 'Finalized 2 admission(s).')
+        finalized = set(Student.objects.filter(admission_finalized=True).values_list('admission_number', flat=True))
+        self.assertEqual(finalized, {'DOC-0', 'DOC-1'})
+        self.assertContains(response, 'Leaving Certificate')
+
+
+class StoredBlobTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp(prefix='students_blob_tests_')
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_settings = override_settings(MEDIA_ROOT=media_root)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        self.school = School.objects.create(name='Blob School', code='blob_school')
+        self.session = AcademicSession.objects.create(
+            school=self.school,
+            name='2026-27',
+            start_date='2026-04-01',
+            end_date='2027-03-31',
+            is_active=True,
+        )
+        self.birth = DocumentType.objects.create(school=self.school, name='Birth Certificate')
+        self.students = [
+            Student.objects.create(
+                school=self.school,
+                session=self.session,
+                admission_number=f'BLOB-{index}',
+                first_name='Ravi',
+            )
+            for index in range(2)
+        ]
+
+    def _upload(self, student, content=b'%PDF-1.4 same bytes'):
+        return StudentDocument.objects.create(
+            student=student,
+            document_type=self.birth,
+            file=SimpleUploadedFile(f'birth_{student.id}.pdf', content, content_type='application/pdf'),
+        )
+
+    def test_identical_uploads_share_one_counted_blob(self):
+        first, second = (self._upload(student) for student in self.students)
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertRegex(first.file.name, r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual(StoredBlob.objects.get(name=first.file.name).ref_count, 2)
+
+        name = first.file.name
+        second.delete()
+        first.file.delete(save=False)
+        self.assertTrue(first.file.storage.exists(name))
+        self.assertEqual(StoredBlob.objects.get(name=name).ref_count, 1)
+
+    def test_replacing_a_file_moves_its_reference(self):
+        document = self._upload(self.students[0], b'first')
+        old_name = document.file.name
+
+        document = StudentDocument.objects.get(pk=document.pk)
+        self.assertFalse(hasattr(document, '_stored_blob_names'))
+        document.file = SimpleUploadedFile('birth.pdf', b'second', content_type='application/pdf')
+        document.save()
+
+        self.assertEqual(StoredBlob.objects.get(name=old_name).ref_count, 0)
+        self.assertEqual(StoredBlob.objects.get(name=document.file.name).ref_count, 1)
+
+    def test_blob_is_served_with_strong_etag_to_its_school_only(self):
+        document = self._upload(self.students[0])
+        get_user_model().objects.create_user(
+            username='blob_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=self.school,
+        )
+        self.client.login(username='blob_admin', password='pass12345')
+
+        url = document.file.url
+        self.assertTrue(url.startswith('/students/files/blobs/'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4 same bytes')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=31536000, immutable')
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertTrue(school_can_read_blob(self.school, rendition_name(document.file.name, 'avatar')))
+
+        other_school = School.objects.create(name='Other School', code='other_blob_school')
+        get_user_model().objects.create_user(
+            username='other_admin',
+            password='pass12345',
+            role='schooladmin',
+            school=other_school,
+        )
+        self.client.login(username='other_admin', password='pass12345')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertFalse(school_can_read_blob(other_school, rendition_name(document.file.name, 'avatar')))
+
+    def test_collect_blobs_removes_only_unreferenced_blobs(self):
+        kept = self._upload(self.students[0], b'kept')
+        dropped = self._upload(self.students[1], b'dropped')
+        storage = kept.file.storage
+        StudentDocument.objects.filter(pk=dropped.pk).delete()
+
+        result = collect_blobs(grace=timedelta(0), dry_run=True)
+        self.assertEqual(result.removed, 1)
+        self.assertTrue(storage.exists(dropped.file.name))
+
+        out = StringIO()
+        call_command('collect_blobs', '--grace-hours', '0', stdout=out)
+        self.assertIn('removed 1', out.getvalue())
+        self.assertFalse(storage.exists(dropped.file.name))
+        self.assertTrue(storage.exists(kept.file.name))
+        self.assertFalse(StoredBlob.objects.filter(name=dropped.file.name).exists())
+        self.assertEqual(StoredBlob.objects.get(name=kept.file.name).ref_count, 1)
@@ -1,10 +1,12 @@
 from django.urls import path
 
 from .views import (
+    document_verification,
     document_type_create,
     document_type_deactivate,
     document_type_list,
     document_type_update,
+    stored_blob_download,
     student_archive,
     student_create,
     student_document_list,
@@ -12,8 +14,12 @@ from .views import (
     student_finalize_admission,
     student_id_card_bulk_download,
     student_id_card_download,
+    student_import,
+    student_import_errors,
     student_list,
     student_parent_update,
+    student_profile_detail,
+    student_promotion,
     student_status_update,
     student_transfer_certificate_download,
     student_update,
@@ -22,9 +28,13 @@ from .views import (
 urlpatterns = [
     path('', student_list, name='student_list'),
     path('add/', student_create, name='student_create'),
+    path('import/', student_import, name='student_import'),
+    path('import/errors/', student_import_errors, name='student_import_errors'),
     path('<int:pk>/edit/', student_update, name='student_update'),
     path('<int:pk>/archive/', student_archive, name='student_archive'),
+    path('promotion/', student_promotion, name='student_promotion'),
 
+    path('<int:pk>/profile/', student_profile_detail, name='student_profile'),
     path('<int:pk>/parent/', student_parent_update, name='student_parent_update'),
     path('<int:pk>/status/', student_status_update, name='student_status_update'),
 
@@ -33,6 +43,7 @@ urlpatterns = [
     path('documents/types/<int:pk>/edit/', document_type_update, name='document_type_update'),
     path('documents/types/<int:pk>/deactivate/', document_type_deactivate, name='document_type_deactivate'),
 
+    path('documents/verification/', document_verification, name='document_verification'),
     path('<int:pk>/documents/', student_document_list, name='student_document_list'),
     path(
         '<int:student_pk>/documents/<int:document_pk>/verify/',
@@ -48,4 +59,5 @@ urlpatterns = [
         student_transfer_certificate_download,
         name='student_transfer_certificate_download',
     ),
+    path('files/<path:name>', stored_blob_download, name='stored_blob'),
 ]
@@ -1,39 +1,66 @@
+import mimetypes
+import posixpath
+
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import transaction
-from django.db.models import Q
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.views.decorators.http import require_POST
 
 from apps.core.academic_sessions.models import AcademicSession
 from apps.core.academics.models import SchoolClass, Section
+from apps.core.artifacts.http import artifact_pdf_response
 from apps.core.users.audit import log_audit_event
 from apps.core.users.decorators import role_required
+from apps.core.utils.pagination import keyset_paginate
+from apps.core.utils.storage import blob_storage
 
+from .blobs import school_can_read_blob
+from .documents import bulk_review_documents, finalize_eligible_admissions, missing_documents_report
 from .forms import (
     DocumentTypeForm,
     ParentForm,
     StudentDocumentForm,
     StudentForm,
+    StudentImportForm,
+    StudentPromotionForm,
     StudentStatusForm,
 )
+from .id_cards import stream_id_card_sheets_pdf
+from .importer import IMPORT_COLUMNS, import_students, iter_import_rows
 from .models import DocumentType, Parent, Student, StudentDocument
+from .profile import student_profile
+from .promotion import ACTION_CHOICES, apply_promotion, default_section_mapping, plan_promotion
+from .search import SEARCH_RESULT_LIMIT, search_students
 from .services import (
     archive_student,
     change_student_status,
     finalize_admission,
-    generate_bulk_id_cards_pdf,
-    generate_id_card_pdf,
     generate_transfer_certificate_pdf,
     get_missing_required_documents,
     get_required_document_types,
+    id_card_document,
     sync_student_academic_links,
 )
 
+# Blob URLs change whenever their content does, so browsers may keep them.
+BLOB_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+
+STUDENT_SORTS = {
+    'admission': ('Admission No', ('admission_number', 'id')),
+    '-admission': ('Admission No (desc)', ('-admission_number', '-id')),
+    'name': ('Name', ('first_name', 'last_name', 'id')),
+}
+
 
 def _school_sessions(school):
     return AcademicSession.objects.filter(school=school).order_by('-start_date')
@@ -63,6 +90,8 @@ def _get_filtered_students_queryset(request, school):
     section_id = request.GET.get('section')
     status = request.GET.get('status')
     search = (request.GET.get('q') or '').strip()
+    sort = request.GET.get('sort') if request.GET.get('sort') in STUDENT_SORTS else 'admission'
+    ordering = STUDENT_SORTS[sort][1]
 
     students = Student.objects.filter(
         school=school,
@@ -81,12 +110,12 @@ def _get_filtered_students_queryset(request, school):
         students = students.filter(current_section_id=section_id)
     if status:
         students = students.filter(status=status)
+    search_total = None
     if search:
-        students = students.filter(
-            Q(admission_number__icontains=search)
-            | Q(first_name__icontains=search)
-            | Q(last_name__icontains=search)
+        students, search_total = search_students(
+            students, school=school, query=search, limit=SEARCH_RESULT_LIMIT,
         )
+        ordering = ('-search_rank', *ordering)
 
     classes = SchoolClass.objects.filter(school=school)
     if selected_session:
@@ -101,7 +130,10 @@ def _get_filtered_students_queryset(request, school):
     sections = sections.order_by('school_class__name', 'name')
 
     return {
-        'students': students.order_by('admission_number', 'id'),
+        'students': students.order_by(*ordering),
+        'ordering': ordering,
+        'sort_choices': [(key, label) for key, (label, _) in STUDENT_SORTS.items()],
+        'selected_sort': sort,
         'sessions': sessions,
         'selected_session': selected_session,
         'classes': classes,
@@ -110,6 +142,9 @@ def _get_filtered_students_queryset(request, school):
         'selected_section_id': int(section_id) if str(section_id).isdigit() else None,
         'selected_status': status,
         'search_query': search,
+        'search_total': search_total,
+        'search_truncated': search_total is not None and search_total > SEARCH_RESULT_LIMIT,
+        'search_limit': SEARCH_RESULT_LIMIT,
     }
 
 
@@ -117,6 +152,8 @@ def _get_filtered_students_queryset(request, school):
 @role_required('schooladmin')
 def student_list(request):
     context = _get_filtered_students_queryset(request, request.user.school)
+    context['page'] = keyset_paginate(request, context['students'], context['ordering'])
+    context['students'] = context['page'].object_list
     return render(request, 'students_core/student_list.html', context)
 
 
@@ -214,6 +251,59 @@ def student_update(request, pk):
     })
 
 
+IMPORT_ERROR_FILE_KEY = 'student_import_error_file'
+
+
+@login_required
+@role_required('schooladmin')
+def student_import(request):
+    school = request.user.school
+    form = StudentImportForm(request.POST or None, request.FILES or None, school=school)
+    result = None
+
+    if request.method == 'POST' and form.is_valid():
+        session = form.cleaned_data['session']
+        upload = form.cleaned_data['file']
+        try:
+            result = import_students(school=school, session=session, rows=iter_import_rows(upload))
+        except ValidationError as exc:
+            form.add_error('file', exc)
+        else:
+            request.session.pop(IMPORT_ERROR_FILE_KEY, None)
+            if result.errors:
+                error_path = default_storage.save(
+                    f"students/imports/{school.id}/errors_{timezone.now():%Y%m%d%H%M%S}.csv",
+                    ContentFile(result.error_file()),
+                )
+                request.session[IMPORT_ERROR_FILE_KEY] = error_path
+            log_audit_event(
+                request=request,
+                action='students.imported',
+                school=school,
+                details=f"Session={session.id}, File={upload.name}, Created={result.created}, Errors={len(result.errors)}",
+            )
+            messages.success(request, f"Imported {result.created} student(s); {len(result.errors)} row(s) had errors.")
+
+    return render(request, 'students_core/student_import.html', {
+        'form': form,
+        'result': result,
+        'columns': IMPORT_COLUMNS,
+    })
+
+
+@login_required
+@role_required('schooladmin')
+def student_import_errors(request):
+    error_path = request.session.get(IMPORT_ERROR_FILE_KEY)
+    if not error_path or not default_storage.exists(error_path):
+        raise Http404('No import error file available.')
+
+    with default_storage.open(error_path, 'rb') as error_file:
+        response = HttpResponse(error_file.read(), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="student_import_errors.csv"'
+    return response
+
+
 @login_required
 @role_required('schooladmin')
 @require_POST
@@ -388,6 +478,15 @@ def document_type_deactivate(request, pk):
     return redirect('document_type_list')
 
 
+@login_required
+@role_required('schooladmin')
+def student_profile_detail(request, pk):
+    profile = student_profile(school=request.user.school, student_id=pk)
+    if profile is None:
+        raise Http404('Student not found.')
+    return render(request, 'students_core/student_profile.html', {'profile': profile})
+
+
 @login_required
 @role_required('schooladmin')
 def student_document_list(request, pk):
@@ -462,6 +561,101 @@ def student_document_verify(request, student_pk, document_pk):
     return redirect('student_document_list', pk=student.pk)
 
 
+MISSING_REPORT_DISPLAY_LIMIT = 500
+
+
+@login_required
+@role_required('schooladmin')
+def document_verification(request):
+    school = request.user.school
+    sessions, selected_session = _resolve_selected_session(request, school)
+    class_id = request.GET.get('class')
+    section_id = request.GET.get('section')
+    school_class = SchoolClass.objects.filter(school=school, pk=class_id).first() if str(class_id).isdigit() else None
+    section = Section.objects.filter(
+        school_class__school=school,
+        pk=section_id,
+    ).first() if str(section_id).isdigit() else None
+
+    if request.method == 'POST' and selected_session:
+        action = request.POST.get('action')
+        if action == 'finalize':
+            finalized = finalize_eligible_admissions(
+                school=school,
+                session=selected_session,
+                finalized_by=request.user,
+                school_class=school_class,
+                section=section,
+            )
+            log_audit_event(
+                request=request,
+                action='students.admissions_bulk_finalized',
+                school=school,
+                details=f"Session={selected_session.name}; finalized={finalized}",
+            )
+            messages.success(request, f"Finalized {finalized} admission(s).")
+        elif action in {StudentDocument.STATUS_APPROVED, StudentDocument.STATUS_REJECTED}:
+            document_ids = [value for value in request.POST.getlist('document_ids') if value.isdigit()]
+            if not document_ids:
+                messages.error(request, 'Select at least one document.')
+            else:
+                updated = bulk_review_documents(
+                    school=school,
+                    document_ids=document_ids,
+                    status=action,
+                    verified_by=request.user,
+                    remarks=(request.POST.get('remarks') or '').strip(),
+                )
+                log_audit_event(
+                    request=request,
+                    action='students.documents_bulk_verified',
+                    school=school,
+                    details=f"Status={action}; documents={updated}",
+                )
+                messages.success(request, f"Updated {updated} document(s).")
+        else:
+            messages.error(request, 'Invalid action.')
+        query = request.GET.urlencode()
+        return redirect(f"{reverse('document_verification')}?{query}" if query else 'document_verification')
+
+    report = None
+    pending_page = None
+    if selected_session:
+        report = missing_documents_report(
+            school=school,
+            session=selected_session,
+            school_class=school_class,
+            section=section,
+        )
+        pending_documents = StudentDocument.objects.filter(
+            student__school=school,
+            student__session=selected_session,
+            student__is_archived=False,
+            status=StudentDocument.STATUS_PENDING,
+        ).select_related('student', 'document_type')
+        if school_class:
+            pending_documents = pending_documents.filter(student__current_class=school_class)
+        if section:
+            pending_documents = pending_documents.filter(student__current_section=section)
+        pending_page = keyset_paginate(request, pending_documents, ('uploaded_at', 'id'))
+
+    classes = SchoolClass.objects.filter(school=school, session=selected_session).order_by('display_order', 'name')
+    sections = Section.objects.filter(school_class=school_class).order_by('name') if school_class else Section.objects.none()
+
+    return render(request, 'students_core/document_verification.html', {
+        'sessions': sessions,
+        'selected_session': selected_session,
+        'classes': classes,
+        'sections': sections,
+        'selected_class_id': school_class.id if school_class else None,
+        'selected_section_id': section.id if section else None,
+        'report': report,
+        'missing_rows': report.rows[:MISSING_REPORT_DISPLAY_LIMIT] if report else [],
+        'missing_counts': report.missing_counts() if report else [],
+        'page': pending_page,
+    })
+
+
 @login_required
 @role_required('schooladmin')
 @require_POST
@@ -491,10 +685,12 @@ def student_id_card_download(request, pk):
     student = get_object_or_404(Student, pk=pk, school=request.user.school)
     include_qr = _truthy_param(request.GET.get('qr'))
 
-    pdf_bytes = generate_id_card_pdf(student, include_qr=include_qr)
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="id_card_{student.admission_number}.pdf"'
-    return response
+    return artifact_pdf_response(
+        request,
+        school=request.user.school,
+        document=id_card_document(student, include_qr=include_qr),
+        filename=f'id_card_{student.admission_number}.pdf',
+    )
 
 
 @login_required
@@ -512,9 +708,12 @@ def student_id_card_bulk_download(request):
         return redirect('student_list')
 
     include_qr = _truthy_param(request.GET.get('qr'))
-    pdf_bytes = generate_bulk_id_cards_pdf(students, include_qr=include_qr)
+    pdf_stream = stream_id_card_sheets_pdf(
+        students.select_related('school').iterator(chunk_size=200),
+        include_qr=include_qr,
+    )
 
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
+    response = StreamingHttpResponse(pdf_stream, content_type='application/pdf')
     filename = f"id_cards_{school.code or school.id}.pdf"
     response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
@@ -536,3 +735,105 @@ def student_transfer_certificate_download(request, pk):
         f'attachment; filename="transfer_certificate_{student.admission_number}.pdf"'
     )
     return response
+
+
+@login_required
+@role_required('schooladmin')
+def student_promotion(request):
+    school = request.user.school
+    form = StudentPromotionForm(request.POST or request.GET or None, school=school)
+    plan = None
+    mapping_rows = []
+    target_sections = []
+
+    if form.is_bound and form.is_valid():
+        source_session = form.cleaned_data['source_session']
+        target_session = form.cleaned_data['target_session']
+        mapping = default_section_mapping(
+            school=school,
+            source_session=source_session,
+            target_session=target_session,
+        )
+        target_sections = list(
+            Section.objects.filter(
+                school_class__school=school,
+                school_class__session=target_session,
+                is_active=True,
+            ).select_related('school_class').order_by('school_class__display_order', 'name')
+        )
+        sections_by_id = {section.id: section for section in target_sections}
+        overrides = {}
+        if request.method == 'POST':
+            for source_section_id in mapping:
+                value = request.POST.get(f'map_{source_section_id}')
+                if value is not None:
+                    mapping[source_section_id] = sections_by_id.get(int(value)) if value.isdigit() else None
+            for key, value in request.POST.items():
+                if key.startswith('action_') and key[7:].isdigit() and value:
+                    overrides[int(key[7:])] = value
+
+        try:
+            plan = plan_promotion(
+                school=school,
+                source_session=source_session,
+                target_session=target_session,
+                mapping=mapping,
+                overrides=overrides,
+            )
+        except ValidationError as exc:
+            form.add_error(None, exc)
+        else:
+            if request.method == 'POST' and request.POST.get('action') == 'commit':
+                counts = apply_promotion(plan=plan, changed_by=request.user)
+                log_audit_event(
+                    request=request,
+                    action='students.promoted',
+                    school=school,
+                    details=(
+                        f"{source_session.name} -> {target_session.name}; "
+                        + ', '.join(f"{key}={value}" for key, value in counts.items())
+                    ),
+                )
+                messages.success(
+                    request,
+                    f"Promotion applied: {counts['promote']} promoted, {counts['retain']} retained, "
+                    f"{counts['transfer']} transferred, {counts['alumni']} alumni.",
+                )
+                if counts['errors']:
+                    messages.warning(request, f"{counts['errors']} student(s) were skipped; fix their rows and apply again.")
+                return redirect(f"{reverse('student_list')}?session={target_session.id}")
+
+        source_sections = Section.objects.filter(id__in=list(mapping)).select_related('school_class').order_by(
+            'school_class__display_order', 'name',
+        )
+        mapping_rows = [(section, mapping[section.id]) for section in source_sections]
+
+    return render(request, 'students_core/promotion.html', {
+        'form': form,
+        'plan': plan,
+        'counts': plan.counts() if plan else None,
+        'mapping_rows': mapping_rows,
+        'target_sections': target_sections,
+        'action_choices': ACTION_CHOICES,
+    })
+
+
+@login_required
+@role_required('schooladmin')
+def stored_blob_download(request, name):
+    if not school_can_read_blob(request.user.school, name):
+        raise Http404('File not found.')
+    storage = blob_storage()
+    etag = quote_etag(posixpath.splitext(posixpath.basename(name))[0])
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            blob_file = storage.open(name, 'rb')
+        except FileNotFoundError:
+            raise Http404('File not found.')
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        response = FileResponse(blob_file, content_type=content_type)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = BLOB_CACHE_CONTROL
+    return response
@@ -1,8 +1,28 @@
 from django.apps import apps
 from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+# The suite runs in one process, so a local cache behaves like the shared
+# production one and keeps cache reads out of the query-count assertions.
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'ahv-erp-tests',
+    }
+}
 
 
 class InstalledAppsOnlyDiscoverRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._test_caches = override_settings(CACHES=TEST_CACHES)
+        self._test_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_caches.disable()
+        super().teardown_test_environment(**kwargs)
+
     def build_suite(self, test_labels=None, extra_tests=None, **kwargs):
         if not test_labels:
             test_labels = [
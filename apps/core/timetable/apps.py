@@ -5,3 +5,6 @@ class TimetableConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core.timetable'
     label = 'core_timetable'
+
+    def ready(self):
+        from . import signals  # noqa: F401
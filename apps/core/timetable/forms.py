@@ -5,8 +5,8 @@ from apps.core.academic_sessions.models import AcademicSession
 from apps.core.academics.models import Period, SchoolClass, Section, Subject
 from apps.core.hr.models import Staff
 
-from .models import TimetableEntry
-from .services import get_available_teachers
+from .models import DAY_CHOICES, TimetableEntry
+from .workload import get_available_teachers
 
 
 class TimetableEntryForm(forms.ModelForm):
@@ -184,3 +184,65 @@ class TeacherTimetableFilterForm(forms.Form):
 
         if not self.allow_teacher_selection:
             self.fields['teacher'].widget = forms.HiddenInput()
+
+
+class TimetableGenerateForm(forms.Form):
+    session = forms.ModelChoiceField(queryset=AcademicSession.objects.none())
+    school_class = forms.ModelChoiceField(queryset=SchoolClass.objects.none(), required=False)
+    seed = forms.IntegerField(min_value=0, required=False, initial=0)
+
+    def __init__(self, *args, **kwargs):
+        self.school = kwargs.pop('school', None)
+        super().__init__(*args, **kwargs)
+
+        if self.school:
+            self.fields['session'].queryset = AcademicSession.objects.filter(school=self.school).order_by('-start_date')
+            self.fields['school_class'].queryset = SchoolClass.objects.filter(school=self.school, is_active=True).order_by(
+                'display_order', 'name'
+            )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        session = cleaned_data.get('session')
+        school_class = cleaned_data.get('school_class')
+        if session and school_class and school_class.session_id != session.id:
+            self.add_error('school_class', 'Selected class does not belong to selected session.')
+        return cleaned_data
+
+
+class SubstitutionPlanForm(forms.Form):
+    session = forms.ModelChoiceField(queryset=AcademicSession.objects.none())
+    start_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def __init__(self, *args, **kwargs):
+        self.school = kwargs.pop('school', None)
+        super().__init__(*args, **kwargs)
+
+        if self.school:
+            self.fields['session'].queryset = AcademicSession.objects.filter(school=self.school).order_by('-start_date')
+
+
+class TeacherWorkloadForm(forms.Form):
+    session = forms.ModelChoiceField(queryset=AcademicSession.objects.none())
+    week_of = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    day_of_week = forms.ChoiceField(required=False, choices=[('', 'Any day')] + list(DAY_CHOICES))
+    period = forms.ModelChoiceField(queryset=Period.objects.none(), required=False)
+
+    def __init__(self, *args, **kwargs):
+        self.school = kwargs.pop('school', None)
+        selected_session = kwargs.pop('selected_session', None)
+        super().__init__(*args, **kwargs)
+
+        if self.school:
+            self.fields['session'].queryset = AcademicSession.objects.filter(school=self.school).order_by('-start_date')
+            periods = Period.objects.filter(school=self.school, is_active=True)
+            if selected_session:
+                periods = periods.filter(session=selected_session)
+            self.fields['period'].queryset = periods.order_by('period_number')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('period') and not cleaned_data.get('day_of_week'):
+            self.add_error('day_of_week', 'Select a day to look up free teachers for a period.')
+        return cleaned_data
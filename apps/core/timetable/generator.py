@@ -0,0 +1,391 @@
+"""Automatic weekly timetable generation for a session."""
+from __future__ import annotations
+
+import random
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.core.exceptions import ValidationError
+
+from apps.core.academics.models import AcademicConfig, ClassSubject, Period, Section
+from apps.core.hr.models import Staff, TeacherSubjectAssignment
+
+from .models import TimetableEntry
+from .services import DAY_LABELS, WEEKDAY_ORDER, save_timetable_grid
+
+
+HARD_WEIGHT = 100
+DEFAULT_MAX_STEPS = 20000
+NOISE = 0.05
+
+
+@dataclass
+class TimetablePlan:
+    days: list
+    periods: list
+    sections: list
+    subjects: dict
+    teachers: dict
+    entries: list = field(default_factory=list)
+    conflicts: int = 0
+    unstaffed: list = field(default_factory=list)
+    steps: int = 0
+
+    @property
+    def is_valid(self):
+        return self.conflicts == 0
+
+    def section_grids(self):
+        cells = {
+            (entry['section_id'], entry['day_of_week'], entry['period_id']): entry
+            for entry in self.entries
+        }
+        grids = []
+        for section in self.sections:
+            rows = []
+            for day_key in self.days:
+                row = {'day_label': DAY_LABELS[day_key], 'cells': []}
+                for period in self.periods:
+                    entry = cells.get((section.id, day_key, period.id))
+                    if entry:
+                        row['cells'].append({
+                            'subject': self.subjects[entry['subject_id']],
+                            'teacher': self.teachers[entry['teacher_id']],
+                        })
+                    else:
+                        row['cells'].append(None)
+                rows.append(row)
+            grids.append({'section': section, 'rows': rows})
+        return grids
+
+
+def _working_days(school, session):
+    config = AcademicConfig.objects.filter(school=school, session=session).first()
+    if config and isinstance(config.working_days, list) and config.working_days:
+        configured = set(config.working_days)
+        return [day for day in WEEKDAY_ORDER if day in configured]
+    return list(WEEKDAY_ORDER)
+
+
+class _Solver:
+    def __init__(self, *, lessons, section_count, slot_days, blocked, seed):
+        self.lessons = lessons
+        self.slot_count = len(slot_days)
+        self.slot_days = slot_days
+        self.blocked = blocked
+        self.random = random.Random(seed)
+
+        self.lesson_slot = [None] * len(lessons)
+        self.section_grid = [[None] * self.slot_count for _ in range(section_count)]
+        self.teacher_slots = defaultdict(lambda: [0] * self.slot_count)
+        self.subject_days = defaultdict(int)
+
+    def _teacher_cost(self, teacher_id, slot, count):
+        occupied = count + (1 if slot in self.blocked.get(teacher_id, ()) else 0)
+        return max(0, occupied - 1)
+
+    def _place(self, lesson_id, slot):
+        section, subject_id, teacher_id = self.lessons[lesson_id]
+        self.lesson_slot[lesson_id] = slot
+        self.section_grid[section][slot] = lesson_id
+        self.teacher_slots[teacher_id][slot] += 1
+        self.subject_days[(section, subject_id, self.slot_days[slot])] += 1
+
+    def _remove(self, lesson_id):
+        section, subject_id, teacher_id = self.lessons[lesson_id]
+        slot = self.lesson_slot[lesson_id]
+        self.lesson_slot[lesson_id] = None
+        self.section_grid[section][slot] = None
+        self.teacher_slots[teacher_id][slot] -= 1
+        self.subject_days[(section, subject_id, self.slot_days[slot])] -= 1
+
+    def _cost_of(self, lesson_ids, slots):
+        teacher_keys = set()
+        subject_keys = set()
+        for lesson_id in lesson_ids:
+            section, subject_id, teacher_id = self.lessons[lesson_id]
+            for slot in slots:
+                teacher_keys.add((teacher_id, slot))
+                subject_keys.add((section, subject_id, self.slot_days[slot]))
+        hard = sum(
+            self._teacher_cost(teacher_id, slot, self.teacher_slots[teacher_id][slot])
+            for teacher_id, slot in teacher_keys
+        )
+        soft = sum(max(0, self.subject_days[key] - 1) for key in subject_keys)
+        return hard * HARD_WEIGHT + soft
+
+    def _move_delta(self, lesson_id, target_slot):
+        section = self.lessons[lesson_id][0]
+        source_slot = self.lesson_slot[lesson_id]
+        other_id = self.section_grid[section][target_slot]
+        moved = [lesson_id] if other_id is None else [lesson_id, other_id]
+        slots = (source_slot, target_slot)
+
+        before = self._cost_of(moved, slots)
+        self._apply_move(lesson_id, target_slot)
+        after = self._cost_of(moved, slots)
+        self._apply_move(lesson_id, source_slot)
+        return after - before
+
+    def _apply_move(self, lesson_id, target_slot):
+        section = self.lessons[lesson_id][0]
+        source_slot = self.lesson_slot[lesson_id]
+        other_id = self.section_grid[section][target_slot]
+        self._remove(lesson_id)
+        if other_id is not None:
+            self._remove(other_id)
+            self._place(other_id, source_slot)
+        self._place(lesson_id, target_slot)
+
+    def _is_conflicted(self, lesson_id):
+        teacher_id = self.lessons[lesson_id][2]
+        slot = self.lesson_slot[lesson_id]
+        return self._teacher_cost(teacher_id, slot, self.teacher_slots[teacher_id][slot]) > 0
+
+    def hard_conflicts(self):
+        return sum(1 for lesson_id in range(len(self.lessons)) if self._is_conflicted(lesson_id))
+
+    def seed_assignment(self):
+        teacher_load = defaultdict(int)
+        for _, _, teacher_id in self.lessons:
+            teacher_load[teacher_id] += 1
+        order = sorted(
+            range(len(self.lessons)),
+            key=lambda lesson_id: (
+                -(teacher_load[self.lessons[lesson_id][2]] + len(self.blocked.get(self.lessons[lesson_id][2], ()))),
+                self.random.random(),
+            ),
+        )
+        for lesson_id in order:
+            section, subject_id, teacher_id = self.lessons[lesson_id]
+            best_cost = None
+            best_slots = []
+            for slot in range(self.slot_count):
+                if self.section_grid[section][slot] is not None:
+                    continue
+                cost = (
+                    HARD_WEIGHT * (self.teacher_slots[teacher_id][slot] + (slot in self.blocked.get(teacher_id, ())))
+                    + self.subject_days[(section, subject_id, self.slot_days[slot])]
+                )
+                if best_cost is None or cost < best_cost:
+                    best_cost = cost
+                    best_slots = [slot]
+                elif cost == best_cost:
+                    best_slots.append(slot)
+            self._place(lesson_id, self.random.choice(best_slots))
+
+    def search(self, max_steps):
+        conflicted = {lesson_id for lesson_id in range(len(self.lessons)) if self._is_conflicted(lesson_id)}
+        steps = 0
+        while conflicted and steps < max_steps:
+            steps += 1
+            lesson_id = self.random.choice(tuple(conflicted))
+            source_slot = self.lesson_slot[lesson_id]
+            candidates = [slot for slot in range(self.slot_count) if slot != source_slot]
+            if not candidates:
+                break
+
+            if self.random.random() < NOISE:
+                target_slot = self.random.choice(candidates)
+            else:
+                best_delta = None
+                best_slots = []
+                for slot in candidates:
+                    delta = self._move_delta(lesson_id, slot)
+                    if best_delta is None or delta < best_delta:
+                        best_delta = delta
+                        best_slots = [slot]
+                    elif delta == best_delta:
+                        best_slots.append(slot)
+                target_slot = self.random.choice(best_slots)
+
+            section = self.lessons[lesson_id][0]
+            other_id = self.section_grid[section][target_slot]
+            self._apply_move(lesson_id, target_slot)
+
+            affected = {(self.lessons[lesson_id][2], source_slot), (self.lessons[lesson_id][2], target_slot)}
+            if other_id is not None:
+                affected.add((self.lessons[other_id][2], source_slot))
+                affected.add((self.lessons[other_id][2], target_slot))
+            for teacher_id, slot in affected:
+                for candidate_id in self._lessons_at(teacher_id, slot):
+                    if self._is_conflicted(candidate_id):
+                        conflicted.add(candidate_id)
+                    else:
+                        conflicted.discard(candidate_id)
+        return steps
+
+    def spread_subjects(self):
+        """Move repeated same-day subjects apart where it costs no teacher clash."""
+        for lesson_id in range(len(self.lessons)):
+            section, subject_id, _ = self.lessons[lesson_id]
+            day = self.slot_days[self.lesson_slot[lesson_id]]
+            if self.subject_days[(section, subject_id, day)] <= 1:
+                continue
+            best_delta = 0
+            best_slot = None
+            for slot in range(self.slot_count):
+                if slot == self.lesson_slot[lesson_id]:
+                    continue
+                delta = self._move_delta(lesson_id, slot)
+                if delta < best_delta:
+                    best_delta = delta
+                    best_slot = slot
+            if best_slot is not None:
+                self._apply_move(lesson_id, best_slot)
+
+    def _lessons_at(self, teacher_id, slot):
+        if not self.teacher_slots[teacher_id][slot]:
+            return []
+        return [
+            lesson_id
+            for section_row in self.section_grid
+            if (lesson_id := section_row[slot]) is not None and self.lessons[lesson_id][2] == teacher_id
+        ]
+
+
+def generate_timetable(*, school, session, school_class=None, seed=0, max_steps=DEFAULT_MAX_STEPS):
+    """Build a conflict-free weekly timetable plan without writing anything."""
+    days = _working_days(school, session)
+    periods = list(Period.objects.filter(school=school, session=session, is_active=True).order_by('period_number'))
+    if not days or not periods:
+        raise ValidationError('Configure working days and active periods before generating a timetable.')
+
+    sections = Section.objects.filter(
+        school_class__school=school,
+        school_class__session=session,
+        school_class__is_active=True,
+        is_active=True,
+    ).select_related('school_class').order_by('school_class__display_order', 'school_class__name', 'name')
+    if school_class is not None:
+        sections = sections.filter(school_class=school_class)
+    sections = list(sections)
+    if not sections:
+        raise ValidationError('No active sections found to generate a timetable for.')
+
+    class_ids = {section.school_class_id for section in sections}
+    requirements = defaultdict(list)
+    subjects = {}
+    for class_id, subject_id, subject_code, periods_per_week in ClassSubject.objects.filter(
+        school_class_id__in=class_ids,
+        periods_per_week__gt=0,
+    ).values_list('school_class_id', 'subject_id', 'subject__code', 'periods_per_week'):
+        requirements[class_id].append((subject_id, periods_per_week))
+        subjects[subject_id] = subject_code
+
+    eligible = defaultdict(list)
+    for class_id, subject_id, teacher_id in TeacherSubjectAssignment.objects.filter(
+        school=school,
+        session=session,
+        school_class_id__in=class_ids,
+        is_active=True,
+        teacher__is_active=True,
+        teacher__user__role='teacher',
+    ).order_by('teacher__employee_id').values_list('school_class_id', 'subject_id', 'teacher_id'):
+        eligible[(class_id, subject_id)].append(teacher_id)
+
+    slot_index = {
+        (day, period.id): index
+        for index, (day, period) in enumerate((day, period) for day in days for period in periods)
+    }
+    slot_days = [day for day in days for _ in periods]
+
+    blocked = defaultdict(set)
+    for teacher_id, day, period_id in TimetableEntry.objects.filter(
+        school=school,
+        session=session,
+        is_active=True,
+    ).exclude(section_id__in=[section.id for section in sections]).values_list('teacher_id', 'day_of_week', 'period_id'):
+        slot = slot_index.get((day, period_id))
+        if slot is not None:
+            blocked[teacher_id].add(slot)
+
+    teacher_load = defaultdict(int)
+    for teacher_id, slots in blocked.items():
+        teacher_load[teacher_id] = len(slots)
+
+    lessons = []
+    unstaffed = []
+    overfull = []
+    for section_number, section in enumerate(sections):
+        section_requirements = sorted(requirements.get(section.school_class_id, []), key=lambda row: -row[1])
+        if sum(count for _, count in section_requirements) > len(slot_days):
+            overfull.append(f"{section.school_class.name}-{section.name}")
+            continue
+        for subject_id, count in section_requirements:
+            teacher_ids = eligible.get((section.school_class_id, subject_id))
+            if not teacher_ids:
+                unstaffed.append(f"{section.school_class.name}-{section.name}: {subjects[subject_id]}")
+                continue
+            teacher_id = min(teacher_ids, key=lambda candidate: teacher_load[candidate])
+            teacher_load[teacher_id] += count
+            lessons.extend((section_number, subject_id, teacher_id) for _ in range(count))
+
+    if overfull:
+        raise ValidationError(
+            f"Periods per week exceed available slots ({len(slot_days)}) for: {', '.join(overfull)}."
+        )
+
+    solver = _Solver(
+        lessons=lessons,
+        section_count=len(sections),
+        slot_days=slot_days,
+        blocked=blocked,
+        seed=seed,
+    )
+    solver.seed_assignment()
+    steps = solver.search(max_steps)
+    if not solver.hard_conflicts():
+        solver.spread_subjects()
+
+    slot_keys = list(slot_index)
+    teachers = {
+        staff.id: staff.employee_id
+        for staff in Staff.objects.filter(id__in={teacher_id for _, _, teacher_id in lessons})
+    }
+    plan = TimetablePlan(
+        days=days,
+        periods=periods,
+        sections=sections,
+        subjects=subjects,
+        teachers=teachers,
+        conflicts=solver.hard_conflicts(),
+        unstaffed=unstaffed,
+        steps=steps,
+    )
+    for lesson_id, (section_number, subject_id, teacher_id) in enumerate(lessons):
+        day, period_id = slot_keys[solver.lesson_slot[lesson_id]]
+        section = sections[section_number]
+        plan.entries.append({
+            'school_class_id': section.school_class_id,
+            'section_id': section.id,
+            'day_of_week': day,
+            'period_id': period_id,
+            'subject_id': subject_id,
+            'teacher_id': teacher_id,
+        })
+    return plan
+
+
+def commit_timetable_plan(*, school, session, plan: TimetablePlan):
+    """Replace the active timetable of every planned section with the plan."""
+    if not plan.is_valid:
+        raise ValidationError(
+            f"Generated timetable still has {plan.conflicts} teacher clashes. Adjust requirements and retry."
+        )
+
+    return save_timetable_grid(
+        school=school,
+        session=session,
+        cells=[
+            {
+                'section': entry['section_id'],
+                'day_of_week': entry['day_of_week'],
+                'period': entry['period_id'],
+                'subject': entry['subject_id'],
+                'teacher': entry['teacher_id'],
+            }
+            for entry in plan.entries
+        ],
+        replace_section_ids=[section.id for section in plan.sections],
+    )
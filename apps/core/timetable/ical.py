@@ -0,0 +1,265 @@
+"""iCalendar (RFC 5545) feeds of teacher and class-section timetables."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+
+from apps.core.hr.models import Substitution
+
+from .models import TimetableEntry
+from .services import WEEKDAY_ORDER, weekday_key
+
+
+FEED_SALT = 'timetable.ical'
+FEED_TEACHER = 'teacher'
+FEED_SECTION = 'section'
+FEED_KINDS = (FEED_TEACHER, FEED_SECTION)
+
+
+def feed_token(kind, object_id) -> str:
+    return signing.Signer(salt=FEED_SALT).sign(f"{kind}-{object_id}")
+
+
+def parse_feed_token(token):
+    """Return ``(kind, object_id)`` or raise ``signing.BadSignature``."""
+    value = signing.Signer(salt=FEED_SALT).unsign(token)
+    kind, _, object_id = value.partition('-')
+    if kind not in FEED_KINDS or not object_id.isdigit():
+        raise signing.BadSignature('Unknown feed.')
+    return kind, int(object_id)
+
+
+def _escape(text):
+    return (
+        str(text)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    # Content lines are limited to 75 octets; continuations start with a space.
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    parts = []
+    while data:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+    return '\r\n '.join(parts)
+
+
+def _local(day, at):
+    return datetime.combine(day, at).strftime('%Y%m%dT%H%M%S')
+
+
+def _first_occurrence(session, day_of_week):
+    offset = (WEEKDAY_ORDER.index(day_of_week) - session.start_date.weekday()) % 7
+    return session.start_date + timedelta(days=offset)
+
+
+def _entry_uid(entry):
+    return f"timetable-entry-{entry.id}@ahv-erp"
+
+
+def _event(*, uid, stamp, day, period, summary, description='', location='', extra=()):
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_local(day, period.start_time)}",
+        f"DTEND:{_local(day, period.end_time)}",
+        f"SUMMARY:{_escape(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+    if location:
+        lines.append(f"LOCATION:{_escape(location)}")
+    lines.extend(extra)
+    lines.append('END:VEVENT')
+    return lines
+
+
+def _recurring_event(*, entry, session, stamp, summary, description, location, exdates=()):
+    first_day = _first_occurrence(session, entry.day_of_week)
+    extra = [f"RRULE:FREQ=WEEKLY;UNTIL={session.end_date.strftime('%Y%m%d')}T235959"]
+    extra.extend(f"EXDATE:{_local(day, entry.period.start_time)}" for day in sorted(exdates))
+    return _event(
+        uid=_entry_uid(entry),
+        stamp=stamp,
+        day=first_day,
+        period=entry.period,
+        summary=summary,
+        description=description,
+        location=location,
+        extra=extra,
+    )
+
+
+def _calendar(name, events):
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//AHV School ERP//Timetable//EN',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f"X-WR-CALNAME:{_escape(name)}",
+        f"X-WR-TIMEZONE:{settings.TIME_ZONE}",
+    ]
+    for event in events:
+        lines.extend(event)
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(line) for line in lines) + '\r\n'
+
+
+def _stamp(version):
+    return datetime.fromtimestamp(version / 1_000_000_000, tz=dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _entry_key(day_of_week, period_id, section_id, subject_id, teacher_id):
+    return (day_of_week, period_id, section_id, subject_id, teacher_id)
+
+
+def _session_substitutions(session, **filters):
+    return Substitution.objects.filter(
+        session=session,
+        date__range=(session.start_date, session.end_date),
+        is_active=True,
+        **filters,
+    ).select_related(
+        'period',
+        'school_class',
+        'section',
+        'subject',
+        'original_teacher__user',
+        'substitute_teacher__user',
+    )
+
+
+def build_teacher_feed(*, school, session, teacher, version) -> str:
+    stamp = _stamp(version)
+    entries = list(
+        TimetableEntry.objects.filter(
+            school=school,
+            session=session,
+            teacher=teacher,
+            is_active=True,
+        ).select_related('period', 'school_class', 'section', 'subject')
+    )
+    entry_map = {
+        _entry_key(entry.day_of_week, entry.period_id, entry.section_id, entry.subject_id, entry.teacher_id): entry
+        for entry in entries
+    }
+
+    exdates = {entry.id: set() for entry in entries}
+    covers = []
+    for substitution in _session_substitutions(session, school=school).filter(
+        Q(original_teacher=teacher) | Q(substitute_teacher=teacher),
+    ):
+        if substitution.substitute_teacher_id == teacher.id:
+            covers.append(substitution)
+            continue
+        entry = entry_map.get(_entry_key(
+            weekday_key(substitution.date),
+            substitution.period_id,
+            substitution.section_id,
+            substitution.subject_id,
+            substitution.original_teacher_id,
+        ))
+        if entry is not None:
+            exdates[entry.id].add(substitution.date)
+
+    events = [
+        _recurring_event(
+            entry=entry,
+            session=session,
+            stamp=stamp,
+            summary=f"{entry.subject.code} - {entry.school_class.name}-{entry.section.name}",
+            description=entry.subject.name,
+            location=f"{entry.school_class.name}-{entry.section.name}",
+            exdates=exdates[entry.id],
+        )
+        for entry in entries
+    ]
+    events.extend(
+        _event(
+            uid=f"substitution-{substitution.id}@ahv-erp",
+            stamp=stamp,
+            day=substitution.date,
+            period=substitution.period,
+            summary=(
+                f"Cover: {substitution.subject.code} - "
+                f"{substitution.school_class.name}-{substitution.section.name}"
+            ),
+            description=f"Substitution for {substitution.original_teacher.full_name}",
+            location=f"{substitution.school_class.name}-{substitution.section.name}",
+        )
+        for substitution in covers
+    )
+    return _calendar(f"{teacher.full_name} - {session.name}", events)
+
+
+def build_section_feed(*, school, session, section, version) -> str:
+    stamp = _stamp(version)
+    entries = list(
+        TimetableEntry.objects.filter(
+            school=school,
+            session=session,
+            section=section,
+            is_active=True,
+        ).select_related('period', 'school_class', 'section', 'subject', 'teacher__user')
+    )
+    entry_map = {
+        _entry_key(entry.day_of_week, entry.period_id, entry.section_id, entry.subject_id, entry.teacher_id): entry
+        for entry in entries
+    }
+
+    events = [
+        _recurring_event(
+            entry=entry,
+            session=session,
+            stamp=stamp,
+            summary=f"{entry.subject.code} - {entry.teacher.full_name}",
+            description=entry.subject.name,
+            location=f"{entry.school_class.name}-{entry.section.name}",
+        )
+        for entry in entries
+    ]
+    for substitution in _session_substitutions(session, school=school, section=section):
+        entry = entry_map.get(_entry_key(
+            weekday_key(substitution.date),
+            substitution.period_id,
+            substitution.section_id,
+            substitution.subject_id,
+            substitution.original_teacher_id,
+        ))
+        summary = f"{substitution.subject.code} - {substitution.substitute_teacher.full_name} (Substitute)"
+        if entry is None:
+            events.append(_event(
+                uid=f"substitution-{substitution.id}@ahv-erp",
+                stamp=stamp,
+                day=substitution.date,
+                period=substitution.period,
+                summary=summary,
+            ))
+            continue
+        events.append(_event(
+            uid=_entry_uid(entry),
+            stamp=stamp,
+            day=substitution.date,
+            period=entry.period,
+            summary=summary,
+            description=f"Substituting {entry.teacher.full_name}",
+            location=f"{entry.school_class.name}-{entry.section.name}",
+            extra=[f"RECURRENCE-ID:{_local(substitution.date, entry.period.start_time)}"],
+        ))
+    return _calendar(f"{section.school_class.name}-{section.name} - {session.name}", events)
@@ -0,0 +1,60 @@
+from PIL import Image, ImageDraw
+
+
+def render_timetable_grid_image(grid: dict):
+    """Draw one weekly grid page from a plain-data source (no database access).
+
+    ``grid['cells']`` is row-major over days x periods; each cell is a
+    ``(primary, secondary, substitute)`` tuple with empty strings for gaps.
+    """
+    periods = grid['periods']
+    days = grid['days']
+
+    width = 1800
+    header_h = 90
+    row_h = 110
+    col_w_day = 180
+    col_w = max(180, (width - col_w_day - 40) // max(1, len(periods)))
+    height = 220 + header_h + row_h * (len(days) + 1)
+
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+
+    draw.text((30, 20), grid['title'], fill='black')
+
+    start_x = 20
+    start_y = 110
+
+    draw.rectangle((start_x, start_y, start_x + col_w_day, start_y + row_h), outline='black')
+    draw.text((start_x + 10, start_y + 35), 'Day', fill='black')
+
+    for idx, (period_number, start_time, end_time) in enumerate(periods):
+        x1 = start_x + col_w_day + idx * col_w
+        x2 = x1 + col_w
+        draw.rectangle((x1, start_y, x2, start_y + row_h), outline='black')
+        draw.text((x1 + 8, start_y + 15), f"P{period_number}", fill='black')
+        draw.text((x1 + 8, start_y + 50), f"{start_time}-{end_time}", fill='black')
+
+    cells = grid['cells']
+    for ridx, day_label in enumerate(days):
+        y1 = start_y + row_h * (ridx + 1)
+        y2 = y1 + row_h
+        draw.rectangle((start_x, y1, start_x + col_w_day, y2), outline='black')
+        draw.text((start_x + 10, y1 + 40), day_label, fill='black')
+
+        for cidx in range(len(periods)):
+            x1 = start_x + col_w_day + cidx * col_w
+            x2 = x1 + col_w
+            draw.rectangle((x1, y1, x2, y2), outline='black')
+
+            primary, secondary, substitute = cells[ridx * len(periods) + cidx]
+            if not primary:
+                draw.text((x1 + 8, y1 + 40), '-', fill='black')
+                continue
+
+            draw.text((x1 + 8, y1 + 12), primary, fill='black')
+            draw.text((x1 + 8, y1 + 44), secondary, fill='black')
+            if substitute:
+                draw.text((x1 + 8, y1 + 74), f"Sub: {substitute}", fill=(200, 0, 0))
+
+    return image
@@ -1,23 +1,36 @@
 from __future__ import annotations
 
+import time
+import zipfile
+from collections import defaultdict
 from datetime import date, timedelta
 from io import BytesIO
 
-from PIL import Image, ImageDraw
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
 
+from apps.core.academics.models import ClassSubject, Period, Section, Subject
+from apps.core.artifacts.models import GeneratedArtifact
+from apps.core.artifacts.services import ArtifactDocument, invalidate_artifacts, section_scope
 from apps.core.hr.models import Staff, Substitution, TeacherSubjectAssignment
+from apps.core.utils.pdf import iter_pdf_bytes, iter_rendered_pages
 
 from .models import DAY_CHOICES, TimetableEntry
+from .rendering import render_timetable_grid_image
 
 
 WEEKDAY_ORDER = [day for day, _ in DAY_CHOICES]
 DAY_LABELS = dict(DAY_CHOICES)
+CLASS_TIMETABLE_TEMPLATE_VERSION = 1
+TIMETABLE_CACHE_TIMEOUT = 60 * 60 * 6
 
 
 def weekday_key(target_date: date) -> str:
-    return WEEKDAY_ORDER[target_date.weekday()]
+    # Sunday has no timetable row; its key simply matches no entry.
+    return (WEEKDAY_ORDER + ['sunday'])[target_date.weekday()]
 
 
 def week_range(anchor_date: date):
@@ -35,61 +48,129 @@ def _images_to_pdf_bytes(images):
     return output.getvalue()
 
 
-def get_available_teachers(*, school, session, school_class, subject, day_of_week, period, exclude_entry=None):
-    assigned_teacher_ids = TeacherSubjectAssignment.objects.filter(
-        school=school,
-        session=session,
-        school_class=school_class,
-        subject=subject,
-        is_active=True,
-    ).values_list('teacher_id', flat=True)
-
-    teachers = Staff.objects.filter(
-        school=school,
-        id__in=assigned_teacher_ids,
-        is_active=True,
-        user__role='teacher',
+def _as_id(value):
+    value = getattr(value, 'pk', value)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"Invalid timetable reference: {value}.")
+
+
+class SubstitutionMap:
+    """Active substitutions of one school day, indexed by the slot they cover."""
+
+    def __init__(self, substitutions):
+        self.by_slot = {}
+        self.by_section_period = {}
+        self.by_substitute = {}
+        for substitution in substitutions:
+            self.by_slot[(
+                substitution.period_id,
+                substitution.school_class_id,
+                substitution.section_id,
+                substitution.subject_id,
+                substitution.original_teacher_id,
+            )] = substitution
+            self.by_section_period[(substitution.section_id, substitution.period_id)] = substitution
+            self.by_substitute.setdefault(substitution.substitute_teacher_id, {})[substitution.period_id] = substitution
+
+    def for_entry(self, entry: TimetableEntry):
+        return self.by_slot.get((
+            entry.period_id,
+            entry.school_class_id,
+            entry.section_id,
+            entry.subject_id,
+            entry.teacher_id,
+        ))
+
+    def for_section_period(self, section_id, period_id):
+        return self.by_section_period.get((section_id, period_id))
+
+    def covered_by(self, teacher_id):
+        return self.by_substitute.get(teacher_id, {})
+
+
+def substitutions_for_day(*, school, session, target_date: date, request=None) -> SubstitutionMap:
+    """Load a day's substitutions in one query, memoized on ``request`` when given."""
+    key = (_as_id(school), _as_id(session), target_date)
+    memo = getattr(request, '_substitution_maps', None) if request is not None else None
+    if memo is not None and key in memo:
+        return memo[key]
+
+    substitution_map = SubstitutionMap(
+        Substitution.objects.filter(
+            school=school,
+            session=session,
+            date=target_date,
+            is_active=True,
+        ).select_related(
+            'period',
+            'school_class',
+            'section',
+            'subject',
+            'original_teacher',
+            'original_teacher__user',
+            'substitute_teacher',
+            'substitute_teacher__user',
+        )
     )
+    if request is not None:
+        if memo is None:
+            memo = request._substitution_maps = {}
+        memo[key] = substitution_map
+    return substitution_map
 
-    conflicts = TimetableEntry.objects.filter(
-        school=school,
-        session=session,
-        day_of_week=day_of_week,
-        period=period,
-        is_active=True,
-        teacher_id__in=teachers.values_list('id', flat=True),
-    )
-    if exclude_entry is not None:
-        conflicts = conflicts.exclude(pk=exclude_entry.pk)
-
-    conflict_teacher_ids = conflicts.values_list('teacher_id', flat=True)
-    return teachers.exclude(id__in=conflict_teacher_ids).order_by('employee_id')
-
-
-def resolve_effective_teacher(entry: TimetableEntry, target_date: date):
-    substitution = Substitution.objects.filter(
-        school=entry.school,
-        session=entry.session,
-        date=target_date,
-        period=entry.period,
-        school_class=entry.school_class,
-        section=entry.section,
-        subject=entry.subject,
-        original_teacher=entry.teacher,
-        is_active=True,
-    ).select_related('substitute_teacher', 'substitute_teacher__user').first()
 
+def resolve_effective_teacher(entry: TimetableEntry, target_date: date, substitutions: SubstitutionMap | None = None):
+    if substitutions is None:
+        substitutions = substitutions_for_day(school=entry.school_id, session=entry.session_id, target_date=target_date)
+
+    substitution = substitutions.for_entry(entry)
     if substitution:
         return substitution.substitute_teacher, substitution
     return entry.teacher, None
 
 
-def teacher_can_handle_slot(*, entry: TimetableEntry, teacher: Staff, target_date: date) -> bool:
-    effective_teacher, _ = resolve_effective_teacher(entry, target_date)
+def teacher_can_handle_slot(
+    *,
+    entry: TimetableEntry,
+    teacher: Staff,
+    target_date: date,
+    substitutions: SubstitutionMap | None = None,
+) -> bool:
+    effective_teacher, _ = resolve_effective_teacher(entry, target_date, substitutions)
     return effective_teacher.id == teacher.id
 
 
-def build_class_timetable_grid(*, school, session, school_class, section, periods, view_date):
+def _timetable_version_key(school_id, session_id):
+    return f"timetable:version:{school_id}:{session_id}"
+
+
+def timetable_cache_version(*, school, session):
+    """Current cache generation for a session's timetable.
+
+    Grid keys embed this value, so bumping it retires every cached grid and
+    fragment of the session at once. The version is the nanosecond clock of
+    the last change, which makes it usable as ``Last-Modified`` too, and a
+    version lost to eviction restarts from the clock rather than reusing an
+    old value.
+    """
+    key = _timetable_version_key(_as_id(school), _as_id(session))
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_timetable_cache_version(*, school, session):
+    key = _timetable_version_key(_as_id(school), _as_id(session))
+    cache.set(key, max(time.time_ns(), (cache.get(key) or 0) + 1), None)
+
+
+def build_class_timetable_grid(*, school, session, school_class, section, periods, view_date, substitutions=None):
     entries = TimetableEntry.objects.filter(
         school=school,
         session=session,
@@ -104,15 +185,8 @@ def build_class_timetable_grid(*, school, session, school_class, section, period
     }
 
     view_day_key = weekday_key(view_date)
-    substitutions = Substitution.objects.filter(
-        school=school,
-        session=session,
-        date=view_date,
-        school_class=school_class,
-        section=section,
-        is_active=True,
-    ).select_related('period', 'substitute_teacher', 'substitute_teacher__user', 'subject')
-    substitution_map = {sub.period_id: sub for sub in substitutions}
+    if substitutions is None:
+        substitutions = substitutions_for_day(school=school, session=session, target_date=view_date)
 
     rows = []
     for day_key in WEEKDAY_ORDER:
@@ -122,7 +196,7 @@ def build_class_timetable_grid(*, school, session, school_class, section, period
             substitution = None
             effective_teacher = None
             if day_key == view_day_key and entry:
-                substitution = substitution_map.get(period.id)
+                substitution = substitutions.for_section_period(section.id, period.id)
                 if substitution and substitution.subject_id == entry.subject_id and substitution.original_teacher_id == entry.teacher_id:
                     effective_teacher = substitution.substitute_teacher
             row['cells'].append(
@@ -163,61 +237,216 @@ def save_timetable_entry(*, school, session, school_class, section, day_of_week,
     return timetable_entry
 
 
-def _draw_grid_pdf(title, periods, rows):
-    width = 1800
-    header_h = 90
-    row_h = 110
-    col_w_day = 180
-    col_w = max(180, (width - col_w_day - 40) // max(1, len(periods)))
-    height = 220 + header_h + row_h * (len(rows) + 1)
-
-    image = Image.new('RGB', (width, height), 'white')
-    draw = ImageDraw.Draw(image)
-
-    draw.text((30, 20), title, fill='black')
-
-    start_x = 20
-    start_y = 110
-
-    draw.rectangle((start_x, start_y, start_x + col_w_day, start_y + row_h), outline='black')
-    draw.text((start_x + 10, start_y + 35), 'Day', fill='black')
-
-    for idx, period in enumerate(periods):
-        x1 = start_x + col_w_day + idx * col_w
-        x2 = x1 + col_w
-        draw.rectangle((x1, start_y, x2, start_y + row_h), outline='black')
-        draw.text((x1 + 8, start_y + 15), f"P{period.period_number}", fill='black')
-        draw.text((x1 + 8, start_y + 50), f"{period.start_time}-{period.end_time}", fill='black')
-
-    for ridx, row in enumerate(rows):
-        y1 = start_y + row_h * (ridx + 1)
-        y2 = y1 + row_h
-        draw.rectangle((start_x, y1, start_x + col_w_day, y2), outline='black')
-        draw.text((start_x + 10, y1 + 40), row['day_label'], fill='black')
-
-        for cidx, cell in enumerate(row['cells']):
-            x1 = start_x + col_w_day + cidx * col_w
-            x2 = x1 + col_w
-            draw.rectangle((x1, y1, x2, y2), outline='black')
+def _slot_label(section, day_of_week, period):
+    parts = []
+    if section is not None:
+        parts.append(f"{section.school_class.name}-{section.name}")
+    parts.append(DAY_LABELS.get(day_of_week, day_of_week))
+    if period is not None:
+        parts.append(f"P{period.period_number}")
+    return ' '.join(parts)
 
-            entry = cell.get('entry')
-            if not entry:
-                draw.text((x1 + 8, y1 + 40), '-', fill='black')
-                continue
 
-            subject_line = entry.subject.code
-            teacher_line = entry.teacher.employee_id
-            draw.text((x1 + 8, y1 + 12), subject_line, fill='black')
-            draw.text((x1 + 8, y1 + 44), teacher_line, fill='black')
+@transaction.atomic
+def save_timetable_grid(*, school, session, cells, replace_section_ids=None):
+    """Validate and write many timetable slots with a fixed number of queries.
+
+    ``cells`` holds dicts with ``section``, ``day_of_week``, ``period``,
+    ``subject`` and ``teacher`` (instances or ids); a cell without a subject
+    clears its slot. Every active slot of ``replace_section_ids`` that is not
+    among ``cells`` is cleared as well, so a whole section week (or a whole
+    school) can be replaced in one call.
+    """
+    cells = [
+        {
+            'section_id': _as_id(cell['section']),
+            'day_of_week': cell['day_of_week'],
+            'period_id': _as_id(cell['period']),
+            'subject_id': _as_id(cell.get('subject')),
+            'teacher_id': _as_id(cell.get('teacher')),
+        }
+        for cell in cells
+    ]
+    replace_section_ids = set(replace_section_ids or [])
+    section_ids = replace_section_ids | {cell['section_id'] for cell in cells}
+
+    sections = {
+        section.id: section
+        for section in Section.objects.filter(
+            id__in=section_ids,
+            school_class__school=school,
+            school_class__session=session,
+        ).select_related('school_class')
+    }
+    periods = {
+        period.id: period
+        for period in Period.objects.filter(school=school, session=session, is_active=True)
+    }
+    class_ids = {section.school_class_id for section in sections.values()}
+    class_subjects = set(
+        ClassSubject.objects.filter(school_class_id__in=class_ids).values_list('school_class_id', 'subject_id')
+    )
+    subject_ids = set(
+        Subject.objects.filter(
+            school=school,
+            id__in={cell['subject_id'] for cell in cells if cell['subject_id']},
+        ).values_list('id', flat=True)
+    )
+    teacher_ids = set(
+        Staff.objects.filter(
+            school=school,
+            id__in={cell['teacher_id'] for cell in cells if cell['teacher_id']},
+            is_active=True,
+            user__role='teacher',
+        ).values_list('id', flat=True)
+    )
+    allocations = set(
+        TeacherSubjectAssignment.objects.filter(
+            school=school,
+            session=session,
+            school_class_id__in=class_ids,
+            is_active=True,
+        ).values_list('teacher_id', 'school_class_id', 'subject_id')
+    )
 
-            substitution = cell.get('substitution')
-            if substitution:
-                draw.text((x1 + 8, y1 + 74), f"Sub: {substitution.substitute_teacher.employee_id}", fill=(200, 0, 0))
+    # (section, day, period) -> entry for every active slot of the session;
+    # the teacher index is derived from it once all edits are applied.
+    occupancy = {
+        (entry.section_id, entry.day_of_week, entry.period_id): entry
+        for entry in TimetableEntry.objects.filter(school=school, session=session, is_active=True)
+    }
+    planned = {
+        key: (entry.subject_id, entry.teacher_id)
+        for key, entry in occupancy.items()
+    }
+    for key in list(planned):
+        if key[0] in replace_section_ids:
+            del planned[key]
+
+    errors = []
+    for cell in cells:
+        section = sections.get(cell['section_id'])
+        period = periods.get(cell['period_id'])
+        key = (cell['section_id'], cell['day_of_week'], cell['period_id'])
+        label = _slot_label(section, cell['day_of_week'], period)
+
+        if section is None:
+            errors.append(f"{label}: section does not belong to selected session.")
+            continue
+        if cell['day_of_week'] not in DAY_LABELS:
+            errors.append(f"{label}: invalid day.")
+            continue
+        if period is None:
+            errors.append(f"{label}: period must be active in selected session.")
+            continue
+
+        if not cell['subject_id']:
+            planned.pop(key, None)
+            continue
+        if not cell['teacher_id']:
+            errors.append(f"{label}: teacher is required.")
+            continue
+        if cell['subject_id'] not in subject_ids:
+            errors.append(f"{label}: subject must belong to selected school.")
+            continue
+        if (section.school_class_id, cell['subject_id']) not in class_subjects:
+            errors.append(f"{label}: subject is not mapped to selected class.")
+            continue
+        if cell['teacher_id'] not in teacher_ids:
+            errors.append(f"{label}: only active teachers can be used in timetable.")
+            continue
+        if (cell['teacher_id'], section.school_class_id, cell['subject_id']) not in allocations:
+            errors.append(f"{label}: teacher is not allocated to this class-subject in selected session.")
+            continue
+        planned[key] = (cell['subject_id'], cell['teacher_id'])
+
+    teacher_slots = {}
+    for (section_id, day_of_week, period_id), (_, teacher_id) in planned.items():
+        other_section_id = teacher_slots.setdefault((teacher_id, day_of_week, period_id), section_id)
+        if other_section_id != section_id:
+            errors.append(
+                f"{_slot_label(sections.get(section_id), day_of_week, periods.get(period_id))}: "
+                'teacher is already assigned in another class for this slot.'
+            )
 
-    return _images_to_pdf_bytes([image])
+    if errors:
+        raise ValidationError(errors)
+
+    to_create = []
+    to_update = []
+    to_deactivate = []
+    now = timezone.now()
+    for key, entry in occupancy.items():
+        target = planned.get(key)
+        if target is None:
+            to_deactivate.append(entry)
+        elif target != (entry.subject_id, entry.teacher_id):
+            entry.subject_id, entry.teacher_id = target
+            entry.updated_at = now
+            to_update.append(entry)
+    for key, (subject_id, teacher_id) in planned.items():
+        if key in occupancy:
+            continue
+        section_id, day_of_week, period_id = key
+        to_create.append(TimetableEntry(
+            school=school,
+            session=session,
+            school_class_id=sections[section_id].school_class_id,
+            section_id=section_id,
+            day_of_week=day_of_week,
+            period_id=period_id,
+            subject_id=subject_id,
+            teacher_id=teacher_id,
+            is_active=True,
+        ))
+
+    if to_deactivate:
+        TimetableEntry.objects.filter(id__in=[entry.id for entry in to_deactivate]).update(
+            is_active=False,
+            updated_at=now,
+        )
+    if to_update:
+        TimetableEntry.objects.bulk_update(to_update, ['subject', 'teacher', 'updated_at'], batch_size=500)
+    if to_create:
+        TimetableEntry.objects.bulk_create(to_create, batch_size=500)
+
+    # Bulk writes skip model signals, so retire cached grids and PDFs here.
+    touched_section_ids = {entry.section_id for entry in [*to_deactivate, *to_update, *to_create]}
+    if touched_section_ids:
+        bump_timetable_cache_version(school=school, session=session)
+        invalidate_artifacts(
+            scopes=[section_scope(section_id) for section_id in touched_section_ids],
+            kind=GeneratedArtifact.KIND_CLASS_TIMETABLE,
+        )
+
+    return {'created': len(to_create), 'updated': len(to_update), 'deactivated': len(to_deactivate)}
 
 
-def generate_class_timetable_pdf(*, school, session, school_class, section, periods, view_date):
+def _draw_grid_pdf(title, periods, rows):
+    return _images_to_pdf_bytes([render_timetable_grid_image(_grid_source(title, periods, rows))])
+
+
+def _grid_source(title, periods, rows):
+    cells = []
+    for row in rows:
+        for cell in row['cells']:
+            entry = cell.get('entry')
+            substitution = cell.get('substitution')
+            cells.append((
+                entry.subject.code if entry else '',
+                entry.teacher.employee_id if entry else '',
+                substitution.substitute_teacher.employee_id if substitution else '',
+            ))
+    return {
+        'title': title,
+        'periods': [(period.period_number, str(period.start_time), str(period.end_time)) for period in periods],
+        'days': [row['day_label'] for row in rows],
+        'cells': cells,
+    }
+
+
+def class_timetable_document(*, school, session, school_class, section, periods, view_date):
+    periods = list(periods)
     rows = build_class_timetable_grid(
         school=school,
         session=session,
@@ -227,10 +456,45 @@ def generate_class_timetable_pdf(*, school, session, school_class, section, peri
         view_date=view_date,
     )
     title = f"Class Timetable - {school.name} | {session.name} | {school_class.name}-{section.name}"
-    return _draw_grid_pdf(title, periods, rows)
+    return ArtifactDocument(
+        kind=GeneratedArtifact.KIND_CLASS_TIMETABLE,
+        template_version=CLASS_TIMETABLE_TEMPLATE_VERSION,
+        scope=section_scope(section.id),
+        source=_grid_source(title, periods, rows),
+        render=lambda: _draw_grid_pdf(title, periods, rows),
+    )
 
 
-def build_teacher_timetable_grid(*, school, session, teacher, periods):
+def generate_class_timetable_pdf(*, school, session, school_class, section, periods, view_date):
+    return class_timetable_document(
+        school=school,
+        session=session,
+        school_class=school_class,
+        section=section,
+        periods=periods,
+        view_date=view_date,
+    ).render()
+
+
+def cached_class_timetable_grid(*, school, session, school_class, section, periods, view_date, request=None):
+    version = timetable_cache_version(school=school, session=session)
+    key = f"timetable:class-grid:{school.id}:{session.id}:{version}:{section.id}:{view_date.isoformat()}"
+    rows = cache.get(key)
+    if rows is None:
+        rows = build_class_timetable_grid(
+            school=school,
+            session=session,
+            school_class=school_class,
+            section=section,
+            periods=periods,
+            view_date=view_date,
+            substitutions=substitutions_for_day(school=school, session=session, target_date=view_date, request=request),
+        )
+        cache.set(key, rows, TIMETABLE_CACHE_TIMEOUT)
+    return rows
+
+
+def build_teacher_timetable_grid(*, school, session, teacher, periods, view_date=None, substitutions=None):
     entries = TimetableEntry.objects.filter(
         school=school,
         session=session,
@@ -243,11 +507,22 @@ def build_teacher_timetable_grid(*, school, session, teacher, periods):
         for entry in entries
     }
 
+    view_day_key = None
+    if view_date is not None:
+        view_day_key = weekday_key(view_date)
+        if substitutions is None:
+            substitutions = substitutions_for_day(school=school, session=session, target_date=view_date)
+
     rows = []
     for day_key in WEEKDAY_ORDER:
         row = {'day_key': day_key, 'day_label': DAY_LABELS[day_key], 'cells': []}
         for period in periods:
-            row['cells'].append({'period': period, 'entry': entry_map.get((day_key, period.id))})
+            entry = entry_map.get((day_key, period.id))
+            cell = {'period': period, 'entry': entry, 'substitution': None, 'cover': None}
+            if day_key == view_day_key:
+                cell['substitution'] = substitutions.for_entry(entry) if entry else None
+                cell['cover'] = substitutions.covered_by(teacher.id).get(period.id)
+            row['cells'].append(cell)
         rows.append(row)
 
     return rows
@@ -264,6 +539,129 @@ def generate_teacher_timetable_pdf(*, school, session, teacher, periods):
     return _draw_grid_pdf(title, periods, rows)
 
 
+def cached_teacher_timetable_grid(*, school, session, teacher, periods, view_date, request=None):
+    version = timetable_cache_version(school=school, session=session)
+    key = f"timetable:teacher-grid:{school.id}:{session.id}:{version}:{teacher.id}:{view_date.isoformat()}"
+    rows = cache.get(key)
+    if rows is None:
+        rows = build_teacher_timetable_grid(
+            school=school,
+            session=session,
+            teacher=teacher,
+            periods=periods,
+            view_date=view_date,
+            substitutions=substitutions_for_day(school=school, session=session, target_date=view_date, request=request),
+        )
+        cache.set(key, rows, TIMETABLE_CACHE_TIMEOUT)
+    return rows
+
+
+BULK_EXPORT_CLASSES = 'classes'
+BULK_EXPORT_TEACHERS = 'teachers'
+
+
+def bulk_timetable_sources(*, school, session, include=(BULK_EXPORT_CLASSES, BULK_EXPORT_TEACHERS)):
+    """Return ``(filename, grid source)`` pairs for every class-section and teacher.
+
+    The whole session timetable is read once and partitioned in memory, so the
+    number of queries does not grow with the number of grids.
+    """
+    periods = list(Period.objects.filter(school=school, session=session, is_active=True).order_by('period_number'))
+    period_rows = [(period.period_number, str(period.start_time), str(period.end_time)) for period in periods]
+    days = [DAY_LABELS[day_key] for day_key in WEEKDAY_ORDER]
+
+    by_section = defaultdict(dict)
+    by_teacher = defaultdict(dict)
+    for entry in TimetableEntry.objects.filter(
+        school=school,
+        session=session,
+        is_active=True,
+    ).select_related('school_class', 'section', 'subject', 'teacher'):
+        slot = (entry.day_of_week, entry.period_id)
+        by_section[entry.section_id][slot] = (entry.subject.code, entry.teacher.employee_id, '')
+        by_teacher[entry.teacher_id][slot] = (
+            entry.subject.code,
+            f"{entry.school_class.name}-{entry.section.name}",
+            '',
+        )
+
+    def grid(title, slots):
+        return {
+            'title': title,
+            'periods': period_rows,
+            'days': days,
+            'cells': [
+                slots.get((day_key, period.id), ('', '', ''))
+                for day_key in WEEKDAY_ORDER
+                for period in periods
+            ],
+        }
+
+    sources = []
+    if BULK_EXPORT_CLASSES in include:
+        for section in Section.objects.filter(
+            school_class__school=school,
+            school_class__session=session,
+            school_class__is_active=True,
+            is_active=True,
+        ).select_related('school_class').order_by('school_class__display_order', 'school_class__name', 'name'):
+            label = f"{section.school_class.name}-{section.name}"
+            sources.append((
+                f"classes/{get_valid_filename(label)}.pdf",
+                grid(f"Class Timetable - {school.name} | {session.name} | {label}", by_section.get(section.id, {})),
+            ))
+    if BULK_EXPORT_TEACHERS in include:
+        for teacher in Staff.objects.filter(
+            school=school,
+            is_active=True,
+            user__role='teacher',
+        ).select_related('user').order_by('employee_id'):
+            sources.append((
+                f"teachers/{get_valid_filename(teacher.employee_id)}.pdf",
+                grid(
+                    f"Teacher Timetable - {school.name} | {session.name} | {teacher.full_name}",
+                    by_teacher.get(teacher.id, {}),
+                ),
+            ))
+    return sources
+
+
+def stream_bulk_timetables_pdf(*, sources, workers=None):
+    pages = iter_rendered_pages(render_timetable_grid_image, [grid for _, grid in sources], workers=workers)
+    return iter_pdf_bytes(pages)
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_bulk_timetables_zip(*, sources, workers=None):
+    """Yield a ZIP archive holding one PDF per grid as each page is rendered."""
+    sink = _ChunkSink()
+    pages = iter_rendered_pages(render_timetable_grid_image, [grid for _, grid in sources], workers=workers)
+    # JPEG pages do not deflate further, so entries are stored as is.
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for (filename, _), page in zip(sources, pages):
+            archive.writestr(filename, b''.join(iter_pdf_bytes([page])))
+            yield sink.drain()
+    yield sink.drain()
+
+
 def teacher_substitutions_for_week(*, school, session, teacher, anchor_date):
     week_start, week_end = week_range(anchor_date)
 
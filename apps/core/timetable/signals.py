@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.academics.models import Period
+from apps.core.hr.models import Substitution
+
+from .models import TimetableEntry
+from .services import bump_timetable_cache_version
+
+
+@receiver(post_save, sender=TimetableEntry)
+@receiver(post_delete, sender=TimetableEntry)
+@receiver(post_save, sender=Substitution)
+@receiver(post_delete, sender=Substitution)
+@receiver(post_save, sender=Period)
+@receiver(post_delete, sender=Period)
+def bump_timetable_cache_on_change(sender, instance, **kwargs):
+    bump_timetable_cache_version(school=instance.school_id, session=instance.session_id)
@@ -0,0 +1,235 @@
+"""Whole-day substitution planning for teachers on leave."""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from apps.core.hr.models import LeaveRequest, Staff, StaffAttendance, Substitution, TeacherSubjectAssignment
+
+from .models import TimetableEntry
+from .services import bump_timetable_cache_version, week_range, weekday_key
+from .workload import teacher_occupancy
+
+
+MAX_PLAN_DAYS = 31
+
+
+@dataclass
+class SubstitutionProposal:
+    date: date
+    entry: TimetableEntry
+    substitute: Staff | None = None
+    subject_match: bool = False
+
+
+@dataclass
+class SubstitutionPlan:
+    start_date: date
+    end_date: date
+    proposals: list = field(default_factory=list)
+    away: dict = field(default_factory=dict)
+
+    @property
+    def covered(self):
+        return [proposal for proposal in self.proposals if proposal.substitute is not None]
+
+    @property
+    def uncovered(self):
+        return [proposal for proposal in self.proposals if proposal.substitute is None]
+
+
+def _dates(start_date, end_date):
+    current = start_date
+    while current <= end_date:
+        yield current
+        current += timedelta(days=1)
+
+
+def _away_teachers(*, school, session, start_date, end_date):
+    away = defaultdict(set)
+    for staff_id, leave_start, leave_end in LeaveRequest.objects.filter(
+        school=school,
+        status=LeaveRequest.STATUS_APPROVED,
+        start_date__lte=end_date,
+        end_date__gte=start_date,
+    ).values_list('staff_id', 'start_date', 'end_date'):
+        for day in _dates(max(leave_start, start_date), min(leave_end, end_date)):
+            away[day].add(staff_id)
+
+    for staff_id, attendance_date in StaffAttendance.objects.filter(
+        school=school,
+        date__range=(start_date, end_date),
+        status=StaffAttendance.STATUS_LEAVE,
+    ).values_list('staff_id', 'date'):
+        away[attendance_date].add(staff_id)
+    return away
+
+
+def _slot_key(target_date, entry):
+    return (target_date, entry.period_id, entry.school_class_id, entry.section_id, entry.subject_id)
+
+
+def plan_substitutions(*, school, session, start_date: date, end_date: date | None = None) -> SubstitutionPlan:
+    """Propose substitutes for every uncovered slot of teachers away in the range."""
+    end_date = end_date or start_date
+    if end_date < start_date:
+        raise ValidationError('End date must be after or equal to start date.')
+    if (end_date - start_date).days >= MAX_PLAN_DAYS:
+        raise ValidationError(f"Substitutions can be planned for at most {MAX_PLAN_DAYS} days at a time.")
+    if start_date < session.start_date or end_date > session.end_date:
+        raise ValidationError('Planning dates must be within session range.')
+
+    plan = SubstitutionPlan(start_date=start_date, end_date=end_date)
+    plan.away = _away_teachers(school=school, session=session, start_date=start_date, end_date=end_date)
+    if not plan.away:
+        return plan
+
+    entries_by_day = defaultdict(list)
+    for entry in TimetableEntry.objects.filter(
+        school=school,
+        session=session,
+        teacher_id__in=set().union(*plan.away.values()),
+        is_active=True,
+    ).select_related('period', 'school_class', 'section', 'subject', 'teacher', 'teacher__user'):
+        entries_by_day[entry.day_of_week].append(entry)
+
+    teachers = list(
+        Staff.objects.filter(school=school, is_active=True, user__role='teacher').select_related('user').order_by('employee_id')
+    )
+
+    class_subject_teachers = set()
+    subject_teachers = set()
+    for teacher_id, class_id, subject_id in TeacherSubjectAssignment.objects.filter(
+        school=school,
+        session=session,
+        is_active=True,
+    ).values_list('teacher_id', 'school_class_id', 'subject_id'):
+        class_subject_teachers.add((teacher_id, class_id, subject_id))
+        subject_teachers.add((teacher_id, subject_id))
+
+    occupancy = teacher_occupancy(school=school, session=session)
+
+    # Existing substitutions across the touched weeks: they cover slots,
+    # keep substitutes busy and count towards the weekly load. A slot is
+    # keyed like ``unique_active_substitution_slot``, without the original
+    # teacher, so a slot covered before a timetable edit stays covered.
+    load_start, _ = week_range(start_date)
+    _, load_end = week_range(end_date)
+    covered_slots = set()
+    busy = defaultdict(set)
+    week_load = defaultdict(int)
+    for sub_date, period_id, class_id, section_id, subject_id, substitute_id in Substitution.objects.filter(
+        school=school,
+        session=session,
+        date__range=(load_start, load_end),
+        is_active=True,
+    ).values_list('date', 'period_id', 'school_class_id', 'section_id', 'subject_id', 'substitute_teacher_id'):
+        covered_slots.add((sub_date, period_id, class_id, section_id, subject_id))
+        busy[sub_date].add((substitute_id, period_id))
+        week_load[(week_range(sub_date)[0], substitute_id)] += 1
+
+    for target_date in _dates(start_date, end_date):
+        away_ids = plan.away.get(target_date)
+        day_key = weekday_key(target_date)
+        day_entries = entries_by_day.get(day_key, [])
+        if not away_ids or not day_entries:
+            continue
+
+        day_busy = busy[target_date]
+
+        week_start = week_range(target_date)[0]
+        day_load = defaultdict(int)
+        pending = sorted(
+            (
+                entry for entry in day_entries
+                if entry.teacher_id in away_ids
+                and _slot_key(target_date, entry) not in covered_slots
+            ),
+            key=lambda entry: (entry.period.period_number, entry.school_class.display_order, entry.section.name),
+        )
+
+        for entry in pending:
+            best = None
+            best_rank = None
+            for teacher in teachers:
+                if (
+                    teacher.id in away_ids
+                    or (teacher.id, entry.period_id) in day_busy
+                    or occupancy.is_busy(teacher.id, day_key, entry.period_id)
+                ):
+                    continue
+                if (teacher.id, entry.school_class_id, entry.subject_id) in class_subject_teachers:
+                    match = 0
+                elif (teacher.id, entry.subject_id) in subject_teachers:
+                    match = 1
+                else:
+                    match = 2
+                rank = (
+                    match,
+                    week_load[(week_start, teacher.id)],
+                    day_load[teacher.id],
+                    occupancy.day_load(teacher.id, day_key),
+                )
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = teacher, rank
+
+            proposal = SubstitutionProposal(date=target_date, entry=entry)
+            if best is not None:
+                proposal.substitute = best
+                proposal.subject_match = best_rank[0] < 2
+                day_busy.add((best.id, entry.period_id))
+                week_load[(week_start, best.id)] += 1
+                day_load[best.id] += 1
+            plan.proposals.append(proposal)
+
+    return plan
+
+
+def commit_substitution_plan(*, school, session, plan: SubstitutionPlan):
+    """Create every covered proposal of the plan as an active substitution.
+
+    Returns ``(created, rejected)``. Each proposal is validated first, so a
+    slot or substitute taken since planning is reported in ``rejected`` as
+    ``(proposal, reason)`` instead of rolling back the whole plan.
+    """
+    substitutions = []
+    rejected = []
+    planned_slots = set()
+    for proposal in plan.covered:
+        entry = proposal.entry
+        substitution = Substitution(
+            school=school,
+            session=session,
+            date=proposal.date,
+            period=entry.period,
+            school_class=entry.school_class,
+            section=entry.section,
+            subject=entry.subject,
+            original_teacher=entry.teacher,
+            substitute_teacher=proposal.substitute,
+            is_active=True,
+        )
+        slot = _slot_key(proposal.date, entry)
+        if slot in planned_slots:
+            rejected.append((proposal, 'Slot appears twice in the plan.'))
+            continue
+        try:
+            substitution.full_clean()
+        except ValidationError as exc:
+            rejected.append((proposal, ' '.join(exc.messages)))
+            continue
+        planned_slots.add(slot)
+        substitutions.append(substitution)
+
+    try:
+        with transaction.atomic():
+            created = Substitution.objects.bulk_create(substitutions, batch_size=500)
+    except IntegrityError:
+        raise ValidationError('Substitutions changed while planning. Run the planner again.')
+    if created:
+        bump_timetable_cache_version(school=school, session=session)
+    return created, rejected
@@ -1,21 +1,50 @@
+import shutil
+import tempfile
+import zipfile
 from datetime import date
+from io import BytesIO
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from apps.core.academic_sessions.models import AcademicSession
 from apps.core.academics.models import ClassSubject, Period, SchoolClass, Section, Subject
-from apps.core.hr.models import Designation, Staff, Substitution, TeacherSubjectAssignment
+from apps.core.hr.models import Designation, LeaveRequest, Staff, Substitution, TeacherSubjectAssignment
 from apps.core.schools.models import School
 
+from .generator import generate_timetable
+from .ical import FEED_SECTION, FEED_TEACHER, feed_token
 from .models import TimetableEntry
-from .services import build_class_timetable_grid
+from .substitutions import commit_substitution_plan, plan_substitutions
+from .services import (
+    build_class_timetable_grid,
+    bulk_timetable_sources,
+    cached_class_timetable_grid,
+    timetable_cache_version,
+    resolve_effective_teacher,
+    save_timetable_grid,
+    substitutions_for_day,
+)
+from .workload import get_available_teachers, teacher_occupancy, teacher_workload_rows
 
 
+TEST_MEDIA_ROOT = tempfile.mkdtemp(prefix='timetable_core_tests_')
+
+
+@override_settings(MEDIA_ROOT=TEST_MEDIA_ROOT)
 class TimetableBaseTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEST_MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
+        cache.clear()
         user_model = get_user_model()
 
         self.school = School.objects.create(name='Timetable School', code='timetable_school')
@@ -302,6 +331,68 @@ class TimetableSubstitutionTests(TimetableBaseTestCase):
             teacher_can_handle_slot(entry=entry, teacher=self.teacher_2, target_date=date(2026, 4, 20))
         )
 
+    def test_day_substitution_map_resolves_without_further_queries(self):
+        entry = TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_9,
+            section=self.section_a,
+            day_of_week='monday',
+            period=self.period_1,
+            subject=self.subject_math,
+            teacher=self.teacher_1,
+            is_active=True,
+        )
+        other_entry = TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_10,
+            section=self.section_b,
+            day_of_week='monday',
+            period=self.period_2,
+            subject=self.subject_math,
+            teacher=self.teacher_1,
+            is_active=True,
+        )
+        Substitution.objects.create(
+            school=self.school,
+            session=self.session,
+            date=date(2026, 4, 20),
+            period=self.period_1,
+            school_class=self.class_9,
+            section=self.section_a,
+            subject=self.subject_math,
+            original_teacher=self.teacher_1,
+            substitute_teacher=self.teacher_2,
+            is_active=True,
+        )
+
+        with self.assertNumQueries(1):
+            substitutions = substitutions_for_day(
+                school=self.school,
+                session=self.session,
+                target_date=date(2026, 4, 20),
+            )
+            covered = resolve_effective_teacher(entry, date(2026, 4, 20), substitutions)
+            uncovered = resolve_effective_teacher(other_entry, date(2026, 4, 20), substitutions)
+
+        self.assertEqual(covered[0], self.teacher_2)
+        self.assertEqual(uncovered, (self.teacher_1, None))
+
+    def test_day_substitution_map_is_memoized_per_request(self):
+        request = RequestFactory().get('/')
+
+        first = substitutions_for_day(school=self.school, session=self.session, target_date=date(2026, 4, 20), request=request)
+        with self.assertNumQueries(0):
+            second = substitutions_for_day(
+                school=self.school,
+                session=self.session,
+                target_date=date(2026, 4, 20),
+                request=request,
+            )
+
+        self.assertIs(first, second)
+
 
 class TimetableViewTests(TimetableBaseTestCase):
     def test_schooladmin_can_create_timetable_cell(self):
@@ -401,3 +492,500 @@ class TimetableViewTests(TimetableBaseTestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertIn('application/pdf', response['Content-Type'])
+
+
+class TimetableGeneratorTests(TimetableBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        ClassSubject.objects.filter(subject=self.subject_math).update(periods_per_week=6)
+
+    def test_generated_plan_has_no_teacher_clashes(self):
+        plan = generate_timetable(school=self.school, session=self.session)
+
+        self.assertTrue(plan.is_valid)
+        self.assertEqual(len(plan.entries), 12)
+        teacher_slots = [(row['teacher_id'], row['day_of_week'], row['period_id']) for row in plan.entries]
+        section_slots = [(row['section_id'], row['day_of_week'], row['period_id']) for row in plan.entries]
+        self.assertEqual(len(teacher_slots), len(set(teacher_slots)))
+        self.assertEqual(len(section_slots), len(set(section_slots)))
+
+    def test_requirements_beyond_available_slots_are_rejected(self):
+        ClassSubject.objects.filter(school_class=self.class_9).update(periods_per_week=13)
+
+        with self.assertRaises(ValidationError):
+            generate_timetable(school=self.school, session=self.session, school_class=self.class_9)
+
+    def test_commit_replaces_section_timetable(self):
+        old_entry = TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_9,
+            section=self.section_a,
+            day_of_week='monday',
+            period=self.period_1,
+            subject=self.subject_math,
+            teacher=self.teacher_2,
+            is_active=True,
+        )
+
+        self.client.login(username='tt_admin', password='pass12345')
+        response = self.client.post(reverse('timetable_generate'), {
+            'session': self.session.id,
+            'school_class': self.class_9.id,
+            'seed': 0,
+            'action': 'commit',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        old_entry.refresh_from_db()
+        self.assertFalse(old_entry.is_active)
+        self.assertEqual(
+            TimetableEntry.objects.filter(section=self.section_a, is_active=True).count(),
+            6,
+        )
+
+
+class TimetableGridSaveTests(TimetableBaseTestCase):
+    def _week(self, section, teacher):
+        return [
+            {
+                'section': section,
+                'day_of_week': day_of_week,
+                'period': period,
+                'subject': self.subject_math,
+                'teacher': teacher,
+            }
+            for day_of_week in ('monday', 'tuesday', 'wednesday')
+            for period in (self.period_1, self.period_2)
+        ]
+
+    def test_whole_grid_save_uses_constant_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            save_timetable_grid(
+                school=self.school,
+                session=self.session,
+                cells=self._week(self.section_a, self.teacher_2)[:1],
+                replace_section_ids=[self.section_a.id],
+            )
+        with CaptureQueriesContext(connection) as large:
+            result = save_timetable_grid(
+                school=self.school,
+                session=self.session,
+                cells=self._week(self.section_a, self.teacher_2) + self._week(self.section_b, self.teacher_1),
+                replace_section_ids=[self.section_a.id, self.section_b.id],
+            )
+
+        self.assertEqual(result['created'], 11)
+        self.assertEqual(TimetableEntry.objects.filter(is_active=True).count(), 12)
+        self.assertLessEqual(len(large.captured_queries), len(small.captured_queries) + 1)
+
+    def test_teacher_clash_rejects_whole_grid(self):
+        with self.assertRaises(ValidationError):
+            save_timetable_grid(
+                school=self.school,
+                session=self.session,
+                cells=self._week(self.section_a, self.teacher_1) + self._week(self.section_b, self.teacher_1),
+            )
+
+        self.assertFalse(TimetableEntry.objects.exists())
+
+    def test_section_week_view_replaces_existing_slots(self):
+        entry = TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_9,
+            section=self.section_a,
+            day_of_week='friday',
+            period=self.period_2,
+            subject=self.subject_math,
+            teacher=self.teacher_1,
+            is_active=True,
+        )
+
+        self.client.login(username='tt_admin', password='pass12345')
+        response = self.client.post(
+            reverse('timetable_section_bulk_edit', args=[self.class_9.id, self.section_a.id]),
+            {
+                'session': self.session.id,
+                f"subject-monday-{self.period_1.id}": self.subject_math.id,
+                f"teacher-monday-{self.period_1.id}": self.teacher_2.id,
+            },
+        )
+
+        self.assertEqual(response.status_code, 302)
+        entry.refresh_from_db()
+        self.assertFalse(entry.is_active)
+        self.assertTrue(
+            TimetableEntry.objects.filter(
+                section=self.section_a,
+                day_of_week='monday',
+                period=self.period_1,
+                teacher=self.teacher_2,
+                is_active=True,
+            ).exists()
+        )
+
+
+class SubstitutionPlannerTests(TimetableBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session.refresh_from_db()
+        for school_class, section, period in (
+            (self.class_9, self.section_a, self.period_1),
+            (self.class_10, self.section_b, self.period_2),
+        ):
+            TimetableEntry.objects.create(
+                school=self.school,
+                session=self.session,
+                school_class=school_class,
+                section=section,
+                day_of_week='monday',
+                period=period,
+                subject=self.subject_math,
+                teacher=self.teacher_1,
+                is_active=True,
+            )
+        LeaveRequest.objects.create(
+            school=self.school,
+            staff=self.teacher_1,
+            leave_type=LeaveRequest.TYPE_CASUAL,
+            start_date=date(2026, 4, 20),
+            end_date=date(2026, 4, 21),
+            reason='Family event',
+            status=LeaveRequest.STATUS_APPROVED,
+        )
+
+    def test_plan_covers_every_slot_of_teacher_on_leave(self):
+        teacher_occupancy(school=self.school, session=self.session)
+        with self.assertNumQueries(6):
+            plan = plan_substitutions(
+                school=self.school,
+                session=self.session,
+                start_date=date(2026, 4, 20),
+                end_date=date(2026, 4, 21),
+            )
+
+        self.assertEqual(len(plan.proposals), 2)
+        self.assertFalse(plan.uncovered)
+        self.assertTrue(all(proposal.substitute == self.teacher_2 for proposal in plan.proposals))
+        self.assertTrue(all(proposal.subject_match for proposal in plan.proposals))
+
+    def test_commit_view_creates_substitutions_once(self):
+        self.client.login(username='tt_admin', password='pass12345')
+        response = self.client.post(reverse('timetable_substitution_plan'), {
+            'session': self.session.id,
+            'start_date': '2026-04-20',
+            'action': 'commit',
+        })
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            Substitution.objects.filter(original_teacher=self.teacher_1, substitute_teacher=self.teacher_2).count(),
+            2,
+        )
+        replanned = plan_substitutions(school=self.school, session=self.session, start_date=date(2026, 4, 20))
+        self.assertEqual(replanned.proposals, [])
+
+    def _substitution(self, school_class, section, period, original_teacher, substitute_teacher):
+        return Substitution.objects.create(
+            school=self.school,
+            session=self.session,
+            date=date(2026, 4, 20),
+            period=period,
+            school_class=school_class,
+            section=section,
+            subject=self.subject_math,
+            original_teacher=original_teacher,
+            substitute_teacher=substitute_teacher,
+            is_active=True,
+        )
+
+    def test_slot_covered_for_another_original_teacher_is_not_proposed(self):
+        self._substitution(self.class_9, self.section_a, self.period_1, self.teacher_2, self.teacher_1)
+
+        plan = plan_substitutions(school=self.school, session=self.session, start_date=date(2026, 4, 20))
+
+        self.assertEqual([proposal.entry.period_id for proposal in plan.proposals], [self.period_2.id])
+
+    def test_commit_reports_conflicting_proposal_and_keeps_the_rest(self):
+        plan = plan_substitutions(school=self.school, session=self.session, start_date=date(2026, 4, 20))
+        self._substitution(self.class_10, self.section_b, self.period_2, self.teacher_2, self.teacher_1)
+
+        created, rejected = commit_substitution_plan(school=self.school, session=self.session, plan=plan)
+
+        self.assertEqual([substitution.period_id for substitution in created], [self.period_1.id])
+        self.assertEqual([proposal.entry.period_id for proposal, _ in rejected], [self.period_2.id])
+
+
+class TimetableBulkExportTests(TimetableBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_9,
+            section=self.section_a,
+            day_of_week='monday',
+            period=self.period_1,
+            subject=self.subject_math,
+            teacher=self.teacher_1,
+            is_active=True,
+        )
+
+    def test_bulk_sources_partition_one_session_read(self):
+        with self.assertNumQueries(4):
+            sources = bulk_timetable_sources(school=self.school, session=self.session)
+
+        names = [name for name, _ in sources]
+        self.assertEqual(names, ['classes/9th-A.pdf', 'classes/10th-B.pdf', 'teachers/T001.pdf', 'teachers/T002.pdf'])
+        self.assertEqual(sources[0][1]['cells'][0], ('MTH', 'T001', ''))
+        self.assertEqual(sources[2][1]['cells'][0], ('MTH', '9th-A', ''))
+
+    def test_bulk_export_streams_combined_pdf(self):
+        self.client.login(username='tt_admin', password='pass12345')
+        response = self.client.get(reverse('timetable_bulk_export'), {'session': self.session.id})
+
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertIn(b'/Count 4', content)
+
+    def test_bulk_export_streams_zip_per_grid(self):
+        self.client.login(username='tt_admin', password='pass12345')
+        response = self.client.get(
+            reverse('timetable_bulk_export'),
+            {'session': self.session.id, 'format': 'zip', 'include': 'teachers'},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), ['teachers/T001.pdf', 'teachers/T002.pdf'])
+        self.assertTrue(archive.read('teachers/T001.pdf').startswith(b'%PDF'))
+
+
+class TimetableGridCacheTests(TimetableBaseTestCase):
+    def _grid(self):
+        return cached_class_timetable_grid(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_9,
+            section=self.section_a,
+            periods=Period.objects.filter(school=self.school, session=self.session).order_by('period_number'),
+            view_date=date(2026, 4, 20),
+        )
+
+    def test_grid_is_served_from_cache_until_entry_changes(self):
+        self.assertIsNone(self._grid()[0]['cells'][0]['entry'])
+        with self.assertNumQueries(0):
+            self._grid()
+
+        TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_9,
+            section=self.section_a,
+            day_of_week='monday',
+            period=self.period_1,
+            subject=self.subject_math,
+            teacher=self.teacher_1,
+            is_active=True,
+        )
+
+        self.assertEqual(self._grid()[0]['cells'][0]['entry'].teacher_id, self.teacher_1.id)
+
+    def test_bulk_grid_save_and_substitutions_bump_version(self):
+        version = timetable_cache_version(school=self.school, session=self.session)
+        save_timetable_grid(
+            school=self.school,
+            session=self.session,
+            cells=[{
+                'section': self.section_a,
+                'day_of_week': 'monday',
+                'period': self.period_1,
+                'subject': self.subject_math,
+                'teacher': self.teacher_1,
+            }],
+        )
+        after_save = timetable_cache_version(school=self.school, session=self.session)
+        self.assertNotEqual(after_save, version)
+
+        Substitution.objects.create(
+            school=self.school,
+            session=self.session,
+            date=date(2026, 4, 20),
+            period=self.period_1,
+            school_class=self.class_9,
+            section=self.section_a,
+            subject=self.subject_math,
+            original_teacher=self.teacher_1,
+            substitute_teacher=self.teacher_2,
+            is_active=True,
+        )
+        self.assertNotEqual(timetable_cache_version(school=self.school, session=self.session), after_save)
+
+
+class TimetableCalendarFeedTests(TimetableBaseTestCase):
+    def setUp(self):
+        super().setUp()
+        TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_9,
+            section=self.section_a,
+            day_of_week='monday',
+            period=self.period_1,
+            subject=self.subject_math,
+            teacher=self.teacher_1,
+            is_active=True,
+        )
+        Substitution.objects.create(
+            school=self.school,
+            session=self.session,
+            date=date(2026, 4, 20),
+            period=self.period_1,
+            school_class=self.class_9,
+            section=self.section_a,
+            subject=self.subject_math,
+            original_teacher=self.teacher_1,
+            substitute_teacher=self.teacher_2,
+            is_active=True,
+        )
+
+    def _feed_url(self, kind, object_id):
+        return reverse('timetable_ical_feed', args=[feed_token(kind, object_id)])
+
+    def test_teacher_feeds_exclude_covered_slot_and_add_cover_event(self):
+        response = self.client.get(self._feed_url(FEED_TEACHER, self.teacher_1.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/calendar'))
+        body = response.content.decode()
+        self.assertIn('DTSTART:20260406T090000', body)
+        self.assertIn('RRULE:FREQ=WEEKLY;UNTIL=20270331T235959', body)
+        self.assertIn('EXDATE:20260420T090000', body)
+
+        cover = self.client.get(self._feed_url(FEED_TEACHER, self.teacher_2.id)).content.decode()
+        self.assertIn('SUMMARY:Cover: MTH - 9th-A', cover)
+        self.assertNotIn('RRULE', cover)
+
+        section = self.client.get(self._feed_url(FEED_SECTION, self.section_a.id)).content.decode()
+        self.assertIn('RECURRENCE-ID:20260420T090000', section)
+
+    def test_feed_revalidates_until_timetable_changes(self):
+        url = self._feed_url(FEED_SECTION, self.section_a.id)
+        first = self.client.get(url)
+        self.assertIn('ETag', first)
+        self.assertIn('Last-Modified', first)
+
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=self.class_9,
+            section=self.section_a,
+            day_of_week='tuesday',
+            period=self.period_1,
+            subject=self.subject_math,
+            teacher=self.teacher_1,
+            is_active=True,
+        )
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_tampered_token_is_not_found(self):
+        token = feed_token(FEED_TEACHER, self.teacher_1.id)
+        response = self.client.get(reverse('timetable_ical_feed', args=[token + 'x']))
+        self.assertEqual(response.status_code, 404)
+
+
+class TeacherWorkloadTests(TimetableBaseTestCase):
+    def _entry(self, section, school_class, day_of_week, period, teacher):
+        return TimetableEntry.objects.create(
+            school=self.school,
+            session=self.session,
+            school_class=school_class,
+            section=section,
+            day_of_week=day_of_week,
+            period=period,
+            subject=self.subject_math,
+            teacher=teacher,
+            is_active=True,
+        )
+
+    def test_occupancy_matrix_reports_load_streaks_and_free_slots(self):
+        self._entry(self.section_a, self.class_9, 'monday', self.period_1, self.teacher_1)
+        self._entry(self.section_b, self.class_10, 'monday', self.period_2, self.teacher_1)
+        self._entry(self.section_a, self.class_9, 'tuesday', self.period_2, self.teacher_2)
+
+        occupancy = teacher_occupancy(school=self.school, session=self.session)
+        self.assertEqual(occupancy.weekly_load(self.teacher_1.id), 2)
+        self.assertEqual(occupancy.longest_streak(self.teacher_1.id), 2)
+        self.assertEqual(occupancy.longest_streak(self.teacher_2.id), 1)
+        self.assertEqual(occupancy.free_slots(self.teacher_1.id, 'monday'), [])
+        self.assertEqual(occupancy.free_slots(self.teacher_2.id, 'tuesday'), [('tuesday', self.period_1.id)])
+        self.assertEqual(
+            occupancy.free_teachers('monday', self.period_1.id, [self.teacher_1.id, self.teacher_2.id]),
+            [self.teacher_2.id],
+        )
+        with self.assertNumQueries(0):
+            teacher_occupancy(school=self.school, session=self.session)
+
+        Substitution.objects.create(
+            school=self.school,
+            session=self.session,
+            date=date(2026, 4, 20),
+            period=self.period_1,
+            school_class=self.class_9,
+            section=self.section_a,
+            subject=self.subject_math,
+            original_teacher=self.teacher_1,
+            substitute_teacher=self.teacher_2,
+            is_active=True,
+        )
+        rows = {
+            row['teacher'].id: row
+            for row in teacher_workload_rows(
+                school=self.school,
+                session=self.session,
+                start_date=date(2026, 4, 20),
+                end_date=date(2026, 4, 25),
+            )
+        }
+        self.assertEqual(rows[self.teacher_1.id]['substitutions_received'], 1)
+        self.assertEqual(rows[self.teacher_2.id]['substitutions_given'], 1)
+        self.assertEqual(rows[self.teacher_2.id]['free_periods'], 11)
+
+    def test_available_teachers_follow_timetable_changes(self):
+        entry = self._entry(self.section_b, self.class_10, 'monday', self.period_1, self.teacher_1)
+
+        def available(exclude_entry=None):
+            return list(get_available_teachers(
+                school=self.school,
+                session=self.session,
+                school_class=self.class_9,
+                subject=self.subject_math,
+                day_of_week='monday',
+                period=self.period_1,
+                exclude_entry=exclude_entry,
+            ))
+
+        self.assertEqual(available(), [self.teacher_2])
+        self.assertEqual(available(exclude_entry=entry), [self.teacher_1, self.teacher_2])
+
+        entry.is_active = False
+        entry.save()
+        self.assertEqual(available(), [self.teacher_1, self.teacher_2])
+
+    def test_workload_page_filters_free_teachers(self):
+        self._entry(self.section_a, self.class_9, 'monday', self.period_1, self.teacher_1)
+        self.client.login(username='tt_admin', password='pass12345')
+
+        response = self.client.get(reverse('timetable_teacher_workload'), {
+            'session': self.session.id,
+            'day_of_week': 'monday',
+            'period': self.period_1.id,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['teacher'] for row in response.context['rows']], [self.teacher_2])
@@ -1,12 +1,18 @@
 from django.urls import path
 
 from .views import (
+    timetable_bulk_export,
     timetable_cell_deactivate,
     timetable_cell_edit,
     timetable_class_grid,
     timetable_class_pdf,
+    timetable_generate,
+    timetable_ical_feed,
+    timetable_section_bulk_edit,
+    timetable_substitution_plan,
     timetable_teacher_pdf,
     timetable_teacher_view,
+    timetable_teacher_workload,
 )
 
 urlpatterns = [
@@ -21,8 +27,15 @@ urlpatterns = [
         timetable_cell_deactivate,
         name='timetable_cell_deactivate',
     ),
+    path('class-grid/<int:class_id>/<int:section_id>/week/', timetable_section_bulk_edit, name='timetable_section_bulk_edit'),
     path('class-grid/<int:class_id>/<int:section_id>/pdf/', timetable_class_pdf, name='timetable_class_pdf'),
+    path('export/', timetable_bulk_export, name='timetable_bulk_export'),
+    path('generate/', timetable_generate, name='timetable_generate'),
+    path('substitutions/plan/', timetable_substitution_plan, name='timetable_substitution_plan'),
 
     path('teacher/', timetable_teacher_view, name='timetable_teacher_view'),
     path('teacher/pdf/', timetable_teacher_pdf, name='timetable_teacher_pdf'),
+    path('workload/', timetable_teacher_workload, name='timetable_teacher_workload'),
+
+    path('calendar/<str:token>.ics', timetable_ical_feed, name='timetable_ical_feed'),
 ]
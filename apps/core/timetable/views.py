@@ -3,27 +3,52 @@ from datetime import date
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ValidationError
-from django.http import HttpResponse
+from django.core import signing
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
-from django.views.decorators.http import require_POST
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET, require_POST
 
 from apps.core.academic_sessions.models import AcademicSession
-from apps.core.academics.models import Period, SchoolClass, Section
-from apps.core.hr.models import Staff
+from apps.core.academics.models import ClassSubject, Period, SchoolClass, Section
+from apps.core.artifacts.http import artifact_pdf_response
+from apps.core.hr.models import Staff, TeacherSubjectAssignment
 from apps.core.users.audit import log_audit_event
 from apps.core.users.decorators import role_required
 
-from .forms import TeacherTimetableFilterForm, TimetableEntryForm, TimetableSelectionForm
+from .forms import (
+    SubstitutionPlanForm,
+    TeacherTimetableFilterForm,
+    TeacherWorkloadForm,
+    TimetableEntryForm,
+    TimetableGenerateForm,
+    TimetableSelectionForm,
+)
+from .generator import commit_timetable_plan, generate_timetable
+from .ical import FEED_SECTION, FEED_TEACHER, build_section_feed, build_teacher_feed, feed_token, parse_feed_token
 from .models import DAY_CHOICES, TimetableEntry
 from .services import (
-    build_class_timetable_grid,
-    build_teacher_timetable_grid,
-    generate_class_timetable_pdf,
+    BULK_EXPORT_CLASSES,
+    BULK_EXPORT_TEACHERS,
+    WEEKDAY_ORDER,
+    bulk_timetable_sources,
+    cached_class_timetable_grid,
+    cached_teacher_timetable_grid,
+    class_timetable_document,
     generate_teacher_timetable_pdf,
+    save_timetable_grid,
+    stream_bulk_timetables_pdf,
+    stream_bulk_timetables_zip,
     teacher_substitutions_for_week,
+    timetable_cache_version,
+    week_range,
 )
+from .substitutions import commit_substitution_plan, plan_substitutions
+from .workload import teacher_occupancy, teacher_workload_rows
 
 
 def _school_sessions(school):
@@ -43,6 +68,10 @@ def _resolve_session(request, school):
     return sessions, selected_session
 
 
+def _calendar_feed_url(request, kind, object_id):
+    return request.build_absolute_uri(reverse('timetable_ical_feed', args=[feed_token(kind, object_id)]))
+
+
 def _parse_date(raw_value, fallback=None):
     if not raw_value:
         return fallback or timezone.localdate()
@@ -88,17 +117,19 @@ def timetable_class_grid(request):
             if selected_section.school_class_id != selected_class.id:
                 messages.error(request, 'Selected section does not belong to selected class.')
             else:
-                rows = build_class_timetable_grid(
+                rows = cached_class_timetable_grid(
                     school=school,
                     session=selected_session,
                     school_class=selected_class,
                     section=selected_section,
                     periods=periods,
                     view_date=view_date,
+                    request=request,
                 )
 
     return render(request, 'timetable_core/class_grid.html', {
         'selection_form': selection_form,
+        'grid_version': timetable_cache_version(school=school, session=selected_session) if selected_session else None,
         'rows': rows,
         'periods': periods,
         'selected_session': selected_session,
@@ -106,6 +137,7 @@ def timetable_class_grid(request):
         'selected_section': selected_section,
         'view_date': view_date,
         'day_choices': DAY_CHOICES,
+        'calendar_feed_url': _calendar_feed_url(request, FEED_SECTION, selected_section.id) if selected_section else '',
     })
 
 
@@ -202,6 +234,118 @@ def timetable_cell_edit(request, class_id, section_id, day_of_week, period_id):
     })
 
 
+@login_required
+@role_required('schooladmin')
+def timetable_section_bulk_edit(request, class_id, section_id):
+    school = request.user.school
+    _, selected_session = _resolve_session(request, school)
+
+    if not selected_session:
+        messages.error(request, 'Select an academic session first.')
+        return redirect('timetable_class_grid')
+
+    school_class = get_object_or_404(SchoolClass, id=class_id, school=school, session=selected_session)
+    section = get_object_or_404(Section, id=section_id, school_class=school_class)
+    periods = list(Period.objects.filter(
+        school=school,
+        session=selected_session,
+        is_active=True,
+    ).order_by('period_number'))
+    subjects = [
+        row.subject
+        for row in ClassSubject.objects.filter(school_class=school_class).select_related('subject').order_by('subject__name')
+    ]
+    teachers = Staff.objects.filter(
+        id__in=TeacherSubjectAssignment.objects.filter(
+            school=school,
+            session=selected_session,
+            school_class=school_class,
+            is_active=True,
+        ).values('teacher_id'),
+        is_active=True,
+    ).order_by('employee_id')
+    entries = {
+        (entry.day_of_week, entry.period_id): entry
+        for entry in TimetableEntry.objects.filter(
+            school=school,
+            session=selected_session,
+            section=section,
+            is_active=True,
+        )
+    }
+
+    grid_url = (
+        f"{reverse('timetable_class_grid')}?session={selected_session.id}"
+        f"&school_class={school_class.id}&section={section.id}"
+    )
+
+    if request.method == 'POST':
+        cells = []
+        for day_key in WEEKDAY_ORDER:
+            for period in periods:
+                suffix = f"{day_key}-{period.id}"
+                cells.append({
+                    'section': section.id,
+                    'day_of_week': day_key,
+                    'period': period.id,
+                    'subject': request.POST.get(f"subject-{suffix}") or None,
+                    'teacher': request.POST.get(f"teacher-{suffix}") or None,
+                })
+        try:
+            result = save_timetable_grid(
+                school=school,
+                session=selected_session,
+                cells=cells,
+                replace_section_ids=[section.id],
+            )
+        except ValidationError as exc:
+            for error in exc.messages:
+                messages.error(request, error)
+        else:
+            log_audit_event(
+                request=request,
+                action='timetable.grid_saved',
+                school=school,
+                target=section,
+                details=(
+                    f"Session={selected_session.id}, Class={school_class.id}, Section={section.id}, "
+                    f"Created={result['created']}, Updated={result['updated']}, Cleared={result['deactivated']}"
+                ),
+            )
+            messages.success(request, 'Weekly timetable saved successfully.')
+            return redirect(grid_url)
+
+    rows = []
+    for day_key in WEEKDAY_ORDER:
+        row = {'day_key': day_key, 'day_label': dict(DAY_CHOICES)[day_key], 'cells': []}
+        for period in periods:
+            suffix = f"{day_key}-{period.id}"
+            entry = entries.get((day_key, period.id))
+            if request.method == 'POST':
+                subject_value = request.POST.get(f"subject-{suffix}", '')
+                teacher_value = request.POST.get(f"teacher-{suffix}", '')
+            else:
+                subject_value = str(entry.subject_id) if entry else ''
+                teacher_value = str(entry.teacher_id) if entry else ''
+            row['cells'].append({
+                'suffix': suffix,
+                'subject_value': subject_value,
+                'teacher_value': teacher_value,
+            })
+        rows.append(row)
+
+    return render(request, 'timetable_core/section_bulk_edit.html', {
+        'selected_session': selected_session,
+        'school_class': school_class,
+        'section': section,
+        'periods': periods,
+        'subjects': subjects,
+        'teachers': teachers,
+        'rows': rows,
+        'grid_url': grid_url,
+    })
+
+
 @login_required
 @role_required('schooladmin')
 @require_POST
@@ -245,6 +389,169 @@ def timetable_cell_deactivate(request, class_id, section_id, day_of_week, period
     return redirect(f"{reverse('timetable_class_grid')}?{query}")
 
 
+@login_required
+@role_required('schooladmin')
+def timetable_generate(request):
+    school = request.user.school
+    _, selected_session = _resolve_session(request, school)
+
+    form = TimetableGenerateForm(
+        request.POST or None,
+        school=school,
+        initial={'session': selected_session, 'seed': 0},
+    )
+    plan = None
+
+    if request.method == 'POST' and form.is_valid():
+        cleaned = form.cleaned_data
+        session = cleaned['session']
+        school_class = cleaned.get('school_class')
+        try:
+            plan = generate_timetable(
+                school=school,
+                session=session,
+                school_class=school_class,
+                seed=cleaned.get('seed') or 0,
+            )
+            if request.POST.get('action') == 'commit':
+                result = commit_timetable_plan(school=school, session=session, plan=plan)
+                log_audit_event(
+                    request=request,
+                    action='timetable.generated',
+                    school=school,
+                    target=school_class or session,
+                    details=(
+                        f"Session={session.id}, Sections={len(plan.sections)}, "
+                        f"Created={result['created']}, Updated={result['updated']}, "
+                        f"Cleared={result['deactivated']}"
+                    ),
+                )
+                messages.success(
+                    request,
+                    (
+                        f"Timetable generated for {len(plan.sections)} section(s): "
+                        f"{result['created']} created, {result['updated']} updated."
+                    ),
+                )
+                return redirect(f"{reverse('timetable_class_grid')}?session={session.id}")
+        except ValidationError as exc:
+            form.add_error(None, exc)
+            plan = None
+
+    return render(request, 'timetable_core/generate.html', {
+        'form': form,
+        'plan': plan,
+        'grids': plan.section_grids() if plan else [],
+    })
+
+
+@login_required
+@role_required('schooladmin')
+def timetable_substitution_plan(request):
+    school = request.user.school
+    _, selected_session = _resolve_session(request, school)
+
+    form = SubstitutionPlanForm(
+        request.POST or None,
+        school=school,
+        initial={'session': selected_session, 'start_date': timezone.localdate()},
+    )
+    plan = None
+
+    if request.method == 'POST' and form.is_valid():
+        cleaned = form.cleaned_data
+        session = cleaned['session']
+        try:
+            plan = plan_substitutions(
+                school=school,
+                session=session,
+                start_date=cleaned['start_date'],
+                end_date=cleaned.get('end_date'),
+            )
+            if request.POST.get('action') == 'commit':
+                created, rejected = commit_substitution_plan(school=school, session=session, plan=plan)
+                log_audit_event(
+                    request=request,
+                    action='hr.substitutions_planned',
+                    school=school,
+                    target=session,
+                    details=(
+                        f"From={plan.start_date}, To={plan.end_date}, Created={len(created)}, "
+                        f"Uncovered={len(plan.uncovered)}, Rejected={len(rejected)}"
+                    ),
+                )
+                messages.success(request, f"{len(created)} substitution(s) created.")
+                if plan.uncovered:
+                    messages.error(request, f"{len(plan.uncovered)} period(s) have no free teacher.")
+                for proposal, reason in rejected:
+                    messages.error(
+                        request,
+                        f"{proposal.date} {proposal.entry.period} {proposal.entry.school_class}-"
+                        f"{proposal.entry.section}: {reason}",
+                    )
+                return redirect(f"{reverse('hr_substitution_list')}?session={session.id}")
+        except ValidationError as exc:
+            form.add_error(None, exc)
+            plan = None
+
+    return render(request, 'timetable_core/substitution_plan.html', {
+        'form': form,
+        'plan': plan,
+    })
+
+
+@login_required
+@role_required('schooladmin')
+def timetable_teacher_workload(request):
+    school = request.user.school
+    _, selected_session = _resolve_session(request, school)
+
+    form = TeacherWorkloadForm(
+        request.GET or None,
+        school=school,
+        selected_session=selected_session,
+        initial={'session': selected_session, 'week_of': timezone.localdate()},
+    )
+    week_of = timezone.localdate()
+    day_of_week = ''
+    period = None
+    if form.is_valid():
+        selected_session = form.cleaned_data['session']
+        week_of = form.cleaned_data.get('week_of') or week_of
+        day_of_week = form.cleaned_data.get('day_of_week') or ''
+        period = form.cleaned_data.get('period')
+
+    rows = []
+    free_teacher_ids = None
+    week_start, week_end = week_range(week_of)
+    if selected_session:
+        rows = teacher_workload_rows(
+            school=school,
+            session=selected_session,
+            start_date=week_start,
+            end_date=week_end,
+        )
+        if day_of_week and period:
+            free_teacher_ids = set(teacher_occupancy(school=school, session=selected_session).free_teachers(
+                day_of_week,
+                period.id,
+                [row['teacher'].id for row in rows],
+            ))
+            rows = [row for row in rows if row['teacher'].id in free_teacher_ids]
+        rows.sort(key=lambda row: (-row['weekly_periods'], row['teacher'].employee_id))
+
+    return render(request, 'timetable_core/teacher_workload.html', {
+        'form': form,
+        'selected_session': selected_session,
+        'rows': rows,
+        'week_start': week_start,
+        'week_end': week_end,
+        'day_label': dict(DAY_CHOICES).get(day_of_week, ''),
+        'period': period,
+        'free_lookup': free_teacher_ids is not None,
+    })
+
+
 @login_required
 @role_required('schooladmin')
 def timetable_class_pdf(request, class_id, section_id):
@@ -266,7 +573,7 @@ def timetable_class_pdf(request, class_id, section_id):
 
     view_date = _parse_date(request.GET.get('view_date'))
 
-    pdf_bytes = generate_class_timetable_pdf(
+    document = class_timetable_document(
         school=school,
         session=selected_session,
         school_class=school_class,
@@ -274,10 +581,47 @@ def timetable_class_pdf(request, class_id, section_id):
         periods=periods,
         view_date=view_date,
     )
+    return artifact_pdf_response(
+        request,
+        school=school,
+        document=document,
+        filename=f'class_timetable_{school_class.name}_{section.name}_{selected_session.name}.pdf',
+    )
 
-    response = HttpResponse(pdf_bytes, content_type='application/pdf')
-    response['Content-Disposition'] = (
-        f'attachment; filename="class_timetable_{school_class.name}_{section.name}_{selected_session.name}.pdf"'
+
+@login_required
+@role_required('schooladmin')
+def timetable_bulk_export(request):
+    school = request.user.school
+    _, selected_session = _resolve_session(request, school)
+
+    if not selected_session:
+        messages.error(request, 'Session is required.')
+        return redirect('timetable_class_grid')
+
+    include = {
+        BULK_EXPORT_CLASSES: (BULK_EXPORT_CLASSES,),
+        BULK_EXPORT_TEACHERS: (BULK_EXPORT_TEACHERS,),
+    }.get(request.GET.get('include'), (BULK_EXPORT_CLASSES, BULK_EXPORT_TEACHERS))
+    sources = bulk_timetable_sources(school=school, session=selected_session, include=include)
+    if not sources:
+        messages.error(request, 'No class sections or teachers found to export.')
+        return redirect('timetable_class_grid')
+
+    filename = f"timetables_{'_'.join(include)}_{selected_session.name}"
+    if request.GET.get('format') == 'zip':
+        response = StreamingHttpResponse(stream_bulk_timetables_zip(sources=sources), content_type='application/zip')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.zip"'
+    else:
+        response = StreamingHttpResponse(stream_bulk_timetables_pdf(sources=sources), content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.pdf"'
+
+    log_audit_event(
+        request=request,
+        action='timetable.bulk_exported',
+        school=school,
+        target=selected_session,
+        details=f"Session={selected_session.id}, Grids={len(sources)}, Include={','.join(include)}",
     )
     return response
 
@@ -327,11 +671,13 @@ def timetable_teacher_view(request):
             is_active=True,
         ).order_by('period_number')
 
-        rows = build_teacher_timetable_grid(
+        rows = cached_teacher_timetable_grid(
             school=school,
             session=selected_session,
             teacher=selected_teacher,
             periods=periods,
+            view_date=anchor_date,
+            request=request,
         )
 
         substitutions_as_substitute, substitutions_as_original = teacher_substitutions_for_week(
@@ -343,6 +689,7 @@ def timetable_teacher_view(request):
 
     return render(request, 'timetable_core/teacher_view.html', {
         'filter_form': filter_form,
+        'grid_version': timetable_cache_version(school=school, session=selected_session) if selected_session else None,
         'rows': rows,
         'periods': periods,
         'selected_session': selected_session,
@@ -350,6 +697,7 @@ def timetable_teacher_view(request):
         'anchor_date': anchor_date,
         'substitutions_as_substitute': substitutions_as_substitute,
         'substitutions_as_original': substitutions_as_original,
+        'calendar_feed_url': _calendar_feed_url(request, FEED_TEACHER, selected_teacher.id) if selected_teacher else '',
     })
 
 
@@ -402,3 +750,55 @@ def timetable_teacher_pdf(request):
         f'attachment; filename="teacher_timetable_{selected_teacher.employee_id}_{selected_session.name}.pdf"'
     )
     return response
+
+
+ICAL_CACHE_TIMEOUT = 60 * 60 * 6
+
+
+@require_GET
+def timetable_ical_feed(request, token):
+    try:
+        kind, object_id = parse_feed_token(token)
+    except signing.BadSignature:
+        raise Http404('Unknown calendar feed.')
+
+    if kind == FEED_TEACHER:
+        target = get_object_or_404(
+            Staff.objects.select_related('user', 'school__current_session'),
+            id=object_id,
+            is_active=True,
+            user__role='teacher',
+        )
+        school = target.school
+        session = school.current_session
+    else:
+        target = get_object_or_404(
+            Section.objects.select_related('school_class__school', 'school_class__session'),
+            id=object_id,
+            is_active=True,
+        )
+        school = target.school_class.school
+        session = target.school_class.session
+    if session is None:
+        raise Http404('No current academic session.')
+
+    version = timetable_cache_version(school=school, session=session)
+    etag = quote_etag(f"{kind}-{object_id}-{session.id}-{version}")
+    last_modified = version // 1_000_000_000
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        cache_key = f"timetable:ical:{kind}:{object_id}:{session.id}:{version}"
+        body = cache.get(cache_key)
+        if body is None:
+            if kind == FEED_TEACHER:
+                body = build_teacher_feed(school=school, session=session, teacher=target, version=version)
+            else:
+                body = build_section_feed(school=school, session=session, section=target, version=version)
+            cache.set(cache_key, body, ICAL_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="timetable_{kind}_{object_id}.ics"'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
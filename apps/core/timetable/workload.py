@@ -0,0 +1,179 @@
+"""Teacher occupancy of a session timetable as one bitmask per teacher."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date
+
+from django.core.cache import cache
+
+from apps.core.academics.models import Period
+from apps.core.hr.models import Staff, Substitution, TeacherSubjectAssignment
+
+from .models import TimetableEntry
+from .services import TIMETABLE_CACHE_TIMEOUT, WEEKDAY_ORDER, timetable_cache_version
+
+
+@dataclass
+class TeacherOccupancy:
+    days: list = field(default_factory=list)
+    period_ids: list = field(default_factory=list)
+    masks: dict = field(default_factory=dict)
+
+    @property
+    def period_count(self):
+        return len(self.period_ids)
+
+    @property
+    def slot_count(self):
+        return len(self.days) * len(self.period_ids)
+
+    def slot(self, day_of_week, period_id):
+        """Bit position of a slot, or ``None`` for a day or period outside the grid."""
+        if day_of_week not in self.days or period_id not in self.period_ids:
+            return None
+        return self.days.index(day_of_week) * self.period_count + self.period_ids.index(period_id)
+
+    def is_busy(self, teacher_id, day_of_week, period_id):
+        slot = self.slot(day_of_week, period_id)
+        return slot is not None and bool(self.masks.get(teacher_id, 0) >> slot & 1)
+
+    def busy_teachers(self, day_of_week, period_id):
+        slot = self.slot(day_of_week, period_id)
+        if slot is None:
+            return set()
+        return {teacher_id for teacher_id, mask in self.masks.items() if mask >> slot & 1}
+
+    def free_teachers(self, day_of_week, period_id, teacher_ids):
+        busy = self.busy_teachers(day_of_week, period_id)
+        return [teacher_id for teacher_id in teacher_ids if teacher_id not in busy]
+
+    def day_mask(self, teacher_id, day_of_week):
+        if day_of_week not in self.days:
+            return 0
+        shift = self.days.index(day_of_week) * self.period_count
+        return self.masks.get(teacher_id, 0) >> shift & ((1 << self.period_count) - 1)
+
+    def weekly_load(self, teacher_id):
+        return self.masks.get(teacher_id, 0).bit_count()
+
+    def day_load(self, teacher_id, day_of_week):
+        return self.day_mask(teacher_id, day_of_week).bit_count()
+
+    def longest_streak(self, teacher_id, day_of_week=None):
+        """Most back-to-back periods taught on one day (or the worst day of the week)."""
+        days = self.days if day_of_week is None else [day_of_week]
+        best = 0
+        for day in days:
+            mask = self.day_mask(teacher_id, day)
+            streak = 0
+            while mask:
+                mask &= mask >> 1
+                streak += 1
+            best = max(best, streak)
+        return best
+
+    def free_slots(self, teacher_id, day_of_week=None):
+        """``(day_of_week, period_id)`` pairs in which the teacher has no class."""
+        days = self.days if day_of_week is None else [day_of_week]
+        return [
+            (day, period_id)
+            for day in days
+            for index, period_id in enumerate(self.period_ids)
+            if not self.day_mask(teacher_id, day) >> index & 1
+        ]
+
+
+def load_teacher_occupancy(*, school, session) -> TeacherOccupancy:
+    occupancy = TeacherOccupancy(
+        days=list(WEEKDAY_ORDER),
+        period_ids=list(
+            Period.objects.filter(school=school, session=session, is_active=True)
+            .order_by('period_number')
+            .values_list('id', flat=True)
+        ),
+    )
+    for teacher_id, day_of_week, period_id in TimetableEntry.objects.filter(
+        school=school,
+        session=session,
+        is_active=True,
+    ).order_by().values_list('teacher_id', 'day_of_week', 'period_id'):
+        slot = occupancy.slot(day_of_week, period_id)
+        if slot is not None:
+            occupancy.masks[teacher_id] = occupancy.masks.get(teacher_id, 0) | 1 << slot
+    return occupancy
+
+
+def teacher_occupancy(*, school, session) -> TeacherOccupancy:
+    version = timetable_cache_version(school=school, session=session)
+    key = f"timetable:occupancy:{school.id}:{session.id}:{version}"
+    occupancy = cache.get(key)
+    if occupancy is None:
+        occupancy = load_teacher_occupancy(school=school, session=session)
+        cache.set(key, occupancy, TIMETABLE_CACHE_TIMEOUT)
+    return occupancy
+
+
+def substitution_counts(*, school, session, start_date: date, end_date: date):
+    """Per-teacher ``{'given': n, 'received': m}`` counts of active substitutions in a date range."""
+    version = timetable_cache_version(school=school, session=session)
+    key = f"timetable:substitution-counts:{school.id}:{session.id}:{version}:{start_date}:{end_date}"
+    counts = cache.get(key)
+    if counts is None:
+        counts = {}
+        for original_id, substitute_id in Substitution.objects.filter(
+            school=school,
+            session=session,
+            date__range=(start_date, end_date),
+            is_active=True,
+        ).order_by().values_list('original_teacher_id', 'substitute_teacher_id'):
+            counts.setdefault(substitute_id, {'given': 0, 'received': 0})['given'] += 1
+            counts.setdefault(original_id, {'given': 0, 'received': 0})['received'] += 1
+        cache.set(key, counts, TIMETABLE_CACHE_TIMEOUT)
+    return counts
+
+
+def teacher_workload_rows(*, school, session, start_date: date, end_date: date):
+    occupancy = teacher_occupancy(school=school, session=session)
+    counts = substitution_counts(school=school, session=session, start_date=start_date, end_date=end_date)
+    rows = []
+    for teacher in Staff.objects.filter(
+        school=school,
+        is_active=True,
+        user__role='teacher',
+    ).select_related('user').order_by('employee_id'):
+        teacher_counts = counts.get(teacher.id, {})
+        rows.append({
+            'teacher': teacher,
+            'weekly_periods': occupancy.weekly_load(teacher.id),
+            'free_periods': occupancy.slot_count - occupancy.weekly_load(teacher.id),
+            'longest_streak': occupancy.longest_streak(teacher.id),
+            'substitutions_given': teacher_counts.get('given', 0),
+            'substitutions_received': teacher_counts.get('received', 0),
+        })
+    return rows
+
+
+def get_available_teachers(*, school, session, school_class, subject, day_of_week, period, exclude_entry=None):
+    assigned_teacher_ids = TeacherSubjectAssignment.objects.filter(
+        school=school,
+        session=session,
+        school_class=school_class,
+        subject=subject,
+        is_active=True,
+    ).values_list('teacher_id', flat=True)
+
+    busy = teacher_occupancy(school=school, session=session).busy_teachers(day_of_week, period.id)
+    if (
+        exclude_entry is not None
+        and exclude_entry.is_active
+        and exclude_entry.day_of_week == day_of_week
+        and exclude_entry.period_id == period.id
+    ):
+        busy.discard(exclude_entry.teacher_id)
+
+    return Staff.objects.filter(
+        school=school,
+        id__in=assigned_teacher_ids,
+        is_active=True,
+        user__role='teacher',
+    ).exclude(id__in=busy).order_by('employee_id')
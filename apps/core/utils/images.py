@@ -0,0 +1,121 @@
+"""Fixed-size image renditions stored next to the uploaded original."""
+from __future__ import annotations
+
+import posixpath
+from dataclasses import dataclass
+from io import BytesIO
+
+from PIL import Image, ImageOps
+from django.core.files.base import ContentFile
+
+
+RENDITION_DIR = 'thumbs'
+
+
+@dataclass(frozen=True)
+class RenditionSpec:
+    size: tuple
+    crop: bool = True
+    image_format: str = 'JPEG'
+
+    @property
+    def extension(self):
+        return 'png' if self.image_format == 'PNG' else 'jpg'
+
+
+RENDITIONS = {
+    'id_card': RenditionSpec((220, 260)),
+    'certificate': RenditionSpec((220, 260)),
+    'avatar': RenditionSpec((64, 64)),
+    'logo': RenditionSpec((120, 70), crop=False, image_format='PNG'),
+}
+PHOTO_RENDITIONS = ('id_card', 'certificate', 'avatar')
+LOGO_RENDITIONS = ('logo',)
+
+
+def rendition_name(name: str, rendition: str) -> str:
+    spec = RENDITIONS[rendition]
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, RENDITION_DIR, f"{stem}_{spec.size[0]}x{spec.size[1]}.{spec.extension}")
+
+
+def _render(image, spec: RenditionSpec) -> bytes:
+    if spec.image_format == 'PNG':
+        image = ImageOps.contain(image.convert('RGBA'), spec.size)
+    elif spec.crop:
+        image = ImageOps.fit(image.convert('RGB'), spec.size)
+    else:
+        image = ImageOps.contain(image.convert('RGB'), spec.size)
+    output = BytesIO()
+    image.save(output, format=spec.image_format, quality=90)
+    return output.getvalue()
+
+
+def _open_upright(field_file, largest_size):
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        # JPEG can decode straight at a fraction of full resolution.
+        image.draft('RGB', (largest_size[0] * 2, largest_size[1] * 2))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image
+
+
+def generate_renditions(field_file, renditions=PHOTO_RENDITIONS, *, overwrite=False) -> dict:
+    """Write the missing renditions of ``field_file``; returns ``{rendition: bytes}`` for those written.
+
+    The original is decoded at most once, and only when something is missing.
+    Unreadable images produce no renditions.
+    """
+    if not field_file:
+        return {}
+    storage = field_file.storage
+    missing = {}
+    for rendition in renditions:
+        name = rendition_name(field_file.name, rendition)
+        if name in missing.values():
+            continue
+        if overwrite or not storage.exists(name):
+            missing[rendition] = name
+    if not missing:
+        return {}
+
+    largest = max((RENDITIONS[rendition].size for rendition in missing), key=lambda size: size[0] * size[1])
+    try:
+        image = _open_upright(field_file, largest)
+    except Exception:
+        return {}
+
+    written = {}
+    for rendition, name in missing.items():
+        data = _render(image, RENDITIONS[rendition])
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(data))
+        written[rendition] = data
+    return written
+
+
+def rendition_bytes(field_file, rendition: str) -> bytes | None:
+    """Bytes of one rendition of ``field_file``, generating it when it does not exist yet."""
+    if not field_file:
+        return None
+    storage = field_file.storage
+    name = rendition_name(field_file.name, rendition)
+    try:
+        with storage.open(name, 'rb') as rendition_file:
+            return rendition_file.read()
+    except (FileNotFoundError, OSError):
+        pass
+    return generate_renditions(field_file, (rendition,)).get(rendition)
+
+
+def rendition_url(field_file, rendition: str) -> str:
+    """URL of one rendition of ``field_file``, or of the original while the rendition is missing."""
+    if not field_file:
+        return ''
+    name = rendition_name(field_file.name, rendition)
+    if not field_file.storage.exists(name):
+        return field_file.url
+    return field_file.storage.url(name)
@@ -0,0 +1,164 @@
+"""Keyset (cursor) pagination for long list pages."""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+
+
+CURSOR_SALT = 'keyset-pagination'
+MIN_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 200
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    page_size: int
+    total: int
+    next_cursor: str = ''
+    previous_cursor: str = ''
+    params: object = field(default=None, repr=False)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return bool(self.next_cursor)
+
+    @property
+    def has_previous(self):
+        return bool(self.previous_cursor)
+
+    def _query(self, key, cursor):
+        params = self.params.copy()
+        params.pop('after', None)
+        params.pop('before', None)
+        params[key] = cursor
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        return self._query('after', self.next_cursor)
+
+    @property
+    def previous_query(self):
+        return self._query('before', self.previous_cursor)
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _row_values(obj, ordering):
+    values = []
+    for name in ordering:
+        value = obj
+        for part in name.lstrip('-').split('__'):
+            value = getattr(value, part)
+        values.append(_plain(value))
+    return values
+
+
+def _load_cursor(cursor, ordering):
+    try:
+        values = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        return None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None
+    return values
+
+
+def _after(ordering, values, *, forward):
+    condition = Q()
+    for index, name in enumerate(ordering):
+        descending = name.startswith('-')
+        lookup = 'lt' if descending == forward else 'gt'
+        clause = Q(**{f"{name.lstrip('-')}__{lookup}": values[index]})
+        for previous_name, previous_value in zip(ordering[:index], values[:index]):
+            clause &= Q(**{previous_name.lstrip('-'): previous_value})
+        condition |= clause
+    return condition
+
+
+def _reverse(ordering):
+    return [name[1:] if name.startswith('-') else f"-{name}" for name in ordering]
+
+
+def page_size_from_request(request, default=None):
+    default = default or getattr(settings, 'LIST_PAGE_SIZE', 50)
+    try:
+        size = int(request.GET.get('page_size') or default)
+    except (TypeError, ValueError):
+        size = default
+    return max(MIN_PAGE_SIZE, min(MAX_PAGE_SIZE, size))
+
+
+def cached_count(queryset, timeout=None) -> int:
+    """``COUNT(*)`` of a filtered queryset, cached briefly under a hash of its SQL."""
+    queryset = queryset.order_by()
+    timeout = getattr(settings, 'LIST_COUNT_CACHE_SECONDS', 60) if timeout is None else timeout
+    try:
+        sql = str(queryset.query)
+    except Exception:
+        return queryset.count()
+    key = f"list-count:{queryset.model._meta.label_lower}:{hashlib.md5(sql.encode('utf-8')).hexdigest()}"
+    total = cache.get(key)
+    if total is None:
+        total = queryset.count()
+        cache.set(key, total, timeout)
+    return total
+
+
+def keyset_paginate(request, queryset, ordering, *, page_size=None) -> KeysetPage:
+    """Return the page of ``queryset`` selected by the request's ``after`` / ``before`` cursor.
+
+    ``ordering`` must end in a unique column, and none of its columns may be null.
+    """
+    ordering = list(ordering)
+    page_size = page_size or page_size_from_request(request)
+    after = _load_cursor(request.GET.get('after', ''), ordering) if request.GET.get('after') else None
+    before = _load_cursor(request.GET.get('before', ''), ordering) if request.GET.get('before') else None
+
+    if before is not None:
+        rows = list(
+            queryset.filter(_after(ordering, before, forward=False)).order_by(*_reverse(ordering))[:page_size + 1]
+        )
+        has_previous = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        has_next = True
+    else:
+        rows = queryset.order_by(*ordering)
+        if after is not None:
+            rows = rows.filter(_after(ordering, after, forward=True))
+        rows = list(rows[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_previous = after is not None
+
+    page = KeysetPage(
+        object_list=rows,
+        page_size=page_size,
+        total=cached_count(queryset),
+        params=request.GET,
+    )
+    if rows and has_next:
+        page.next_cursor = signing.dumps(_row_values(rows[-1], ordering), salt=CURSOR_SALT)
+    if rows and has_previous:
+        page.previous_cursor = signing.dumps(_row_values(rows[0], ordering), salt=CURSOR_SALT)
+    return page
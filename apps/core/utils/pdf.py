@@ -0,0 +1,135 @@
+"""Streaming PDF assembly for rasterised document pages."""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Iterable, Iterator
+
+from django.conf import settings
+
+
+@dataclass(frozen=True)
+class EncodedPage:
+    width: int
+    height: int
+    data: bytes
+    dpi: int = 72
+
+    @property
+    def size_in_points(self):
+        return f"{self.width * 72 / self.dpi:g}", f"{self.height * 72 / self.dpi:g}"
+
+
+def encode_pdf_page(image) -> EncodedPage:
+    dpi = int(image.info.get('dpi', (72, 72))[0]) or 72
+    rgb_image = image.convert('RGB')
+    output = BytesIO()
+    rgb_image.save(output, format='JPEG')
+    return EncodedPage(width=rgb_image.width, height=rgb_image.height, data=output.getvalue(), dpi=dpi)
+
+
+def _render_and_encode(task):
+    render_fn, payload = task
+    return encode_pdf_page(render_fn(payload))
+
+
+def render_workers() -> int:
+    return max(1, int(getattr(settings, 'DOCUMENT_RENDER_WORKERS', 1)))
+
+
+def iter_rendered_pages(render_fn: Callable, payloads: Iterable, workers: int | None = None) -> Iterator[EncodedPage]:
+    """Render payloads in order, keeping at most two pages per worker in flight.
+
+    ``render_fn`` must be a module-level function that returns a PIL image and
+    does not touch the database, so it can run in a worker process.
+    """
+    workers = render_workers() if workers is None else max(1, workers)
+    if workers == 1:
+        for payload in payloads:
+            yield _render_and_encode((render_fn, payload))
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        for payload in payloads:
+            pending.append(executor.submit(_render_and_encode, (render_fn, payload)))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_pdf_bytes(pages: Iterable[EncodedPage]) -> Iterator[bytes]:
+    """Yield a PDF document chunk by chunk from already encoded pages.
+
+    Object 1 is the catalog and object 2 the page tree; the page tree is
+    written last because its kid list is only known once every page is out.
+    """
+    offsets = {}
+    position = 0
+    page_ids = []
+    next_id = 3
+
+    def emit(chunk):
+        nonlocal position
+        position += len(chunk)
+        return chunk
+
+    def begin_object(object_id):
+        offsets[object_id] = position
+        return emit(f"{object_id} 0 obj\n".encode('ascii'))
+
+    yield emit(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    yield begin_object(1)
+    yield emit(b'<< /Type /Catalog /Pages 2 0 R >>\nendobj\n')
+
+    for page in pages:
+        image_id, content_id, page_id = next_id, next_id + 1, next_id + 2
+        next_id += 3
+
+        yield begin_object(image_id)
+        yield emit(
+            (
+                f"<< /Type /XObject /Subtype /Image /Width {page.width} /Height {page.height} "
+                f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode /Length {len(page.data)} >>\n"
+                'stream\n'
+            ).encode('ascii')
+        )
+        yield emit(page.data)
+        yield emit(b'\nendstream\nendobj\n')
+
+        width, height = page.size_in_points
+        content = f"q {width} 0 0 {height} 0 0 cm /image Do Q".encode('ascii')
+        yield begin_object(content_id)
+        yield emit(f"<< /Length {len(content)} >>\nstream\n".encode('ascii'))
+        yield emit(content)
+        yield emit(b'\nendstream\nendobj\n')
+
+        yield begin_object(page_id)
+        yield emit(
+            (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+                f"/Resources << /XObject << /image {image_id} 0 R >> /ProcSet [/PDF /ImageC] >> "
+                f"/Contents {content_id} 0 R >>\nendobj\n"
+            ).encode('ascii')
+        )
+        page_ids.append(page_id)
+
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+    yield begin_object(2)
+    yield emit(f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>\nendobj\n".encode('ascii'))
+
+    xref_position = position
+    lines = [f"xref\n0 {next_id}\n", '0000000000 65535 f \n']
+    for object_id in range(1, next_id):
+        lines.append(f"{offsets[object_id]:010d} 00000 n \n")
+    lines.append(f"trailer\n<< /Size {next_id} /Root 1 0 R >>\nstartxref\n{xref_position}\n%%EOF\n")
+    yield emit(''.join(lines).encode('ascii'))
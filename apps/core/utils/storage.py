@@ -0,0 +1,83 @@
+"""Content-addressed storage for uploaded student files."""
+from __future__ import annotations
+
+import hashlib
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.encoding import filepath_to_uri
+
+
+BLOB_PREFIX = 'blobs'
+BLOB_NAME_RE = re.compile(r'^blobs/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})(?:\.[a-z0-9]+)?$')
+DERIVED_NAME_RE = re.compile(r'^blobs/[0-9a-f]{2}/[a-z_]+/(?P<digest>[0-9a-f]{64})[\w.-]*$')
+
+
+def blob_digest(name: str) -> str | None:
+    """SHA-256 of the blob ``name`` is, or is derived from; ``None`` for other names."""
+    match = BLOB_NAME_RE.match(name or '') or DERIVED_NAME_RE.match(name or '')
+    return match.group('digest') if match else None
+
+
+def is_blob_original(name: str) -> bool:
+    return bool(BLOB_NAME_RE.match(name or ''))
+
+
+def blob_name(digest: str, extension: str = '') -> str:
+    extension = extension.lower()
+    if not re.fullmatch(r'\.[a-z0-9]+', extension):
+        extension = ''
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest}{extension}"
+
+
+def content_digest(content) -> str:
+    sha256 = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        sha256.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return sha256.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, *args, **kwargs):
+        # The final name is decided by the content, so there is nothing to make unique.
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(*args, **kwargs)
+
+    def _save(self, name, content):
+        # Renditions of a blob are named after their source already.
+        if name.startswith(f"{BLOB_PREFIX}/"):
+            return super()._save(name, content)
+        extension = posixpath.splitext(name)[1]
+        name = blob_name(content_digest(content), extension)
+        if self.exists(name):
+            # Refresh the mtime so a blob that is about to be referenced again
+            # falls inside the collector's grace period.
+            os.utime(self.path(name))
+            return name
+        return super()._save(name, content)
+
+    def delete(self, name):
+        # Originals may back several rows; collect_blobs removes unreferenced ones.
+        if is_blob_original(name):
+            return
+        super().delete(name)
+
+    def purge(self, name):
+        """Remove a blob for good; only the collector should call this."""
+        super().delete(name)
+
+    def url(self, name):
+        if blob_digest(name) is None:
+            return super().url(name)
+        return posixpath.join(settings.BLOB_URL, filepath_to_uri(name))
+
+
+def blob_storage():
+    return ContentAddressedStorage()